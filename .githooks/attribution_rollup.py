@@ -0,0 +1,678 @@
+#!/usr/bin/env python3
+"""
+Rolling-window attribution rollups over git.ai.stats spans
+Consumes the ``git.commit`` spans the hooks export (queue records, OTLP
+payloads or commits added after they are made) one at a time and folds
+each into minute, hour and day buckets per repository, author and
+branch. Buckets older than their resolution's retention are evicted as
+the newest span time (the watermark) moves forward, so query cost
+depends on the number of buckets and groups, and memory on those plus
+the commit ids kept for de-duplication over the hour retention, never on
+the length of the history:
+
+    attribution_rollup.py add <commit>                  # used by post-commit
+    attribution_rollup.py ingest commit_logs/otel-queue/queue.jsonl
+    attribution_rollup.py query --window 7d --by author
+    attribution_rollup.py series --window 24h --resolution hour --smooth 3
+    attribution_rollup.py alerts
+    attribution_rollup.py collector --port 4318         # live OTLP receiver
+    attribution_rollup.py bench --commits 200000
+
+Spike detection follows ``OnlineAnomalyDetector`` in ``ewma`` mode: when
+an hour bucket closes, each author's AI-line share in it is scored
+against that author's exponentially weighted mean and variance, and
+shares more than ``threshold`` deviations above the baseline are
+reported. State (buckets, baselines, alerts) is saved to
+``commit_logs/attribution-rollup.json``.
+"""
+
+import os
+import sys
+import json
+import time
+import math
+import fcntl
+import heapq
+import random
+import argparse
+import threading
+from collections import deque
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+
+from otel_export import (StandInCollector, build_span, collect_stats, commit_logs_dir,
+                         commit_metadata, repository_root)
+from commit_store import attribution
+
+STATE_NAME = "attribution-rollup.json"
+RESOLUTIONS = {"minute": 60, "hour": 3_600, "day": 86_400}
+DEFAULT_RETENTION = {"minute": 180, "hour": 192, "day": 400}
+GROUP_FIELDS = ("repo", "author", "branch")
+
+# commits, ai, human, mixed
+Sums = List[int]
+
+
+def span_attributes(span: Dict[str, Any]) -> Dict[str, str]:
+    """OTLP attribute list as a plain dict of string values."""
+    attributes = {}
+    for attribute in span.get("attributes") or []:
+        value = attribute.get("value") or {}
+        attributes[attribute.get("key")] = value.get("stringValue", value.get("intValue", ""))
+    return attributes
+
+
+def parse_span(span: Dict[str, Any], repo: str = "") -> Optional[Dict[str, Any]]:
+    """Commit fields and line attribution of a ``git.commit`` span (None for other spans)."""
+    attributes = span_attributes(span)
+    if span.get("name") != "git.commit" or "git.ai.stats" not in attributes:
+        return None
+    ai, human, mixed = attribution(attributes["git.ai.stats"])
+    return {
+        "commit_id": attributes.get("vcs.commit.id", ""),
+        "repo": repo,
+        "author": attributes.get("vcs.commit.author.name", ""),
+        "branch": attributes.get("vcs.branch", ""),
+        "timestamp": int(span.get("startTimeUnixNano") or 0) // 1_000_000_000,
+        "ai": ai,
+        "human": human,
+        "mixed": mixed
+    }
+
+
+def iter_payload_spans(payload: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """(repository, span) pairs of an OTLP traces payload."""
+    for resource in payload.get("resourceSpans") or []:
+        attributes = span_attributes(resource.get("resource") or {})
+        repo = attributes.get("vcs.repository.name", "")
+        for scope in resource.get("scopeSpans") or []:
+            for span in scope.get("spans") or []:
+                yield repo, span
+
+
+def parse_window(value: str) -> int:
+    """Seconds in a window such as ``90m``, ``24h``, ``7d`` or ``3600``."""
+    units = {"s": 1, "m": 60, "h": 3_600, "d": 86_400, "w": 604_800}
+    if value[-1:] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+
+def _entry(sums: Sums) -> Dict[str, Any]:
+    lines = sums[1] + sums[2] + sums[3]
+    return {"commits": sums[0], "aiLines": sums[1], "humanLines": sums[2],
+            "mixedLines": sums[3], "aiShare": round(sums[1] / lines, 4) if lines else None}
+
+
+def _fold(target: Sums, sums: Sums) -> None:
+    target[0] += sums[0]
+    target[1] += sums[1]
+    target[2] += sums[2]
+    target[3] += sums[3]
+
+
+class AttributionRollup:
+    """Time-bucketed AI/human line rollups with eviction and spike detection.
+
+    Every resolution keeps ``{bucket index: {(repo, author, branch): sums}}``
+    plus a heap of bucket indices, so eviction pops expired buckets in time
+    order even when spans arrive out of order. A span older than a
+    resolution's retention only lands in the coarser resolutions that
+    still cover it. Commit ids are remembered for the hour retention, so
+    a span delivered again within it is ignored; one redelivered after
+    that is counted again in the day buckets.
+
+    Spike detection scores closed ``detect_resolution`` buckets per
+    ``detect_by`` group with at least ``min_lines`` added lines. As in
+    ``OnlineAnomalyDetector``, a bucket is scored against the baseline
+    built from earlier buckets and then folded in; ``min_std`` keeps a
+    perfectly steady author from turning every small change into a spike.
+    """
+
+    def __init__(self, retention: Optional[Dict[str, int]] = None,
+                 detect_resolution: str = "hour", detect_by: Tuple[str, ...] = ("author",),
+                 threshold: float = 3.0, alpha: float = 0.1, min_points: int = 5,
+                 min_lines: int = 20, min_std: float = 0.05, max_alerts: int = 1_000):
+        if detect_resolution not in RESOLUTIONS:
+            raise ValueError(f"Unknown resolution: {detect_resolution!r}")
+        if any(field not in GROUP_FIELDS for field in detect_by):
+            raise ValueError(f"detect_by must be drawn from {GROUP_FIELDS}")
+        self.retention = dict(DEFAULT_RETENTION, **(retention or {}))
+        self.detect_resolution = detect_resolution
+        self.detect_by = tuple(detect_by)
+        self.threshold = threshold
+        self.alpha = alpha
+        self.min_points = min_points
+        self.min_lines = min_lines
+        self.min_std = min_std
+        self.watermark = 0
+        self.buckets: Dict[str, Dict[int, Dict[Tuple[str, str, str], Sums]]] = {
+            resolution: {} for resolution in RESOLUTIONS}
+        self._heaps: Dict[str, List[int]] = {resolution: [] for resolution in RESOLUTIONS}
+        self.seen: Dict[str, int] = {}
+        self._seen_heap: List[Tuple[int, str]] = []
+        self.counts = {"spans": 0, "duplicates": 0, "late": 0, "ignored": 0}
+        self.baselines: Dict[Tuple[str, ...], Dict[str, float]] = {}
+        self._open: List[int] = []
+        self._open_set: set = set()
+        self.alerts: deque = deque(maxlen=max_alerts)
+
+    # -- ingestion ---------------------------------------------------------
+
+    def add(self, commit: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Fold one parsed commit in; returns spike alerts raised by the watermark move."""
+        commit_id = commit.get("commit_id")
+        timestamp = commit["timestamp"]
+        if commit_id and commit_id in self.seen:
+            self.counts["duplicates"] += 1
+            return []
+        key = (commit.get("repo", ""), commit.get("author", ""), commit.get("branch", ""))
+        sums = [1, commit.get("ai", 0), commit.get("human", 0), commit.get("mixed", 0)]
+        horizon = max(self.watermark, timestamp)
+        stored = False
+        for resolution, size in RESOLUTIONS.items():
+            index = timestamp // size
+            if index <= horizon // size - self.retention[resolution]:
+                continue
+            buckets = self.buckets[resolution]
+            bucket = buckets.get(index)
+            if bucket is None:
+                bucket = buckets[index] = {}
+                heapq.heappush(self._heaps[resolution], index)
+            group = bucket.get(key)
+            if group is None:
+                bucket[key] = list(sums)
+            else:
+                _fold(group, sums)
+            stored = True
+            if resolution == self.detect_resolution and index not in self._open_set \
+                    and index >= self.watermark // size:
+                self._open_set.add(index)
+                heapq.heappush(self._open, index)
+        if not stored:
+            self.counts["late"] += 1
+            return []
+        self.counts["spans"] += 1
+        if commit_id and timestamp >= self._seen_horizon(horizon):
+            self.seen[commit_id] = timestamp
+            heapq.heappush(self._seen_heap, (timestamp, commit_id))
+        return self.advance(timestamp)
+
+    def _seen_horizon(self, now: int) -> int:
+        """Start of the oldest hour bucket retained at ``now``."""
+        size = RESOLUTIONS["hour"]
+        return (now // size - self.retention["hour"] + 1) * size
+
+    def consume_span(self, span: Dict[str, Any], repo: str = "") -> List[Dict[str, Any]]:
+        commit = parse_span(span, repo)
+        if commit is None:
+            self.counts["ignored"] += 1
+            return []
+        return self.add(commit)
+
+    def consume_payload(self, payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Consume every span of an OTLP traces payload."""
+        alerts = []
+        for repo, span in iter_payload_spans(payload):
+            alerts.extend(self.consume_span(span, repo))
+        return alerts
+
+    def consume_record(self, record: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Consume a JSON document: an ``otel_export`` queue record or an OTLP payload."""
+        if "resourceSpans" in record:
+            return self.consume_payload(record)
+        if "span" in record:
+            return self.consume_span(record["span"], record.get("repo", ""))
+        self.counts["ignored"] += 1
+        return []
+
+    def advance(self, now: int) -> List[Dict[str, Any]]:
+        """Move the watermark to ``now``: evict expired buckets, score closed ones."""
+        if now <= self.watermark:
+            return []
+        self.watermark = now
+        for resolution, size in RESOLUTIONS.items():
+            oldest = now // size - self.retention[resolution]
+            heap = self._heaps[resolution]
+            while heap and heap[0] <= oldest:
+                del self.buckets[resolution][heapq.heappop(heap)]
+        horizon = self._seen_horizon(now)
+        while self._seen_heap and self._seen_heap[0][0] < horizon:
+            self.seen.pop(heapq.heappop(self._seen_heap)[1], None)
+        return self._close_buckets()
+
+    # -- spike detection ---------------------------------------------------
+
+    def _close_buckets(self) -> List[Dict[str, Any]]:
+        size = RESOLUTIONS[self.detect_resolution]
+        current = self.watermark // size
+        alerts = []
+        while self._open and self._open[0] < current:
+            index = heapq.heappop(self._open)
+            self._open_set.discard(index)
+            bucket = self.buckets[self.detect_resolution].get(index)
+            if bucket is None:
+                continue
+            grouped: Dict[Tuple[str, ...], Sums] = {}
+            for key, sums in bucket.items():
+                group_key = tuple(key[GROUP_FIELDS.index(field)] for field in self.detect_by)
+                _fold(grouped.setdefault(group_key, [0, 0, 0, 0]), sums)
+            for group_key, sums in sorted(grouped.items()):
+                lines = sums[1] + sums[2] + sums[3]
+                if lines < self.min_lines:
+                    continue
+                alert = self._score(group_key, sums[1] / lines, index * size, sums)
+                if alert is not None:
+                    alerts.append(alert)
+        self.alerts.extend(alerts)
+        return alerts
+
+    def _score(self, group_key: Tuple[str, ...], share: float, start: int,
+               sums: Sums) -> Optional[Dict[str, Any]]:
+        """Score a closed bucket's AI share, then fold it into the EWMA baseline."""
+        baseline = self.baselines.get(group_key)
+        if baseline is None:
+            baseline = self.baselines[group_key] = {"count": 0, "mean": 0.0, "var": 0.0}
+        alert = None
+        if baseline["count"] >= self.min_points:
+            std = max(math.sqrt(max(baseline["var"], 0.0)), self.min_std)
+            z_score = (share - baseline["mean"]) / std
+            if z_score > self.threshold:
+                alert = {**dict(zip(self.detect_by, group_key)),
+                         "resolution": self.detect_resolution, "bucket_start": start,
+                         "aiShare": round(share, 4), "baselineShare": round(baseline["mean"], 4),
+                         "z_score": round(z_score, 2), **_entry(sums)}
+        baseline["count"] += 1
+        if baseline["count"] == 1:
+            baseline["mean"] = share
+        else:
+            diff = share - baseline["mean"]
+            increment = self.alpha * diff
+            baseline["mean"] += increment
+            baseline["var"] = (1 - self.alpha) * (baseline["var"] + diff * increment)
+        return alert
+
+    # -- queries -----------------------------------------------------------
+
+    def pick_resolution(self, window: int) -> str:
+        """Finest resolution whose retention covers ``window`` seconds."""
+        for resolution, size in RESOLUTIONS.items():
+            if window <= size * (self.retention[resolution] - 1):
+                return resolution
+        return "day"
+
+    def _window(self, window: int, resolution: Optional[str],
+                now: Optional[int]) -> Tuple[str, int, int]:
+        resolution = resolution or self.pick_resolution(window)
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Unknown resolution: {resolution!r}")
+        size = RESOLUTIONS[resolution]
+        now = self.watermark if now is None else now
+        return resolution, (now - window) // size, now // size
+
+    def _plan(self, resolution: str, first: int, last: int) -> List[Tuple[str, int]]:
+        """Cover buckets ``first..last`` of ``resolution`` with as few buckets as possible.
+
+        Whole hours and days inside the range come from the coarser
+        resolutions, which always retain at least as far back.
+        """
+        names = list(RESOLUTIONS)
+        coarser = names[names.index(resolution):][::-1]
+        size = RESOLUTIONS[resolution]
+        start, end = first * size, (last + 1) * size
+        plan = []
+        while start < end:
+            for name in coarser:
+                step = RESOLUTIONS[name]
+                if start % step == 0 and start + step <= end:
+                    plan.append((name, start // step))
+                    start += step
+                    break
+        return plan
+
+    def query(self, window: int, group_by: Iterable[str] = ("author",),
+              resolution: Optional[str] = None, now: Optional[int] = None,
+              **filters: Optional[str]) -> Dict[str, Any]:
+        """Totals and per-group rows over the last ``window`` seconds before ``now``.
+
+        ``now`` defaults to the watermark. The window is widened to whole
+        buckets of the finest resolution whose retention covers it, and
+        read from coarser buckets wherever they fit; passing ``resolution``
+        reads that resolution only. Filters are ``repo``, ``author`` and
+        ``branch``.
+        """
+        group_by = tuple(group_by)
+        positions = [GROUP_FIELDS.index(field) for field in group_by]
+        checks = [(GROUP_FIELDS.index(field), value) for field, value in filters.items()
+                  if value is not None]
+        fixed = resolution is not None
+        resolution, first, last = self._window(window, resolution, now)
+        plan = ([(resolution, index) for index in range(first, last + 1)] if fixed
+                else self._plan(resolution, first, last))
+        totals = [0, 0, 0, 0]
+        groups: Dict[Tuple[str, ...], Sums] = {}
+        scanned = 0
+        for name, index in plan:
+            bucket = self.buckets[name].get(index)
+            if bucket is None:
+                continue
+            scanned += 1
+            for key, sums in bucket.items():
+                if checks and any(key[position] != value for position, value in checks):
+                    continue
+                _fold(totals, sums)
+                group_key = tuple([key[position] for position in positions])
+                group = groups.get(group_key)
+                if group is None:
+                    groups[group_key] = list(sums)
+                else:
+                    _fold(group, sums)
+        size = RESOLUTIONS[resolution]
+        rows = [{**dict(zip(group_by, group_key)), **_entry(sums)}
+                for group_key, sums in sorted(groups.items(), key=lambda item: -item[1][1])]
+        return {"resolution": resolution, "since": first * size, "until": (last + 1) * size,
+                "buckets": scanned, "total": _entry(totals), "groups": rows}
+
+    def series(self, window: int, resolution: Optional[str] = None, now: Optional[int] = None,
+               smooth: int = 1, **filters: Optional[str]) -> List[Dict[str, Any]]:
+        """One point per bucket in the window, with a trailing moving average of AI share.
+
+        Like ``calculate_moving_average``, the average covers the last
+        ``smooth`` buckets (fewer at the start); empty buckets count as gaps.
+        """
+        resolution, first, last = self._window(window, resolution, now)
+        size = RESOLUTIONS[resolution]
+        buckets = self.buckets[resolution]
+        checks = [(GROUP_FIELDS.index(field), value) for field, value in filters.items()
+                  if value is not None]
+        points = []
+        recent: deque = deque(maxlen=max(1, smooth))
+        for index in range(first, last + 1):
+            sums = [0, 0, 0, 0]
+            for key, group in (buckets.get(index) or {}).items():
+                if not any(key[position] != value for position, value in checks):
+                    _fold(sums, group)
+            point = {"start": index * size, **_entry(sums)}
+            recent.append(sums)
+            ai = sum(item[1] for item in recent)
+            lines = sum(item[1] + item[2] + item[3] for item in recent)
+            point["movingAiShare"] = round(ai / lines, 4) if lines else None
+            points.append(point)
+        return points
+
+    # -- persistence -------------------------------------------------------
+
+    def to_state(self) -> Dict[str, Any]:
+        """Return a JSON-serializable snapshot of buckets, baselines and alerts."""
+        return {
+            "retention": self.retention,
+            "detect_resolution": self.detect_resolution,
+            "detect_by": list(self.detect_by),
+            "threshold": self.threshold,
+            "alpha": self.alpha,
+            "min_points": self.min_points,
+            "min_lines": self.min_lines,
+            "min_std": self.min_std,
+            "watermark": self.watermark,
+            "buckets": {resolution: [[index, [[*key, *sums] for key, sums in bucket.items()]]
+                                     for index, bucket in buckets.items()]
+                        for resolution, buckets in self.buckets.items()},
+            "open": sorted(self._open_set),
+            "seen": self.seen,
+            "counts": self.counts,
+            "baselines": [[list(key), baseline] for key, baseline in self.baselines.items()],
+            "alerts": list(self.alerts)
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "AttributionRollup":
+        """Restore a rollup from ``to_state`` output."""
+        rollup = cls(state["retention"], state["detect_resolution"], tuple(state["detect_by"]),
+                     state["threshold"], state["alpha"], state["min_points"],
+                     state["min_lines"], state["min_std"])
+        rollup.watermark = state["watermark"]
+        for resolution, buckets in state["buckets"].items():
+            for index, rows in buckets:
+                rollup.buckets[resolution][index] = {tuple(row[:3]): row[3:] for row in rows}
+            rollup._heaps[resolution] = sorted(rollup.buckets[resolution])
+        rollup._open = list(state["open"])
+        rollup._open_set = set(rollup._open)
+        rollup.seen = dict(state["seen"])
+        rollup._seen_heap = sorted((stamp, commit_id) for commit_id, stamp in rollup.seen.items())
+        rollup.counts.update(state["counts"])
+        rollup.baselines = {tuple(key): baseline for key, baseline in state["baselines"]}
+        rollup.alerts.extend(state["alerts"])
+        return rollup
+
+
+class RollupFile:
+    """Load, update and save a rollup under an exclusive ``flock``.
+
+    With ``readonly`` the state is loaded under a shared lock and never
+    saved back.
+    """
+
+    def __init__(self, path: str, readonly: bool = False):
+        self.path = path
+        self.readonly = readonly
+        self.rollup: Optional[AttributionRollup] = None
+        self._lock = None
+
+    def __enter__(self) -> AttributionRollup:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = open(self.path + ".lock", "a")
+        fcntl.flock(self._lock, fcntl.LOCK_SH if self.readonly else fcntl.LOCK_EX)
+        try:
+            with open(self.path) as handle:
+                self.rollup = AttributionRollup.from_state(json.load(handle))
+        except FileNotFoundError:
+            self.rollup = AttributionRollup()
+        return self.rollup
+
+    def save(self) -> None:
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as handle:
+            json.dump(self.rollup.to_state(), handle, separators=(",", ":"))
+        os.replace(temp_path, self.path)
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        try:
+            if exc_type is None and not self.readonly:
+                self.save()
+        finally:
+            self._lock.close()
+
+
+def read_documents(path: str) -> Iterator[Dict[str, Any]]:
+    """JSON documents from a JSONL file (queue, dead-letter) or one JSON payload file."""
+    with open(path) as handle:
+        text = handle.read()
+    try:
+        yield json.loads(text)
+        return
+    except ValueError:
+        pass
+    for line in text.splitlines():
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError:
+                continue
+
+
+def bench(commits: int, seed: int = 7) -> None:
+    """Stream synthetic commits with one injected AI spike; time ingestion and queries."""
+    rng = random.Random(seed)
+    authors = [f"Dev {index}" for index in range(50)]
+    start_time = 1_700_000_000
+    step = 60 * 86_400 // commits
+    spike_author = authors[7]
+    # The hour of spike_author's first commit 40 days in gets a burst of AI lines
+    first_spike = next(index for index in range(7, commits, len(authors))
+                       if index * step >= 40 * 86_400)
+    spike_hour = (start_time + first_spike * step) // 3_600
+    stream = []
+    for index in range(commits):
+        timestamp = start_time + index * step
+        author = authors[index % len(authors)]
+        ai = rng.randint(0, 10)
+        if author == spike_author and timestamp // 3_600 == spike_hour:
+            ai = 60
+        stream.append({"commit_id": f"{index:040x}", "repo": f"repo-{index % 5}",
+                       "author": author, "branch": f"branch-{index % 20}",
+                       "timestamp": timestamp, "ai": ai, "human": rng.randint(10, 30),
+                       "mixed": rng.randint(0, 2)})
+
+    rollup = AttributionRollup()
+    began = time.perf_counter()
+    alerts = []
+    for commit in stream:
+        alerts.extend(rollup.add(commit))
+    elapsed = time.perf_counter() - began
+    buckets = {resolution: len(buckets) for resolution, buckets in rollup.buckets.items()}
+    print(f"Ingested {commits:,} commits in {elapsed:.2f}s ({commits / elapsed:,.0f}/s); "
+          f"buckets kept: {buckets}, commit ids kept: {len(rollup.seen):,}")
+
+    now = stream[-1]["timestamp"]
+    for label, window, filters in (("7d by author", 7 * 86_400, {}),
+                                   ("24h by author", 86_400, {}),
+                                   ("2h by author", 7_200, {}),
+                                   ("30d, one author", 30 * 86_400, {"author": authors[3]})):
+        began = time.perf_counter()
+        result = rollup.query(window, now=now, **filters)
+        query_ms = (time.perf_counter() - began) * 1e3
+        began = time.perf_counter()
+        expected = [0, 0, 0, 0]
+        for commit in stream:
+            if result["since"] <= commit["timestamp"] < result["until"] and \
+                    all(commit[field] == value for field, value in filters.items()):
+                _fold(expected, [1, commit["ai"], commit["human"], commit["mixed"]])
+        scan_ms = (time.perf_counter() - began) * 1e3
+        print(f"{label:<16} {result['resolution']:<6} {result['buckets']:>4} buckets "
+              f"{query_ms:>7.2f} ms (full scan {scan_ms:>7.1f} ms) "
+              f"match={result['total'] == _entry(expected)}")
+    spikes = [alert for alert in alerts if alert["author"] == spike_author]
+    print(f"{len(alerts)} spike alert(s); injected spike at hour {spike_hour * 3_600} "
+          f"detected: {any(alert['bucket_start'] == spike_hour * 3_600 for alert in spikes)}")
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--state", help=f"state file (default: commit_logs/{STATE_NAME})")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    add_parser = subparsers.add_parser("add", help="fold commits in after they are made")
+    add_parser.add_argument("commits", nargs="*", default=["HEAD"])
+    ingest_parser = subparsers.add_parser("ingest", help="fold in queue records or OTLP payloads")
+    ingest_parser.add_argument("files", nargs="+")
+    for name, text in (("query", "per-group totals over a window"),
+                       ("series", "per-bucket points over a window")):
+        query_parser = subparsers.add_parser(name, help=text)
+        query_parser.add_argument("--window", default="7d", help="e.g. 90m, 24h, 7d")
+        query_parser.add_argument("--resolution", choices=list(RESOLUTIONS))
+        query_parser.add_argument("--now", type=int,
+                                  help="window end (default: current time); read-only")
+        for field in GROUP_FIELDS:
+            query_parser.add_argument(f"--{field}")
+        if name == "query":
+            query_parser.add_argument("--by", default="author",
+                                      help="comma separated fields from repo,author,branch")
+        else:
+            query_parser.add_argument("--smooth", type=int, default=1,
+                                      help="buckets in the moving average of AI share")
+    alerts_parser = subparsers.add_parser("alerts", help="recent AI share spikes")
+    alerts_parser.add_argument("--limit", type=int, default=20)
+    collector_parser = subparsers.add_parser("collector", help="OTLP receiver feeding the rollup")
+    collector_parser.add_argument("--port", type=int, default=4318)
+    collector_parser.add_argument("--interval", type=float, default=5.0,
+                                  help="seconds between folds into the state file")
+    bench_parser = subparsers.add_parser("bench", help="benchmark on synthetic commits")
+    bench_parser.add_argument("--commits", type=int, default=200_000)
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        bench(args.commits)
+        return 0
+    state_path = args.state or os.path.join(commit_logs_dir(repository_root()), STATE_NAME)
+
+    if args.command == "collector":
+        # Payloads are buffered and folded in batches, so the state file is
+        # only locked for a load-fold-save and post-commit can still update it
+        pending: List[Dict[str, Any]] = []
+        lock = threading.Lock()
+
+        def on_payload(payload: Dict[str, Any]) -> None:
+            with lock:
+                pending.append(payload)
+
+        def fold() -> None:
+            with lock:
+                payloads = pending[:]
+                del pending[:]
+            if not payloads:
+                return
+            try:
+                with RollupFile(state_path) as rollup:
+                    alerts = [alert for payload in payloads
+                              for alert in rollup.consume_payload(payload)]
+            except BaseException:
+                with lock:
+                    pending[:0] = payloads
+                raise
+            for alert in alerts:
+                print(f"AI share spike: {json.dumps(alert)}", flush=True)
+
+        collector = StandInCollector(port=args.port, on_payload=on_payload).start()
+        print(f"Rollup collector listening on {collector.endpoint}/v1/traces", flush=True)
+        try:
+            while True:
+                time.sleep(args.interval)
+                fold()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            collector.close()
+        fold()
+        return 0
+
+    # A query for an explicit --now only reads; moving the watermark to it
+    # would evict buckets for good if it lies in the future
+    readonly = args.command in ("query", "series") and args.now is not None
+    with RollupFile(state_path, readonly) as rollup:
+        alerts = []
+        if args.command == "add":
+            root = repository_root()
+            for commit in args.commits:
+                meta = commit_metadata(commit, root)
+                stats = collect_stats(meta["commit_id"],
+                                      os.path.join(commit_logs_dir(root), meta["commit_id"]), root)
+                alerts.extend(rollup.consume_record(build_span(meta, stats)))
+        elif args.command == "ingest":
+            for path in args.files:
+                for document in read_documents(path):
+                    alerts.extend(rollup.consume_record(document))
+            print(f"{rollup.counts['spans']:,} span(s) in the rollup, "
+                  f"{rollup.counts['duplicates']:,} duplicate(s), {rollup.counts['late']:,} "
+                  f"past retention")
+        elif args.command in ("query", "series"):
+            now = args.now
+            if now is None:
+                now = int(time.time())
+                alerts.extend(rollup.advance(now))
+            filters = {field: getattr(args, field) for field in GROUP_FIELDS
+                       if getattr(args, field) is not None}
+            window = parse_window(args.window)
+            if args.command == "query":
+                result = rollup.query(window, args.by.split(","), args.resolution, now, **filters)
+            else:
+                result = rollup.series(window, args.resolution, now, args.smooth, **filters)
+            print(json.dumps(result, indent=2))
+        elif args.command == "alerts":
+            print(json.dumps(list(rollup.alerts)[-args.limit:], indent=2))
+        for alert in alerts:
+            print(f"AI share spike: {json.dumps(alert)}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
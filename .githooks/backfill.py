@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Historical backfill of commit attribution stats
+Walks a commit range with a single ``git log`` process and writes the
+``commit_logs/<hash>/stats.json`` files that post-commit would have
+produced, in parallel and resumably:
+
+    backfill.py run [RANGE]               # e.g. main, v1.0..HEAD (default HEAD)
+    backfill.py run --source numstat      # no git-ai: derive from diffs
+    backfill.py bench --commits 100000    # synthetic repository benchmark
+
+``--source git-ai`` (the default) runs ``git-ai stats`` for each commit on
+a pool of ``--workers`` threads. ``--source numstat`` computes stats from
+the same ``git log --numstat`` stream without any per-commit process,
+counting every added line as human: the right answer for history that
+predates git-ai checkpoints, and what makes 100k-commit backfills take
+seconds. Commits that already have a ``stats.json`` are skipped, except
+numstat-derived ones when backfilling from git-ai, and the last in-order
+commit is checkpointed so an interrupted run resumes where it stopped
+(commits added on top of the range since then are picked up too).
+Commits git-ai fails on get no ``stats.json`` and are retried next run.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, Iterable, Iterator, Optional
+
+from otel_export import (COMMIT_FORMAT, NUMSTAT_SOURCE, SpanQueue, build_span,
+                         commit_logs_dir, git, git_ai_stats, load_stats, parse_commit,
+                         repository_root)
+
+# Separates commits in the ``git log`` stream; numstat lines follow each header
+RECORD_MARK = "\x1e"
+CHECKPOINT_FILE = "backfill-checkpoint.json"
+
+
+def iter_commits(root: str, revision_range: str = "HEAD",
+                 numstat: bool = False) -> Iterator[Dict[str, Any]]:
+    """Stream commit metadata (and added/deleted line counts) from one git process."""
+    command = ["git", "log", f"--format={RECORD_MARK}{COMMIT_FORMAT}", "--no-renames"]
+    if numstat:
+        command.append("--numstat")
+    command.append(revision_range)
+    process = subprocess.Popen(command, cwd=root, stdout=subprocess.PIPE, text=True,
+                               encoding="utf-8", errors="replace", bufsize=1 << 16)
+    commit = None
+    finished = False
+    try:
+        for line in process.stdout:
+            if line.startswith(RECORD_MARK):
+                if commit is not None:
+                    yield commit
+                commit = parse_commit(line[1:].rstrip("\n"))
+                commit["additions"] = commit["deletions"] = commit["files"] = 0
+            elif commit is not None and line != "\n":
+                added, deleted, _ = line.split("\t", 2)
+                commit["files"] += 1
+                if added != "-":
+                    commit["additions"] += int(added)
+                    commit["deletions"] += int(deleted)
+        finished = True
+    finally:
+        process.stdout.close()
+        if not finished and process.poll() is None:
+            process.terminate()
+        process.wait()
+    # git failing part-way also ends the stream; don't mistake that for the end of history
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, command)
+    if commit is not None:
+        yield commit
+
+
+def numstat_stats(commit: Dict[str, Any]) -> str:
+    """Stats for a commit without git-ai attribution: every added line is human."""
+    return json.dumps({
+        "human_additions": commit["additions"],
+        "ai_additions": 0,
+        "mixed_additions": 0,
+        "total_additions": commit["additions"],
+        "total_deletions": commit["deletions"],
+        "files_changed": commit["files"],
+        "source": NUMSTAT_SOURCE
+    })
+
+
+def write_stats(commit_dir: str, stats: str) -> None:
+    os.makedirs(commit_dir, exist_ok=True)
+    temp_path = os.path.join(commit_dir, f"stats.json.{os.getpid()}.tmp")
+    with open(temp_path, "w") as handle:
+        handle.write(stats)
+    os.replace(temp_path, os.path.join(commit_dir, "stats.json"))
+
+
+def ordered_map(executor: ThreadPoolExecutor, func: Callable[[Any], Any],
+                items: Iterable[Any], max_in_flight: int) -> Iterator[Any]:
+    """``executor.map`` that pulls lazily, keeping at most ``max_in_flight`` pending."""
+    pending: deque = deque()
+    for item in items:
+        pending.append(executor.submit(func, item))
+        if len(pending) >= max_in_flight:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+class Checkpoint:
+    """Last completed commit per revision range, saved atomically."""
+
+    def __init__(self, path: str):
+        self.path = path
+        try:
+            with open(path) as handle:
+                self.ranges: Dict[str, Any] = json.load(handle)
+        except (OSError, ValueError):
+            self.ranges = {}
+
+    def last(self, revision_range: str) -> Optional[str]:
+        return self.ranges.get(revision_range, {}).get("last")
+
+    def save(self, revision_range: str, last: str, done: int, complete: bool = False,
+             source: str = "git-ai") -> None:
+        self.ranges[revision_range] = {"last": last, "done": done, "complete": complete,
+                                       "source": source, "updated": time.time()}
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as handle:
+            json.dump(self.ranges, handle, indent=2)
+        os.replace(temp_path, self.path)
+
+
+class Backfill:
+    """Backfills ``stats.json`` for every commit of a range.
+
+    Commits stream from ``iter_commits``; with the git-ai source each one
+    is handled on a thread pool (the work is waiting on ``git-ai``
+    processes), with at most ``4 * workers`` in flight so memory stays flat
+    on any history size. Results come back in log order, which lets the
+    checkpoint record a single "last done" commit every
+    ``checkpoint_every`` commits.
+    """
+
+    SOURCES = ("git-ai", "numstat")
+
+    def __init__(self, root: str, source: str = "git-ai", workers: Optional[int] = None,
+                 force: bool = False, checkpoint_every: int = 1_000,
+                 queue: Optional[SpanQueue] = None, branch: Optional[str] = None):
+        if source not in self.SOURCES:
+            raise ValueError(f"Unknown stats source: {source!r}")
+        self.root = root
+        self.logs = commit_logs_dir(root)
+        self.source = source
+        self.workers = workers or min(32, (os.cpu_count() or 1) * 4)
+        self.force = force
+        self.checkpoint_every = checkpoint_every
+        self.queue = queue
+        self.branch = branch
+        self.counts = {"seen": 0, "written": 0, "skipped": 0, "failed": 0, "resumed_past": 0}
+
+    def _load(self, commit_id: str) -> Optional[str]:
+        """Existing stats this source would keep (None if the commit needs work)."""
+        return load_stats(os.path.join(self.logs, commit_id), numstat=self.source == "numstat")
+
+    def _process(self, commit: Dict[str, Any]) -> Dict[str, Any]:
+        stats = None if self.force else self._load(commit["commit_id"])
+        commit["status"] = "skipped"
+        if stats is None:
+            if self.source == "numstat":
+                stats = numstat_stats(commit)
+            else:
+                stats = git_ai_stats(commit["commit_id"], cwd=self.root)
+            if stats is None:
+                commit["status"] = "failed"
+            else:
+                write_stats(os.path.join(self.logs, commit["commit_id"]), stats)
+                commit["status"] = "written"
+        commit["stats"] = stats
+        return commit
+
+    def _pending(self, commits: Iterator[Dict[str, Any]], resume_after: Optional[str]
+                 ) -> Iterator[Dict[str, Any]]:
+        if resume_after is None:
+            yield from commits
+            return
+        buffered = []
+        for commit in commits:
+            if commit["commit_id"] == resume_after:
+                # Commits listed before the checkpoint were done in the interrupted
+                # run, except ones added since (e.g. new commits on HEAD)
+                self.counts["resumed_past"] = len(buffered) + 1
+                buffered = [commit for commit in buffered
+                            if self._load(commit["commit_id"]) is None]
+                self.counts["resumed_past"] -= len(buffered)
+                break
+            buffered.append(commit)
+        # Without the checkpointed commit (history rewritten) this starts over
+        yield from buffered
+        yield from commits
+
+    def run(self, revision_range: str = "HEAD", resume: bool = True,
+            progress: Optional[Callable[[Dict[str, int]], None]] = None) -> Dict[str, int]:
+        """Backfill ``revision_range`` and return the counters."""
+        os.makedirs(self.logs, exist_ok=True)
+        checkpoint = Checkpoint(os.path.join(self.logs, CHECKPOINT_FILE))
+        previous = checkpoint.ranges.get(revision_range, {})
+        resume_after = previous.get("last") if resume and not previous.get("complete") \
+            and previous.get("source", "git-ai") == self.source else None
+        done = previous.get("done", 0) if resume_after else 0
+        if self.branch is None and self.queue is not None:
+            self.branch = git("rev-parse", "--abbrev-ref", "HEAD", cwd=self.root) or "unknown"
+        repo = os.path.basename(self.root)
+
+        commits = self._pending(
+            iter_commits(self.root, revision_range, numstat=self.source == "numstat"),
+            resume_after)
+        last = resume_after
+        spans = []
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            if self.source == "numstat":
+                results: Iterator[Dict[str, Any]] = map(self._process, commits)
+            else:
+                results = ordered_map(executor, self._process, commits, 4 * self.workers)
+            for commit in results:
+                self.counts["seen"] += 1
+                self.counts[commit["status"]] += 1
+                done += 1
+                last = commit["commit_id"]
+                if self.queue is not None and commit["status"] == "written":
+                    spans.append(build_span(dict(commit, branch=self.branch, repo=repo),
+                                            commit["stats"]))
+                if done % self.checkpoint_every == 0:
+                    if spans:
+                        self.queue.append(spans)
+                        spans = []
+                    checkpoint.save(revision_range, last, done, source=self.source)
+                    if progress:
+                        progress(self.counts)
+        if spans:
+            self.queue.append(spans)
+        if last is not None:
+            checkpoint.save(revision_range, last, done, complete=True, source=self.source)
+        return self.counts
+
+
+def synthetic_repository(path: str, commits: int, files: int = 50) -> None:
+    """Create a repository with ``commits`` small commits via ``git fast-import``."""
+    subprocess.run(["git", "init", "-q", path], check=True)
+    stream = []
+    timestamp = 1_700_000_000
+    for i in range(commits):
+        name = f"file_{i % files}.txt"
+        content = f"line {i}\n" * (1 + i % 5)
+        message = f"Synthetic commit {i}"
+        stream.append(
+            f"commit refs/heads/main\nmark :{i + 1}\n"
+            f"author Dev {i % 7} <dev{i % 7}@example.com> {timestamp + i * 60} +0000\n"
+            f"committer Dev {i % 7} <dev{i % 7}@example.com> {timestamp + i * 60} +0000\n"
+            f"data {len(message)}\n{message}\n"
+            + (f"from :{i}\n" if i else "")
+            + f"M 644 inline {name}\ndata {len(content)}\n{content}\n")
+    subprocess.run(["git", "fast-import", "--quiet"], cwd=path, check=True,
+                   input="".join(stream).encode())
+    subprocess.run(["git", "symbolic-ref", "HEAD", "refs/heads/main"], cwd=path, check=True)
+
+
+def bench(commits: int, stub_commits: int, workers: Optional[int]) -> None:
+    """Time numstat and (stubbed) git-ai backfills on a synthetic repository."""
+    work = tempfile.mkdtemp(prefix="backfill-bench-")
+    try:
+        repo = os.path.join(work, "repo")
+        start = time.perf_counter()
+        synthetic_repository(repo, commits)
+        print(f"Created {commits:,} commits in {time.perf_counter() - start:.1f}s")
+
+        stub = os.path.join(work, "git-ai")
+        with open(stub, "w") as handle:
+            handle.write('#!/bin/sh\necho \'{"ai_additions": 1, "human_additions": 2, '
+                         '"mixed_additions": 0}\'\n')
+        os.chmod(stub, 0o755)
+        os.environ["GIT_AI_BIN"] = stub
+
+        runs = [("numstat", "numstat", "HEAD", False),
+                ("numstat, resumed (all done)", "numstat", "HEAD", True),
+                ("git-ai stub", "git-ai", f"HEAD~{stub_commits}..HEAD", False)]
+        print(f"{'run':<28} {'commits':>9} {'written':>9} {'seconds':>8} {'commits/s':>10}")
+        for label, source, revision_range, keep in runs:
+            if not keep:
+                shutil.rmtree(commit_logs_dir(repo), ignore_errors=True)
+            backfill = Backfill(repo, source, workers, force=False)
+            start = time.perf_counter()
+            counts = backfill.run(revision_range)
+            elapsed = time.perf_counter() - start
+            print(f"{label:<28} {counts['seen']:>9,} {counts['written']:>9,} "
+                  f"{elapsed:>8.2f} {counts['seen'] / elapsed if elapsed else 0:>10,.0f}")
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="backfill a commit range")
+    run_parser.add_argument("range", nargs="?", default="HEAD",
+                            help="revision range passed to git log (default: HEAD)")
+    run_parser.add_argument("--source", choices=Backfill.SOURCES, default="git-ai",
+                            help="run git-ai stats per commit, or derive stats from numstat")
+    run_parser.add_argument("--workers", type=int, help="parallel git-ai processes")
+    run_parser.add_argument("--force", action="store_true", help="recompute existing stats.json")
+    run_parser.add_argument("--restart", action="store_true", help="ignore the checkpoint")
+    run_parser.add_argument("--export", action="store_true",
+                            help="queue a span per backfilled commit for otel_export.py flush")
+
+    bench_parser = subparsers.add_parser("bench", help="benchmark on a synthetic repository")
+    bench_parser.add_argument("--commits", type=int, default=100_000)
+    bench_parser.add_argument("--stub-commits", type=int, default=2_000,
+                              help="commits to backfill through the stub git-ai")
+    bench_parser.add_argument("--workers", type=int)
+
+    args = parser.parse_args()
+    if args.command == "bench":
+        bench(args.commits, min(args.stub_commits, args.commits - 1), args.workers)
+        return 0
+
+    root = repository_root()
+    queue = SpanQueue(os.path.join(commit_logs_dir(root), "otel-queue")) if args.export else None
+    backfill = Backfill(root, args.source, args.workers, args.force, queue=queue)
+    start = time.perf_counter()
+    counts = backfill.run(args.range, resume=not args.restart,
+                          progress=lambda c: print(f"{c['seen']:,} commits...", file=sys.stderr))
+    elapsed = time.perf_counter() - start
+    if counts["resumed_past"]:
+        print(f"Resumed after {counts['resumed_past']:,} already checkpointed commits")
+    print(f"Backfilled {counts['seen']:,} commits in {elapsed:.1f}s: "
+          f"{counts['written']:,} written, {counts['skipped']:,} already present")
+    if counts["failed"]:
+        print(f"git-ai failed on {counts['failed']:,} commit(s); run again to retry them",
+              file=sys.stderr)
+    if queue is not None:
+        print(f"{queue.depth():,} span(s) queued; run otel_export.py flush to send them")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,492 @@
+#!/usr/bin/env python3
+"""
+Coalescing daemon for the Windsurf checkpoint hooks
+Each ``pre_write_code``/``post_write_code`` hook used to start a shell,
+``jq`` and its own ``git-ai checkpoint`` process in the editor write
+path. With this daemon the hook commands send the checkpoint event over
+a per-workspace Unix socket and return as soon as it is acknowledged.
+
+- ``ai_agent`` events are acknowledged at once and held for a short
+  window; events for the same conversation are merged into one
+  checkpoint whose ``edited_filepaths`` lists every file written in the
+  window, so a burst of 50 writes runs ``git-ai`` a handful of times.
+- ``human`` events mark the boundary before an agent write, so they
+  cannot be deferred: one that arrives with no agent writes pending
+  runs ``git-ai`` synchronously before it is acknowledged. One that
+  arrives while agent writes are pending is acknowledged immediately and
+  dropped, because recording it after the agent's writes would
+  attribute those writes to the human; once the pending writes are
+  flushed, the next ``human`` event is recorded again.
+
+    checkpoint_daemon.py send human|ai_agent  # hook command, reads stdin
+    checkpoint_daemon.py flush                # run pending checkpoints now
+    checkpoint_daemon.py status               # counters and latency percentiles
+    checkpoint_daemon.py stop
+    checkpoint_daemon.py stand-in PATH        # stub git-ai for tests
+    checkpoint_daemon.py bench --files 50     # direct hooks vs the daemon
+
+``send`` starts the daemon on first use and runs ``git-ai`` directly for
+that event. ``GIT_AI_BIN`` overrides the ``git-ai`` executable and
+``GIT_AI_CHECKPOINT_DAEMON=0`` makes every hook run it directly.
+"""
+
+import time
+
+# Taken before the other imports, so hook latency includes them
+_STARTED = time.time()
+
+import os
+import sys
+import json
+import math
+import fcntl
+import shutil
+import socket
+import hashlib
+import argparse
+import tempfile
+import threading
+import subprocess
+import socketserver
+from collections import deque
+from typing import List, Dict, Any, Deque, Iterable, Optional, Tuple
+
+EVENT_TYPES = ("human", "ai_agent")
+
+
+def git_ai_command() -> List[str]:
+    return [os.environ.get("GIT_AI_BIN", "git-ai"), "checkpoint", "agent-v1", "--hook-input", "stdin"]
+
+
+def socket_path(workspace: str) -> str:
+    """Per-user, per-workspace socket path (``GIT_AI_CHECKPOINT_SOCKET`` overrides it)."""
+    override = os.environ.get("GIT_AI_CHECKPOINT_SOCKET")
+    if override:
+        return override
+    digest = hashlib.sha1(os.path.realpath(workspace).encode()).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f"git-ai-checkpoints-{os.getuid()}-{digest}.sock")
+
+
+def build_event(kind: str, hook_input: Dict[str, Any], workspace: str) -> Dict[str, Any]:
+    """The ``git-ai checkpoint agent-v1`` input the hooks used to build with jq."""
+    if kind == "human":
+        return {"type": "human", "repo_working_dir": workspace}
+    tool_info = hook_input.get("tool_info") or {}
+    event = dict(hook_input)
+    event.update({
+        "type": "ai_agent",
+        "repo_working_dir": workspace,
+        "transcript": {"messages": []},
+        "agent_name": "windsurf",
+        "conversation_id": hook_input.get("trajectory_id"),
+        "model": "unknown",
+        "edited_filepaths": [tool_info.get("file_path")]
+    })
+    return event
+
+
+def percentiles(samples: Iterable[float]) -> Dict[str, Any]:
+    """Nearest-rank p50/p90/p99/max of samples in seconds, reported in milliseconds."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {"count": 0}
+    summary: Dict[str, Any] = {"count": len(ordered)}
+    for name, fraction in (("p50", 0.50), ("p90", 0.90), ("p99", 0.99)):
+        index = max(0, math.ceil(len(ordered) * fraction) - 1)
+        summary[name] = round(ordered[index] * 1000, 2)
+    summary["max"] = round(ordered[-1] * 1000, 2)
+    return summary
+
+
+class CheckpointCoalescer:
+    """Merges checkpoint events and runs ``git-ai`` in batches.
+
+    ``ai_agent`` events are keyed by workspace, agent, conversation and
+    model; the first pending event starts a ``window`` second timer, after
+    which (or once ``max_files`` files are pending) a background thread
+    runs one ``git-ai checkpoint`` per key. All ``git-ai`` runs are
+    serialized, so checkpoints reach git-ai in the order they were taken.
+    """
+
+    def __init__(self, command: Optional[List[str]] = None, window: float = 1.0,
+                 max_files: int = 200, timeout: float = 60.0,
+                 samples: int = 10_000):
+        self.command = command or git_ai_command()
+        self.window = window
+        self.max_files = max_files
+        self.timeout = timeout
+        self.counts = {"events": 0, "human": 0, "ai_agent": 0, "coalesced": 0,
+                       "git_ai_runs": 0, "failures": 0, "batches": 0}
+        self.latency: Dict[str, Deque[float]] = {kind: deque(maxlen=samples) for kind in EVENT_TYPES}
+        self.flush_times: Deque[float] = deque(maxlen=samples)
+        self._pending: Dict[Tuple, Dict[str, Any]] = {}
+        self._pending_files = 0
+        self._deadline: Optional[float] = None
+        self._closed = False
+        self._cond = threading.Condition()
+        self._run_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._flusher, daemon=True)
+        self._thread.start()
+
+    def submit(self, event: Dict[str, Any]) -> str:
+        """Accept one event; returns "queued", "coalesced" or "recorded"."""
+        kind = event.get("type")
+        now = time.monotonic()
+        with self._cond:
+            self.counts["events"] += 1
+            if kind in self.counts:
+                self.counts[kind] += 1
+            if kind == "ai_agent":
+                key = (event.get("repo_working_dir"), event.get("agent_name"),
+                       event.get("conversation_id"), event.get("model"))
+                group = self._pending.get(key)
+                if group is None:
+                    group = self._pending[key] = {"event": event, "files": {}}
+                else:
+                    self.counts["coalesced"] += 1
+                for path in event.get("edited_filepaths") or []:
+                    if path and path not in group["files"]:
+                        group["files"][path] = None
+                        self._pending_files += 1
+                if self._deadline is None:
+                    self._deadline = now + self.window
+                if self._pending_files >= self.max_files:
+                    self._deadline = now
+                self._cond.notify()
+                return "queued"
+            if kind == "human" and self._pending:
+                self.counts["coalesced"] += 1
+                return "coalesced"
+        with self._run_lock:
+            self._run([event])
+        return "recorded"
+
+    def record_latency(self, kind: str, seconds: float) -> None:
+        if kind in self.latency:
+            self.latency[kind].append(seconds)
+
+    def flush(self) -> int:
+        """Run the pending ``ai_agent`` checkpoints now; returns how many ran."""
+        with self._run_lock:
+            with self._cond:
+                groups = list(self._pending.values())
+                self._pending = {}
+                self._pending_files = 0
+                self._deadline = None
+            events = []
+            for group in groups:
+                event = dict(group["event"])
+                event["edited_filepaths"] = list(group["files"])
+                events.append(event)
+            if events:
+                start = time.perf_counter()
+                self._run(events)
+                self.flush_times.append(time.perf_counter() - start)
+                self.counts["batches"] += 1
+            return len(events)
+
+    def _run(self, events: List[Dict[str, Any]]) -> None:
+        """Run ``git-ai checkpoint`` once per event (caller holds ``_run_lock``)."""
+        for event in events:
+            try:
+                result = subprocess.run(self.command, input=json.dumps(event), text=True,
+                                        capture_output=True, timeout=self.timeout,
+                                        cwd=event.get("repo_working_dir") or None)
+                failed = result.returncode != 0
+                detail = result.stderr.strip() or result.stdout.strip()
+            except (OSError, subprocess.TimeoutExpired) as error:
+                failed, detail = True, str(error)
+            self.counts["git_ai_runs"] += 1
+            if failed:
+                self.counts["failures"] += 1
+                print(f"git-ai checkpoint failed for {event.get('type')} event: {detail}",
+                      file=sys.stderr, flush=True)
+
+    def _flusher(self) -> None:
+        while True:
+            with self._cond:
+                while not self._closed and (self._deadline is None or
+                                            time.monotonic() < self._deadline):
+                    timeout = None if self._deadline is None else self._deadline - time.monotonic()
+                    self._cond.wait(timeout)
+                if self._closed:
+                    return
+            self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            summary: Dict[str, Any] = dict(self.counts)
+            summary["pending_files"] = self._pending_files
+            latency = {kind: list(samples) for kind, samples in self.latency.items()}
+        summary["hook_latency_ms"] = {kind: percentiles(samples) for kind, samples in latency.items()}
+        summary["flush_ms"] = percentiles(list(self.flush_times))
+        return summary
+
+    def close(self) -> None:
+        """Stop the timer thread and run whatever is still pending."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        self.flush()
+
+
+class CheckpointDaemon:
+    """Serves a ``CheckpointCoalescer`` on a Unix socket, one JSON line per request.
+
+    Requests are ``{"op": "checkpoint", "event": {...}, "started": t}``,
+    ``{"op": "flush"}``, ``{"op": "status"}`` and ``{"op": "stop"}``. The
+    daemon flushes and exits after ``idle_timeout`` seconds without
+    requests.
+    """
+
+    def __init__(self, path: str, coalescer: CheckpointCoalescer, idle_timeout: float = 1800.0):
+        self.path = path
+        self.coalescer = coalescer
+        self.idle_timeout = idle_timeout
+        self.started = time.time()
+        self._last_request = time.monotonic()
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                line = self.rfile.readline()
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    return
+                reply = daemon.dispatch(request)
+                self.wfile.write(json.dumps(reply).encode() + b"\n")
+                if request.get("op") == "stop":
+                    threading.Thread(target=daemon.server.shutdown, daemon=True).start()
+
+        if os.path.exists(path):
+            os.unlink(path)
+        self.server = socketserver.ThreadingUnixStreamServer(path, Handler)
+        self.server.daemon_threads = True
+        os.chmod(path, 0o600)
+
+    def dispatch(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        self._last_request = time.monotonic()
+        op = request.get("op")
+        if op == "checkpoint":
+            event = request.get("event") or {}
+            outcome = self.coalescer.submit(event)
+            if request.get("started"):
+                self.coalescer.record_latency(event.get("type"), time.time() - request["started"])
+            return {"ok": True, "outcome": outcome}
+        if op == "flush":
+            return {"ok": True, "flushed": self.coalescer.flush()}
+        if op == "status":
+            return {"ok": True, "pid": os.getpid(), "uptime": round(time.time() - self.started, 1),
+                    **self.coalescer.stats()}
+        if op == "stop":
+            return {"ok": True}
+        return {"ok": False, "error": f"unknown op {op!r}"}
+
+    def _watch_idle(self) -> None:
+        while time.monotonic() - self._last_request < self.idle_timeout:
+            time.sleep(min(30.0, self.idle_timeout))
+        self.server.shutdown()
+
+    def serve(self) -> None:
+        threading.Thread(target=self._watch_idle, daemon=True).start()
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            self.coalescer.close()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+
+def request(path: str, message: Dict[str, Any], timeout: float = 120.0) -> Dict[str, Any]:
+    """Send one request to the daemon; raises ``OSError`` when it is not reachable."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(path)
+        client.sendall(json.dumps(message).encode() + b"\n")
+        data = b""
+        while not data.endswith(b"\n"):
+            chunk = client.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+    return json.loads(data) if data else {"ok": False, "error": "no reply"}
+
+
+def start_daemon(workspace: str, path: str, extra_args: Iterable[str] = ()) -> None:
+    """Start a detached daemon for ``workspace``, logging to commit_logs/."""
+    logs_dir = os.path.join(workspace, "commit_logs")
+    os.makedirs(logs_dir, exist_ok=True)
+    with open(os.path.join(logs_dir, "checkpoint-daemon.log"), "a") as log:
+        subprocess.Popen([sys.executable, os.path.abspath(__file__), "--socket", path, "serve",
+                          *extra_args], cwd=workspace, stdin=subprocess.DEVNULL, stdout=log,
+                         stderr=subprocess.STDOUT, start_new_session=True)
+
+
+def send(kind: str, hook_input: Dict[str, Any], path: str, workspace: str, direct: bool) -> int:
+    """Hook entry point: hand the event to the daemon, or run git-ai directly."""
+    event = build_event(kind, hook_input, workspace)
+    if not direct:
+        try:
+            reply = request(path, {"op": "checkpoint", "event": event, "started": _STARTED})
+            return 0 if reply.get("ok") else 1
+        except (FileNotFoundError, ConnectionRefusedError):
+            start_daemon(workspace, path)
+        except (OSError, ValueError) as error:
+            # The event reached the daemon; running it again would record it twice
+            print(f"checkpoint daemon did not answer: {error}", file=sys.stderr)
+            return 0
+    return subprocess.run(git_ai_command(), input=json.dumps(event), text=True).returncode
+
+
+def serve(path: str, window: float, idle_timeout: float) -> int:
+    """Run the daemon in the foreground, unless another one holds the socket lock."""
+    lock = open(path + ".lock", "w")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        print(f"checkpoint daemon already running on {path}")
+        return 0
+    daemon = CheckpointDaemon(path, CheckpointCoalescer(window=window),
+                              idle_timeout)
+    print(f"checkpoint daemon {os.getpid()} listening on {path}", flush=True)
+    daemon.serve()
+    return 0
+
+
+def write_stand_in(path: str, log: str, delay: float = 0.02) -> str:
+    """Write a stub ``git-ai`` that appends each call (arguments, then stdin) to ``log``."""
+    with open(path, "w") as handle:
+        handle.write("#!/bin/sh\n"
+                     "input=$(cat)\n"
+                     f"sleep {delay}\n"
+                     f"printf '%s\\t%s\\n' \"$*\" \"$input\" >> '{log}'\n")
+    os.chmod(path, 0o755)
+    return path
+
+
+def read_stand_in_log(log: str) -> List[Dict[str, Any]]:
+    """Checkpoint inputs recorded by a ``write_stand_in`` stub, in call order."""
+    if not os.path.exists(log):
+        return []
+    with open(log) as handle:
+        return [json.loads(line.split("\t", 1)[1]) for line in handle if "\t" in line]
+
+
+def bench(files: int, delay: float, window: float) -> None:
+    """Replay a burst of agent writes through direct hooks and through the daemon."""
+    work = tempfile.mkdtemp(prefix="checkpoint-bench-")
+    try:
+        log = os.path.join(work, "calls.log")
+        env = dict(os.environ, GIT_AI_BIN=write_stand_in(os.path.join(work, "git-ai"), log, delay),
+                   GIT_AI_CHECKPOINT_SOCKET=os.path.join(work, "daemon.sock"))
+        script = os.path.abspath(__file__)
+
+        def hook(kind: str, hook_input: Dict[str, Any], *flags: str) -> float:
+            start = time.perf_counter()
+            subprocess.run([sys.executable, script, "send", kind, *flags], cwd=work, env=env,
+                           input=json.dumps(hook_input), text=True, check=True)
+            return time.perf_counter() - start
+
+        print(f"{files} agent writes (pre + post hook each), stand-in git-ai sleeps {delay * 1000:.0f} ms")
+        print(f"{'mode':<8} {'seconds':>8} {'git-ai runs':>12} {'hook p50 ms':>12} "
+              f"{'hook p99 ms':>12} {'files recorded':>15}")
+        for mode in ("direct", "daemon"):
+            if os.path.exists(log):
+                os.unlink(log)
+            flags = ("--direct",) if mode == "direct" else ()
+            if mode == "daemon":
+                subprocess.Popen([sys.executable, script, "serve", "--window", str(window)],
+                                 cwd=work, env=env, stdout=subprocess.DEVNULL)
+                while not os.path.exists(env["GIT_AI_CHECKPOINT_SOCKET"]):
+                    time.sleep(0.01)
+            latencies = []
+            start = time.perf_counter()
+            for index in range(files):
+                latencies.append(hook("human", {}, *flags))
+                latencies.append(hook("ai_agent", {"trajectory_id": "bench", "tool_info": {
+                    "file_path": os.path.join(work, f"src/module_{index}.py")}}, *flags))
+            if mode == "daemon":
+                request(env["GIT_AI_CHECKPOINT_SOCKET"], {"op": "flush"})
+            elapsed = time.perf_counter() - start
+            if mode == "daemon":
+                status = request(env["GIT_AI_CHECKPOINT_SOCKET"], {"op": "status"})
+                request(env["GIT_AI_CHECKPOINT_SOCKET"], {"op": "stop"})
+            calls = read_stand_in_log(log)
+            recorded = {path for call in calls for path in call.get("edited_filepaths") or []}
+            summary = percentiles(latencies)
+            print(f"{mode:<8} {elapsed:>8.2f} {len(calls):>12} {summary['p50']:>12.1f} "
+                  f"{summary['p99']:>12.1f} {len(recorded):>15}")
+        print("daemon-side hook latency (client start to ack):",
+              json.dumps(status["hook_latency_ms"]))
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+
+def main():
+    """Command line entry point used by the Windsurf hooks."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--socket", help="daemon socket (default: per workspace, in the temp dir)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    send_parser = subparsers.add_parser("send", help="hook command: send a checkpoint event")
+    send_parser.add_argument("type", choices=EVENT_TYPES)
+    send_parser.add_argument("--direct", action="store_true", help="run git-ai without the daemon")
+
+    serve_parser = subparsers.add_parser("serve", help="run the daemon in the foreground")
+    serve_parser.add_argument("--window", type=float, default=1.0,
+                              help="seconds to hold agent checkpoints before a flush")
+    serve_parser.add_argument("--idle-timeout", type=float, default=1800.0)
+
+    subparsers.add_parser("flush", help="run pending checkpoints now")
+    subparsers.add_parser("status", help="print counters and hook latency percentiles")
+    subparsers.add_parser("stop", help="flush and stop the daemon")
+
+    stand_in_parser = subparsers.add_parser("stand-in", help="write a stub git-ai for tests")
+    stand_in_parser.add_argument("path")
+    stand_in_parser.add_argument("--log", help="call log (default: PATH.log)")
+    stand_in_parser.add_argument("--delay", type=float, default=0.02, help="seconds per call")
+
+    bench_parser = subparsers.add_parser("bench", help="compare direct hooks with the daemon")
+    bench_parser.add_argument("--files", type=int, default=50)
+    bench_parser.add_argument("--delay", type=float, default=0.02,
+                              help="seconds the stand-in git-ai takes per call")
+    bench_parser.add_argument("--window", type=float, default=1.0)
+
+    args = parser.parse_args()
+    workspace = os.getcwd()
+    path = args.socket or socket_path(workspace)
+
+    if args.command == "send":
+        text = sys.stdin.read() if args.type == "ai_agent" else ""
+        hook_input = json.loads(text) if text.strip() else {}
+        direct = args.direct or os.environ.get("GIT_AI_CHECKPOINT_DAEMON") == "0"
+        return send(args.type, hook_input, path, workspace, direct)
+    if args.command == "serve":
+        return serve(path, args.window, args.idle_timeout)
+    if args.command == "stand-in":
+        log = args.log or args.path + ".log"
+        write_stand_in(args.path, log, args.delay)
+        print(f"Stand-in git-ai written to {args.path}, calls logged to {log}")
+        return 0
+    if args.command == "bench":
+        bench(args.files, args.delay, args.window)
+        return 0
+
+    try:
+        reply = request(path, {"op": args.command})
+    except OSError:
+        if args.command == "status":
+            print(f"No checkpoint daemon on {path}")
+        return 0
+    if args.command == "status":
+        print(json.dumps(reply, indent=2))
+    elif args.command == "flush":
+        print(f"Flushed {reply.get('flushed', 0)} checkpoint(s)")
+    return 0 if reply.get("ok") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
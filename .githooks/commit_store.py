@@ -0,0 +1,518 @@
+#!/usr/bin/env python3
+"""
+Indexed SQLite store for commit attribution logs
+An index over the ``commit_logs/<hash>/`` directories and checkpoint logs
+the hooks keep writing: a single database (``commit_logs/commits.db``)
+indexed on author, branch, repository and time, so queries no longer scan
+one directory per commit. The directories stay the source of truth and the
+database can be rebuilt from them with ``import``. Triggers keep daily
+rollups per author, repository and branch in step with every write, so
+aggregates in the shape the demo UI's ``TraceStore`` builds cost
+O(days x groups) instead of a scan over every commit:
+
+    commit_store.py import            # load existing commit_logs directories
+    commit_store.py add <commit>      # record one commit (used by post-commit)
+    commit_store.py aggregates --since 2024-01-01 --author "Jane Doe"
+    commit_store.py compact           # checkpoint the WAL and VACUUM
+
+Importing reads commit metadata for every directory through one
+``git cat-file --batch`` process; commits no longer in the repository are
+kept with empty metadata. ``cat-file`` knows nothing about branches, so the
+branch comes from the commit's span if it is still in the OTEL queue or
+dead-letter file, else from ``git name-rev`` against local branches (the
+branch containing the commit today, not necessarily the one it was made on).
+Commits neither source can place are stored under branch ``unknown`` and
+are only counted in branch queries under that name; a later ``add`` for
+the same commit replaces it with the real branch. Likewise, repository,
+author, email, message and time are only replaced by non-empty values, so a row
+imported without git metadata is filled in by a later ``add`` or import.
+``add`` also indexes checkpoint logs written since the newest one stored.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import sqlite3
+import threading
+import argparse
+import datetime
+import subprocess
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+
+from otel_export import commit_logs_dir, commit_metadata, collect_stats, repository_root
+
+DB_NAME = "commits.db"
+SCHEMA_VERSION = 1
+COMMIT_DIR_PATTERN = re.compile(r"^[0-9a-f]{40}$")
+CHECKPOINT_LOG_PATTERN = re.compile(r"^checkpoint_(\d{8})_(\d{6})\.log$")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS commits (
+    commit_id TEXT PRIMARY KEY,
+    commit_short TEXT NOT NULL,
+    repo TEXT NOT NULL,
+    branch TEXT NOT NULL,
+    author TEXT NOT NULL,
+    email TEXT NOT NULL,
+    message TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    ai_lines INTEGER NOT NULL,
+    human_lines INTEGER NOT NULL,
+    mixed_lines INTEGER NOT NULL,
+    stats TEXT NOT NULL,
+    hook_log TEXT
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS commits_author_time ON commits (author, timestamp);
+CREATE INDEX IF NOT EXISTS commits_branch_time ON commits (branch, timestamp);
+CREATE INDEX IF NOT EXISTS commits_repo_time ON commits (repo, timestamp);
+CREATE INDEX IF NOT EXISTS commits_time ON commits (timestamp);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    name TEXT PRIMARY KEY,
+    timestamp INTEGER NOT NULL,
+    log TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS checkpoints_time ON checkpoints (timestamp);
+CREATE TABLE IF NOT EXISTS daily_rollups (
+    day INTEGER NOT NULL,
+    repo TEXT NOT NULL,
+    author TEXT NOT NULL,
+    branch TEXT NOT NULL,
+    commits INTEGER NOT NULL,
+    ai_lines INTEGER NOT NULL,
+    human_lines INTEGER NOT NULL,
+    mixed_lines INTEGER NOT NULL,
+    PRIMARY KEY (day, repo, author, branch)
+) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS commits_rollup_insert AFTER INSERT ON commits BEGIN
+    INSERT INTO daily_rollups VALUES (
+        NEW.timestamp / 86400, NEW.repo, NEW.author, NEW.branch,
+        1, NEW.ai_lines, NEW.human_lines, NEW.mixed_lines)
+    ON CONFLICT (day, repo, author, branch) DO UPDATE SET
+        commits = commits + 1,
+        ai_lines = ai_lines + excluded.ai_lines,
+        human_lines = human_lines + excluded.human_lines,
+        mixed_lines = mixed_lines + excluded.mixed_lines;
+END;
+CREATE TRIGGER IF NOT EXISTS commits_rollup_delete AFTER DELETE ON commits BEGIN
+    UPDATE daily_rollups SET
+        commits = commits - 1,
+        ai_lines = ai_lines - OLD.ai_lines,
+        human_lines = human_lines - OLD.human_lines,
+        mixed_lines = mixed_lines - OLD.mixed_lines
+    WHERE day = OLD.timestamp / 86400 AND repo = OLD.repo
+        AND author = OLD.author AND branch = OLD.branch;
+END;
+CREATE TRIGGER IF NOT EXISTS commits_rollup_update AFTER UPDATE ON commits BEGIN
+    UPDATE daily_rollups SET
+        commits = commits - 1,
+        ai_lines = ai_lines - OLD.ai_lines,
+        human_lines = human_lines - OLD.human_lines,
+        mixed_lines = mixed_lines - OLD.mixed_lines
+    WHERE day = OLD.timestamp / 86400 AND repo = OLD.repo
+        AND author = OLD.author AND branch = OLD.branch;
+    INSERT INTO daily_rollups VALUES (
+        NEW.timestamp / 86400, NEW.repo, NEW.author, NEW.branch,
+        1, NEW.ai_lines, NEW.human_lines, NEW.mixed_lines)
+    ON CONFLICT (day, repo, author, branch) DO UPDATE SET
+        commits = commits + 1,
+        ai_lines = ai_lines + excluded.ai_lines,
+        human_lines = human_lines + excluded.human_lines,
+        mixed_lines = mixed_lines + excluded.mixed_lines;
+END;
+"""
+
+DAY = 86_400
+
+
+def attribution(stats: str) -> Tuple[int, int, int]:
+    """(ai, human, mixed) added lines, read the way TraceStore reads them."""
+    try:
+        parsed = json.loads(stats)
+    except ValueError:
+        return 0, 0, 0
+    if not isinstance(parsed, dict):
+        return 0, 0, 0
+    return (int(parsed.get("ai_additions") or 0), int(parsed.get("human_additions") or 0),
+            int(parsed.get("mixed_additions") or 0))
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path, errors="replace") as handle:
+            return handle.read()
+    except OSError:
+        return None
+
+
+def read_commit_objects(root: str, commit_ids: List[str]) -> Iterator[Tuple[str, Optional[Dict[str, Any]]]]:
+    """Yield (commit_id, metadata or None) using one ``git cat-file --batch``."""
+    process = subprocess.Popen(["git", "cat-file", "--batch"], cwd=root,
+                               stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+    def feed() -> None:
+        # Written from a thread so a full stdout pipe cannot deadlock us
+        try:
+            process.stdin.write("".join(f"{commit_id}\n" for commit_id in commit_ids).encode())
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+
+    writer = threading.Thread(target=feed, daemon=True)
+    writer.start()
+    stdout = process.stdout
+    try:
+        for commit_id in commit_ids:
+            header = stdout.readline().decode().split()
+            if len(header) != 3 or header[1] != "commit":
+                yield commit_id, None
+                continue
+            body = stdout.read(int(header[2]) + 1)[:-1].decode("utf-8", errors="replace")
+            yield commit_id, _parse_commit_object(commit_id, body)
+    finally:
+        stdout.close()
+        writer.join()
+        process.wait()
+
+
+def queued_branches(logs_dir: str) -> Dict[str, str]:
+    """Map commit id to ``vcs.branch`` from spans still in the OTEL queue files."""
+    branches: Dict[str, str] = {}
+    queue_dir = os.path.join(logs_dir, "otel-queue")
+    for name in ("dead-letter.jsonl", "queue.jsonl"):
+        try:
+            handle = open(os.path.join(queue_dir, name), errors="replace")
+        except OSError:
+            continue
+        with handle:
+            for line in handle:
+                try:
+                    attributes = json.loads(line)["span"]["attributes"]
+                except (ValueError, KeyError, TypeError):
+                    continue
+                values = {item.get("key"): item.get("value", {}).get("stringValue")
+                          for item in attributes if isinstance(item, dict)}
+                commit_id, branch = values.get("vcs.commit.id"), values.get("vcs.branch")
+                if commit_id and branch and branch != "HEAD":
+                    branches[commit_id] = branch
+    return branches
+
+
+def local_branches(root: str, commit_ids: List[str]) -> Dict[str, str]:
+    """Name each commit after the local branch ``git name-rev`` reaches it from.
+
+    Best effort: this is the branch that contains the commit now, which is
+    not always the one it was made on; unreachable commits are left out.
+    """
+    if not commit_ids:
+        return {}
+    result = subprocess.run(
+        ["git", "name-rev", "--name-only", "--refs=refs/heads/*", "--annotate-stdin"],
+        cwd=root, input="".join(f"{commit_id}\n" for commit_id in commit_ids),
+        capture_output=True, text=True)
+    if result.returncode != 0:
+        return {}
+    branches = {}
+    for commit_id, name in zip(commit_ids, result.stdout.splitlines()):
+        name = re.split(r"[~^]", name.strip(), 1)[0]
+        if name and name != commit_id and name != "undefined":
+            branches[commit_id] = name
+    return branches
+
+
+def _parse_commit_object(commit_id: str, body: str) -> Dict[str, Any]:
+    headers, _, message = body.partition("\n\n")
+    meta = {"commit_id": commit_id, "commit_short": commit_id[:7], "author": "",
+            "email": "", "timestamp": 0, "message": message.split("\n", 1)[0]}
+    for line in headers.split("\n"):
+        if line.startswith("author "):
+            ident, _, rest = line[len("author "):].rpartition(" <")
+            email, _, when = rest.partition("> ")
+            meta["author"] = ident
+            meta["email"] = email
+            meta["timestamp"] = int(when.split()[0]) if when else 0
+            break
+    return meta
+
+
+class CommitStore:
+    """SQLite-backed store of per-commit attribution.
+
+    Writes are upserts keyed by commit id, batched in one transaction per
+    call; the database runs in WAL mode so the post-commit hook can add a
+    row while a query is running.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.connection.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    @classmethod
+    def for_repository(cls, root: str) -> "CommitStore":
+        return cls(os.path.join(commit_logs_dir(root), DB_NAME))
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self) -> "CommitStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def add_many(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Upsert commits (metadata plus ``stats`` JSON and optional ``hook_log``)."""
+        values = []
+        for row in rows:
+            ai, human, mixed = attribution(row["stats"])
+            values.append((row["commit_id"], row.get("commit_short") or row["commit_id"][:7],
+                           row.get("repo", ""), row.get("branch") or "unknown",
+                           row.get("author", ""), row.get("email", ""), row.get("message", ""),
+                           int(row.get("timestamp") or 0), ai, human, mixed, row["stats"],
+                           row.get("hook_log")))
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO commits VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (commit_id) DO UPDATE SET "
+                "stats = excluded.stats, ai_lines = excluded.ai_lines, "
+                "human_lines = excluded.human_lines, mixed_lines = excluded.mixed_lines, "
+                "hook_log = COALESCE(excluded.hook_log, commits.hook_log), "
+                "repo = COALESCE(NULLIF(excluded.repo, ''), commits.repo), "
+                "author = COALESCE(NULLIF(excluded.author, ''), commits.author), "
+                "email = COALESCE(NULLIF(excluded.email, ''), commits.email), "
+                "message = COALESCE(NULLIF(excluded.message, ''), commits.message), "
+                "timestamp = COALESCE(NULLIF(excluded.timestamp, 0), commits.timestamp), "
+                "branch = CASE WHEN excluded.branch = 'unknown' THEN commits.branch "
+                "ELSE excluded.branch END",
+                values)
+        return len(values)
+
+    def add_checkpoints(self, rows: Iterable[Tuple[str, int, str]]) -> int:
+        rows = list(rows)
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO checkpoints VALUES (?, ?, ?)", rows)
+        return len(rows)
+
+    def import_directory(self, logs_dir: str, root: str, repo: Optional[str] = None,
+                         batch_size: int = 5_000) -> Dict[str, int]:
+        """Import the ``commit_logs/<hash>/`` and ``checkpoints/`` layout."""
+        repo = repo or os.path.basename(root)
+        counts = {"commits": 0, "missing_metadata": 0, "checkpoints": 0}
+        commit_ids = sorted(name for name in os.listdir(logs_dir)
+                            if COMMIT_DIR_PATTERN.match(name))
+        branches = queued_branches(logs_dir)
+        branches.update(local_branches(root, [commit_id for commit_id in commit_ids
+                                              if commit_id not in branches]))
+        for start in range(0, len(commit_ids), batch_size):
+            batch = commit_ids[start:start + batch_size]
+            rows = []
+            for commit_id, meta in read_commit_objects(root, batch):
+                commit_dir = os.path.join(logs_dir, commit_id)
+                stats = _read(os.path.join(commit_dir, "stats.json"))
+                if meta is None:
+                    counts["missing_metadata"] += 1
+                    meta = {"commit_id": commit_id}
+                rows.append(dict(meta, repo=repo, branch=branches.get(commit_id), stats=(stats or "{}").strip() or "{}",
+                                 hook_log=_read(os.path.join(commit_dir, "hook.log"))))
+            counts["commits"] += self.add_many(rows)
+
+        counts["checkpoints"] = self.import_checkpoints(logs_dir)
+        return counts
+
+    def import_checkpoints(self, logs_dir: str, after: Optional[str] = None) -> int:
+        """Index ``checkpoints/checkpoint_<ts>.log`` files named after ``after``."""
+        checkpoint_dir = os.path.join(logs_dir, "checkpoints")
+        if not os.path.isdir(checkpoint_dir):
+            return 0
+        checkpoints = []
+        for name in sorted(os.listdir(checkpoint_dir)):
+            match = CHECKPOINT_LOG_PATTERN.match(name)
+            if not match or (after is not None and name <= after):
+                continue
+            created = datetime.datetime.strptime("".join(match.groups()), "%Y%m%d%H%M%S")
+            checkpoints.append((name, int(created.timestamp()),
+                                _read(os.path.join(checkpoint_dir, name)) or ""))
+        return self.add_checkpoints(checkpoints)
+
+    def newest_checkpoint(self) -> Optional[str]:
+        return self.connection.execute("SELECT MAX(name) FROM checkpoints").fetchone()[0]
+
+    def _grouped(self, columns: Tuple[str, ...], since: Optional[int], until: Optional[int],
+                 filters: Dict[str, Optional[str]]) -> Dict[Tuple[Any, ...], List[int]]:
+        """Sum commits and lines per ``columns`` group over [since, until).
+
+        Whole UTC days come from ``daily_rollups``; only the partial days at
+        either edge of the range are read from ``commits``.
+        """
+        first_day = None if since is None else -(-since // DAY)
+        end_day = None if until is None else until // DAY
+        raw_ranges: List[Tuple[Optional[int], Optional[int]]] = []
+        if first_day is not None and end_day is not None and first_day >= end_day:
+            rollup_days = None
+            raw_ranges.append((since, until))
+        else:
+            rollup_days = (first_day, end_day)
+            if since is not None and since < first_day * DAY:
+                raw_ranges.append((since, first_day * DAY))
+            if until is not None and end_day * DAY < until:
+                raw_ranges.append((end_day * DAY, until))
+
+        group = ", ".join(columns)
+        totals: Dict[Tuple[Any, ...], List[int]] = {}
+        queries = []
+        if rollup_days is not None:
+            where, params = self._where(filters, "day", *rollup_days)
+            queries.append((f"SELECT {group}, SUM(commits), SUM(ai_lines), SUM(human_lines), "
+                            f"SUM(mixed_lines) FROM daily_rollups{where} GROUP BY {group}", params))
+        for low, high in raw_ranges:
+            where, params = self._where(filters, "timestamp", low, high)
+            queries.append((f"SELECT {group}, COUNT(*), SUM(ai_lines), SUM(human_lines), "
+                            f"SUM(mixed_lines) FROM commits{where} GROUP BY {group}", params))
+        for sql, params in queries:
+            for row in self.connection.execute(sql, params):
+                key, sums = row[:len(columns)], row[len(columns):]
+                if not sums[0]:
+                    continue
+                current = totals.setdefault(key, [0, 0, 0, 0])
+                for index, value in enumerate(sums):
+                    current[index] += value
+        return totals
+
+    def _where(self, filters: Dict[str, Optional[str]], time_column: str,
+               low: Optional[int], high: Optional[int]) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        for column in ("author", "branch", "repo"):
+            if filters.get(column) is not None:
+                clauses.append(f"{column} = ?")
+                params.append(filters[column])
+        if low is not None:
+            clauses.append(f"{time_column} >= ?")
+            params.append(low)
+        if high is not None:
+            clauses.append(f"{time_column} < ?")
+            params.append(high)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    @staticmethod
+    def _entry(sums: List[int]) -> Dict[str, int]:
+        return {"commits": sums[0], "aiLines": sums[1], "humanLines": sums[2],
+                "mixedLines": sums[3]}
+
+    def aggregates(self, since: Optional[int] = None, until: Optional[int] = None,
+                   author: Optional[str] = None, branch: Optional[str] = None,
+                   repo: Optional[str] = None) -> Dict[str, Any]:
+        """Totals plus per-author and per-repo breakdowns, as ``TraceStore.getStats``.
+
+        ``since``/``until`` are Unix timestamps bounding commit time.
+        """
+        filters = {"author": author, "branch": branch, "repo": repo}
+        grouped = self._grouped(("author", "repo"), since, until, filters)
+        totals = [0, 0, 0, 0]
+        by_author: Dict[str, List[int]] = {}
+        by_repo: Dict[str, List[int]] = {}
+        for (author_name, repo_name), sums in grouped.items():
+            for target in (totals, by_author.setdefault(author_name, [0, 0, 0, 0]),
+                           by_repo.setdefault(repo_name, [0, 0, 0, 0])):
+                for index, value in enumerate(sums):
+                    target[index] += value
+        return {
+            "totalCommits": totals[0],
+            "totalLinesAdded": totals[1] + totals[2] + totals[3],
+            "aiLines": totals[1],
+            "humanLines": totals[2],
+            "mixedLines": totals[3],
+            "byAuthor": {name: self._entry(sums) for name, sums in by_author.items()},
+            "byRepo": {name: self._entry(sums) for name, sums in by_repo.items()}
+        }
+
+    def by_branch(self, since: Optional[int] = None, until: Optional[int] = None,
+                  author: Optional[str] = None, repo: Optional[str] = None
+                  ) -> Dict[str, Dict[str, int]]:
+        """Per-branch commits and line attribution."""
+        grouped = self._grouped(("branch",), since, until, {"author": author, "repo": repo})
+        return {key[0]: self._entry(sums) for key, sums in grouped.items()}
+
+    def commits(self, limit: int = 100, since: Optional[int] = None,
+                until: Optional[int] = None, **filters: Optional[str]) -> List[Dict[str, Any]]:
+        """Most recent commits matching the filters, newest first."""
+        where, params = self._where(filters, "timestamp", since, until)
+        cursor = self.connection.execute(
+            "SELECT commit_id, commit_short, repo, branch, author, email, message, timestamp, "
+            f"ai_lines, human_lines, mixed_lines, stats FROM commits{where} "
+            "ORDER BY timestamp DESC LIMIT ?", params + [limit])
+        columns = [description[0] for description in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor]
+
+    def compact(self) -> None:
+        """Fold the WAL into the database file and reclaim free pages."""
+        self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self.connection.execute("VACUUM")
+
+
+def _timestamp(value: Optional[str]) -> Optional[int]:
+    if value is None:
+        return None
+    if value.isdigit():
+        return int(value)
+    return int(datetime.datetime.fromisoformat(value).timestamp())
+
+
+def main():
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db", help=f"database path (default: commit_logs/{DB_NAME})")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("import", help="import the commit_logs directory layout")
+    add_parser = subparsers.add_parser("add", help="record commits after they are made")
+    add_parser.add_argument("commits", nargs="*", default=["HEAD"])
+    query_parser = subparsers.add_parser("aggregates", help="print TraceStore-style aggregates")
+    for name in ("since", "until"):
+        query_parser.add_argument(f"--{name}", help="ISO date/time or Unix timestamp")
+    for name in ("author", "branch", "repo"):
+        query_parser.add_argument(f"--{name}")
+    subparsers.add_parser("compact", help="checkpoint the WAL and VACUUM")
+    args = parser.parse_args()
+
+    root = repository_root()
+    store = CommitStore(args.db) if args.db else CommitStore.for_repository(root)
+    with store:
+        if args.command == "import":
+            start = time.perf_counter()
+            counts = store.import_directory(commit_logs_dir(root), root)
+            print(f"Imported {counts['commits']:,} commits ({counts['missing_metadata']:,} "
+                  f"without git metadata) and {counts['checkpoints']:,} checkpoint logs "
+                  f"in {time.perf_counter() - start:.1f}s")
+        elif args.command == "add":
+            rows = []
+            for commit in args.commits:
+                meta = commit_metadata(commit, cwd=root)
+                commit_dir = os.path.join(commit_logs_dir(root), meta["commit_id"])
+                rows.append(dict(meta, stats=collect_stats(meta["commit_id"], commit_dir, root),
+                                 hook_log=_read(os.path.join(commit_dir, "hook.log"))))
+            store.add_many(rows)
+            store.import_checkpoints(commit_logs_dir(root), store.newest_checkpoint())
+        elif args.command == "aggregates":
+            start = time.perf_counter()
+            result = store.aggregates(_timestamp(args.since), _timestamp(args.until),
+                                      args.author, args.branch, args.repo)
+            elapsed = time.perf_counter() - start
+            print(json.dumps(result, indent=2))
+            print(f"({elapsed * 1e3:.1f} ms)", file=sys.stderr)
+        else:
+            before = os.path.getsize(store.path)
+            store.compact()
+            print(f"Compacted {store.path}: {before:,} -> {os.path.getsize(store.path):,} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,8 +15,13 @@ COMMIT_TIMESTAMP=$(git log -1 --format=%ct "$COMMIT_HASH")
 BRANCH=$(git rev-parse --abbrev-ref HEAD 2>/dev/null || echo "unknown")
 REPO_NAME=$(basename "$(git rev-parse --show-toplevel)")
 
-# Get git-ai stats (escape for JSON embedding)
-GIT_AI_STATS=$(git-ai stats "$COMMIT_HASH" --json 2>/dev/null | tr -d '\n' | sed 's/"/\\"/g' || echo "{}")
+# Get git-ai stats, reusing the stats.json post-commit already wrote (escape for JSON embedding)
+STATS_FILE="$(git rev-parse --show-toplevel)/commit_logs/$(git rev-parse "$COMMIT_HASH")/stats.json"
+if [ -s "$STATS_FILE" ]; then
+  GIT_AI_STATS=$(tr -d '\n' < "$STATS_FILE" | sed 's/"/\\"/g')
+else
+  GIT_AI_STATS=$(git-ai stats "$COMMIT_HASH" --json 2>/dev/null | tr -d '\n' | sed 's/"/\\"/g' || echo "{}")
+fi
 
 # Configure OTEL endpoint (defaults to local demo-ui app)
 OTEL_ENDPOINT="${OTEL_EXPORTER_OTLP_ENDPOINT:-http://localhost:3000/api}/v1/traces"
@@ -0,0 +1,556 @@
+#!/usr/bin/env python3
+"""
+Queued OTLP export of commit attribution telemetry
+Builds the same ``git.commit`` span as ``otel-export.sh`` but appends it
+to an on-disk queue instead of firing one ``curl`` per commit. A flush
+sends queued spans in batches (one OTLP request per ``batch_size`` spans),
+optionally gzip-compressed, retries transient failures with backoff and
+moves spans that keep failing to a dead-letter file, so nothing is lost
+while the collector is down.
+
+    otel_export.py export <commit>   # collect stats, enqueue, flush
+    otel_export.py enqueue <commit>  # enqueue only
+    otel_export.py flush             # send whatever is queued
+    otel_export.py status            # queue and dead-letter depth
+    otel_export.py collector         # local stand-in collector for testing
+
+``git-ai stats`` runs at most once per commit: an existing
+``commit_logs/<hash>/stats.json`` is reused, otherwise the output is
+written there. ``GIT_AI_BIN`` overrides the ``git-ai`` executable.
+"""
+
+import os
+import sys
+import gzip
+import json
+import time
+import random
+import fcntl
+import secrets
+import argparse
+import threading
+import subprocess
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Dict, Any, Callable, Iterable, Optional
+
+SERVICE_NAME = "git-commit-tracker"
+SERVICE_VERSION = "1.0.0"
+SCOPE_NAME = "git.post-commit"
+DEFAULT_ENDPOINT = "http://localhost:3000/api"
+
+# ``source`` of stats.json files backfill.py derives from diffs instead of git-ai
+NUMSTAT_SOURCE = "backfill-numstat"
+
+# Fields read with a single ``git log`` call, NUL separated
+COMMIT_FORMAT = "%H%x00%h%x00%s%x00%an%x00%ae%x00%ct"
+
+
+def git(*args: str, cwd: Optional[str] = None) -> str:
+    """Run a git command and return its stripped stdout."""
+    return subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True,
+                          check=True).stdout.strip()
+
+
+def repository_root(cwd: Optional[str] = None) -> str:
+    return git("rev-parse", "--show-toplevel", cwd=cwd)
+
+
+def commit_logs_dir(root: str) -> str:
+    return os.path.join(root, "commit_logs")
+
+
+def parse_commit(line: str) -> Dict[str, Any]:
+    """Parse one ``COMMIT_FORMAT`` record."""
+    commit_id, short, message, author, email, timestamp = line.split("\0")
+    return {
+        "commit_id": commit_id,
+        "commit_short": short,
+        "message": message,
+        "author": author,
+        "email": email,
+        "timestamp": int(timestamp)
+    }
+
+
+def commit_metadata(commit: str, cwd: Optional[str] = None) -> Dict[str, Any]:
+    """Commit fields plus branch and repository name, in two git calls."""
+    meta = parse_commit(git("log", "-1", f"--format={COMMIT_FORMAT}", commit, cwd=cwd))
+    root, branch = git("rev-parse", "--show-toplevel", "--abbrev-ref", "HEAD",
+                       cwd=cwd).splitlines()
+    meta["branch"] = branch or "unknown"
+    meta["repo"] = os.path.basename(root)
+    return meta
+
+
+def git_ai_stats(commit: str, cwd: Optional[str] = None) -> Optional[str]:
+    """Run ``git-ai stats <commit> --json`` and return its output (None on failure)."""
+    command = [os.environ.get("GIT_AI_BIN", "git-ai"), "stats", commit, "--json"]
+    try:
+        result = subprocess.run(command, cwd=cwd, capture_output=True, text=True, timeout=120)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0 or not result.stdout.strip():
+        return None
+    return result.stdout
+
+
+def load_stats(commit_dir: str, numstat: bool = False) -> Optional[str]:
+    """Return the contents of ``stats.json`` when it holds valid JSON.
+
+    Stats a numstat backfill derived without git-ai are only returned with
+    ``numstat``, so real git-ai stats can replace them.
+    """
+    try:
+        with open(os.path.join(commit_dir, "stats.json")) as handle:
+            text = handle.read()
+        parsed = json.loads(text)
+    except (OSError, ValueError):
+        return None
+    if not numstat and isinstance(parsed, dict) and parsed.get("source") == NUMSTAT_SOURCE:
+        return None
+    return text
+
+
+def collect_stats(commit: str, commit_dir: str, cwd: Optional[str] = None) -> str:
+    """Reuse ``stats.json`` or compute it once with git-ai and write it.
+
+    When git-ai fails, nothing is written, so the next run tries again
+    instead of reusing empty stats; numstat backfill stats, if any, or "{}"
+    are returned meanwhile.
+    """
+    stats = load_stats(commit_dir)
+    if stats is not None:
+        return stats
+    stats = git_ai_stats(commit, cwd)
+    if stats is None:
+        return load_stats(commit_dir, numstat=True) or "{}"
+    os.makedirs(commit_dir, exist_ok=True)
+    temp_path = os.path.join(commit_dir, f"stats.json.{os.getpid()}.tmp")
+    with open(temp_path, "w") as handle:
+        handle.write(stats)
+    os.replace(temp_path, os.path.join(commit_dir, "stats.json"))
+    return stats
+
+
+def compact_stats(stats: str) -> str:
+    """Stats as single-line JSON, as otel-export.sh embeds them."""
+    try:
+        return json.dumps(json.loads(stats), separators=(",", ":"))
+    except ValueError:
+        return "{}"
+
+
+def _string(key: str, value: str) -> Dict[str, Any]:
+    return {"key": key, "value": {"stringValue": value}}
+
+
+def build_span(meta: Dict[str, Any], stats: str,
+               end_time_ns: Optional[int] = None) -> Dict[str, Any]:
+    """The ``git.commit`` span otel-export.sh sends, as a queue record."""
+    span = {
+        "traceId": secrets.token_hex(16),
+        "spanId": secrets.token_hex(8),
+        "name": "git.commit",
+        "kind": 1,
+        "startTimeUnixNano": f"{meta['timestamp']}000000000",
+        "endTimeUnixNano": str(end_time_ns or time.time_ns()),
+        "attributes": [
+            _string("vcs.commit.id", meta["commit_id"]),
+            _string("vcs.commit.id.short", meta["commit_short"]),
+            _string("vcs.commit.message", meta["message"]),
+            _string("vcs.commit.author.name", meta["author"]),
+            _string("vcs.commit.author.email", meta["email"]),
+            _string("vcs.branch", meta["branch"]),
+            _string("git.ai.stats", compact_stats(stats))
+        ],
+        "status": {"code": 1}
+    }
+    return {"repo": meta["repo"], "span": span, "attempts": 0, "enqueued": time.time()}
+
+
+def build_payload(records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Group queued spans into one OTLP payload, one resource per repository."""
+    by_repo: Dict[str, List[Dict[str, Any]]] = {}
+    for record in records:
+        by_repo.setdefault(record["repo"], []).append(record["span"])
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": [
+                        _string("service.name", SERVICE_NAME),
+                        _string("service.version", SERVICE_VERSION),
+                        _string("vcs.repository.name", repo)
+                    ]
+                },
+                "scopeSpans": [
+                    {
+                        "scope": {"name": SCOPE_NAME, "version": SERVICE_VERSION},
+                        "spans": spans
+                    }
+                ]
+            }
+            for repo, spans in by_repo.items()
+        ]
+    }
+
+
+class SpanQueue:
+    """Append-only JSONL span queue with a dead-letter file.
+
+    Appends and rewrites hold an exclusive ``flock`` on ``queue.lock`` so
+    concurrent hooks never interleave partial lines; a separate
+    ``flush.lock`` keeps a single flusher at a time.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.path = os.path.join(directory, "queue.jsonl")
+        self.dead_letter_path = os.path.join(directory, "dead-letter.jsonl")
+        os.makedirs(directory, exist_ok=True)
+
+    def _lock(self, name: str, blocking: bool = True):
+        handle = open(os.path.join(self.directory, name), "a")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            handle.close()
+            return None
+        return handle
+
+    def append(self, records: Iterable[Dict[str, Any]], path: Optional[str] = None) -> int:
+        """Append records; returns how many were written."""
+        lines = [json.dumps(record, separators=(",", ":")) + "\n" for record in records]
+        if not lines:
+            return 0
+        lock = self._lock("queue.lock")
+        try:
+            with open(path or self.path, "a") as handle:
+                handle.writelines(lines)
+        finally:
+            lock.close()
+        return len(lines)
+
+    def peek(self, limit: int) -> List[Dict[str, Any]]:
+        """Return up to ``limit`` records from the head of the queue."""
+        records = []
+        lock = self._lock("queue.lock")
+        try:
+            with open(self.path) as handle:
+                for line in handle:
+                    if len(records) >= limit:
+                        break
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        records.append({"corrupt": line})
+        except FileNotFoundError:
+            pass
+        finally:
+            lock.close()
+        return records
+
+    def replace_head(self, count: int, records: Iterable[Dict[str, Any]] = ()) -> None:
+        """Drop the first ``count`` lines, putting ``records`` in their place."""
+        lock = self._lock("queue.lock")
+        try:
+            try:
+                with open(self.path) as handle:
+                    lines = handle.readlines()
+            except FileNotFoundError:
+                lines = []
+            head = [json.dumps(record, separators=(",", ":")) + "\n" for record in records]
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temp_path, "w") as handle:
+                handle.writelines(head + lines[count:])
+            os.replace(temp_path, self.path)
+        finally:
+            lock.close()
+
+    def dead_letter(self, records: Iterable[Dict[str, Any]], reason: str) -> int:
+        stamped = [dict(record, dead_letter_reason=reason, dead_lettered=time.time())
+                   for record in records]
+        return self.append(stamped, self.dead_letter_path)
+
+    def _count(self, path: str) -> int:
+        try:
+            with open(path, "rb") as handle:
+                return sum(1 for _ in handle)
+        except FileNotFoundError:
+            return 0
+
+    def depth(self) -> int:
+        return self._count(self.path)
+
+    def dead_letters(self) -> int:
+        return self._count(self.dead_letter_path)
+
+
+class ExportError(Exception):
+    """A batch could not be delivered; ``retryable`` tells whether to keep it."""
+
+    def __init__(self, message: str, retryable: bool, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class OTLPExporter:
+    """Sends queued spans to an OTLP/HTTP JSON traces endpoint in batches.
+
+    Each batch is retried up to ``retries`` times with exponential backoff
+    and jitter on connection errors, 408, 429 and 5xx (honouring
+    ``Retry-After`` up to ``max_backoff``). Other 4xx responses dead-letter
+    the batch at once. A batch that exhausts its retries stays queued with
+    its ``attempts`` count raised and the flush stops; after
+    ``max_attempts`` failed flushes a span is dead-lettered.
+
+    ``compression`` is ``"gzip"`` or ``"none"``; when omitted it comes from
+    ``OTEL_EXPORTER_OTLP_COMPRESSION``.
+    """
+
+    def __init__(self, queue: SpanQueue, endpoint: Optional[str] = None,
+                 compression: Optional[str] = None, batch_size: int = 100,
+                 retries: int = 3, backoff: float = 0.5, max_backoff: float = 10.0,
+                 timeout: float = 10.0, max_attempts: int = 10):
+        self.queue = queue
+        base = endpoint or os.environ.get("OTEL_EXPORTER_OTLP_ENDPOINT") or DEFAULT_ENDPOINT
+        self.url = base if base.endswith("/v1/traces") else f"{base.rstrip('/')}/v1/traces"
+        # "none" disables compression even when the environment asks for gzip
+        if compression is None:
+            compression = os.environ.get("OTEL_EXPORTER_OTLP_COMPRESSION") or "none"
+        self.compression = None if compression == "none" else compression
+        self.batch_size = batch_size
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.stats = {"requests": 0, "sent": 0, "retries": 0, "dead_lettered": 0, "bytes": 0}
+
+    def _post(self, body: bytes) -> None:
+        headers = {"Content-Type": "application/json"}
+        if self.compression == "gzip":
+            body = gzip.compress(body)
+            headers["Content-Encoding"] = "gzip"
+        request = urllib.request.Request(self.url, data=body, headers=headers, method="POST")
+        self.stats["requests"] += 1
+        self.stats["bytes"] += len(body)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+        except urllib.error.HTTPError as e:
+            retry_after = e.headers.get("Retry-After") if e.headers else None
+            retryable = e.code in (408, 429) or e.code >= 500
+            raise ExportError(f"HTTP {e.code}", retryable,
+                              float(retry_after) if retry_after and retry_after.isdigit() else None)
+        except (urllib.error.URLError, OSError) as e:
+            raise ExportError(str(getattr(e, "reason", e)), True)
+
+    def send(self, records: List[Dict[str, Any]]) -> None:
+        """POST one batch, retrying transient failures."""
+        body = json.dumps(build_payload(records), separators=(",", ":")).encode()
+        for attempt in range(self.retries + 1):
+            try:
+                self._post(body)
+                return
+            except ExportError as e:
+                if not e.retryable or attempt == self.retries:
+                    raise
+                self.stats["retries"] += 1
+                delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+                # Honour Retry-After, but never stall the hook past max_backoff
+                time.sleep(min(self.max_backoff, e.retry_after) if e.retry_after is not None
+                           else delay * (0.5 + random.random() / 2))
+
+    def flush(self) -> Dict[str, Any]:
+        """Send queued spans batch by batch until empty or the collector fails."""
+        while True:
+            lock = self.queue._lock("flush.lock", blocking=False)
+            if lock is None:
+                return self.stats
+            try:
+                delivered = self._drain()
+            finally:
+                lock.close()
+            # A hook may have enqueued while the lock was held; go again if so
+            if not delivered or not self.queue.depth():
+                return self.stats
+
+    def _drain(self) -> bool:
+        while True:
+            records = self.queue.peek(self.batch_size)
+            if not records:
+                return True
+            corrupt = [record for record in records if "span" not in record]
+            valid = [record for record in records if "span" in record]
+            if corrupt:
+                self.stats["dead_lettered"] += self.queue.dead_letter(corrupt, "corrupt record")
+            if not valid:
+                self.queue.replace_head(len(records))
+                continue
+            try:
+                self.send(valid)
+            except ExportError as e:
+                if not e.retryable:
+                    self.stats["dead_lettered"] += self.queue.dead_letter(valid, str(e))
+                    self.queue.replace_head(len(records))
+                    continue
+                keep, expired = [], []
+                for record in valid:
+                    record["attempts"] = record.get("attempts", 0) + 1
+                    (expired if record["attempts"] >= self.max_attempts else keep).append(record)
+                if expired:
+                    self.stats["dead_lettered"] += self.queue.dead_letter(expired, str(e))
+                self.queue.replace_head(len(records), keep)
+                print(f"OTEL export to {self.url} failed ({e}); "
+                      f"{self.queue.depth()} span(s) left queued", file=sys.stderr)
+                return False
+            self.stats["sent"] += len(valid)
+            self.queue.replace_head(len(records))
+
+
+def enqueue_commit(commit: str, root: str, queue: SpanQueue) -> Dict[str, Any]:
+    """Collect stats once, build the commit span and append it to the queue."""
+    meta = commit_metadata(commit, cwd=root)
+    stats = collect_stats(meta["commit_id"], os.path.join(commit_logs_dir(root), meta["commit_id"]),
+                          cwd=root)
+    record = build_span(meta, stats)
+    queue.append([record])
+    return record
+
+
+class StandInCollector:
+    """Minimal local OTLP/HTTP collector for exercising the exporter.
+
+    Accepts POSTs to ``/v1/traces`` (gzip or plain JSON) and keeps the
+    decoded payloads. ``fail_next`` makes the next N requests answer
+    ``fail_status``, to simulate an unavailable collector. With
+    ``on_payload`` each payload is handed to the callback instead of kept.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 fail_next: int = 0, fail_status: int = 503,
+                 on_payload: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.payloads: List[Dict[str, Any]] = []
+        self.on_payload = on_payload
+        self.requests = 0
+        self.fail_next = fail_next
+        self.fail_status = fail_status
+        self._lock = threading.Lock()
+        collector = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with collector._lock:
+                    collector.requests += 1
+                    failing = collector.fail_next > 0
+                    if failing:
+                        collector.fail_next -= 1
+                if failing or self.path.rstrip("/") not in ("/v1/traces", "/api/v1/traces"):
+                    self.send_response(collector.fail_status if failing else 404)
+                    self.end_headers()
+                    return
+                try:
+                    if self.headers.get("Content-Encoding") == "gzip":
+                        body = gzip.decompress(body)
+                    payload = json.loads(body)
+                except (OSError, ValueError):
+                    self.send_response(400)
+                    self.end_headers()
+                    return
+                if collector.on_payload is not None:
+                    collector.on_payload(payload)
+                else:
+                    with collector._lock:
+                        collector.payloads.append(payload)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.end_headers()
+                self.wfile.write(b'{"status":"ok"}')
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def spans(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [span for payload in self.payloads
+                    for resource in payload.get("resourceSpans", [])
+                    for scope in resource.get("scopeSpans", [])
+                    for span in scope.get("spans", [])]
+
+    def start(self) -> "StandInCollector":
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "StandInCollector":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def main():
+    """Command line entry point used by the post-commit hook."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("command", choices=["export", "enqueue", "flush", "status", "collector"])
+    parser.add_argument("commits", nargs="*", help="commits to enqueue (default: HEAD)")
+    parser.add_argument("--endpoint", help="OTLP base URL (default: $OTEL_EXPORTER_OTLP_ENDPOINT)")
+    parser.add_argument("--compression", choices=["gzip", "none"],
+                        help="request compression (default: $OTEL_EXPORTER_OTLP_COMPRESSION)")
+    parser.add_argument("--batch-size", type=int, default=100, help="spans per OTLP request")
+    parser.add_argument("--queue-dir", help="queue directory (default: commit_logs/otel-queue)")
+    parser.add_argument("--port", type=int, default=4318, help="port for the stand-in collector")
+    args = parser.parse_args()
+
+    if args.command == "collector":
+        collector = StandInCollector(port=args.port).start()
+        print(f"Stand-in collector listening on {collector.endpoint}/v1/traces")
+        try:
+            while True:
+                time.sleep(5)
+                print(f"{collector.requests} request(s), {len(collector.spans)} span(s)")
+        except KeyboardInterrupt:
+            collector.close()
+        return 0
+
+    root = repository_root()
+    queue = SpanQueue(args.queue_dir or os.path.join(commit_logs_dir(root), "otel-queue"))
+
+    if args.command in ("export", "enqueue"):
+        for commit in args.commits or ["HEAD"]:
+            enqueue_commit(commit, root, queue)
+            print(f"Queued span for {commit}")
+
+    if args.command in ("export", "flush"):
+        exporter = OTLPExporter(queue, args.endpoint, args.compression, args.batch_size)
+        stats = exporter.flush()
+        print(f"OTEL export to {exporter.url}: {stats['sent']} span(s) in "
+              f"{stats['requests']} request(s), {queue.depth()} queued, "
+              f"{queue.dead_letters()} dead-lettered")
+
+    if args.command == "status":
+        print(json.dumps({"queued": queue.depth(), "dead_letters": queue.dead_letters(),
+                          "queue": queue.path}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the demo scripts
+Run with the names of the benchmarks to execute, e.g.
+``python benchmarks.py columnar --size 500000``. With no names every
+benchmark runs at its default size.
+"""
+
+import os
+import math
+import sys
+import asyncio
+import time
+import random
+import argparse
+import tempfile
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+from instrumentation import Instrumentation
+from script_1 import DataProcessor
+from script_2 import (ArticleServer, AsyncScraper, DataAnalyzer, ResultCache, TextPipeline,
+                      TextProcessor, WebScrapingSimulator)
+
+
+def measure(func: Callable[[], Any]) -> Tuple[Any, float, int]:
+    """Run ``func`` once and return (result, seconds, peak traced bytes)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = func()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def timed(func: Callable[[], Any]) -> Tuple[Any, float]:
+    """Run ``func`` once without memory tracing and return (result, seconds)."""
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def print_table(headers: List[str], rows: List[List[Any]]) -> None:
+    """Print rows as a fixed-width text table."""
+    cells = [headers] + [[str(cell) for cell in row] for row in rows]
+    widths = [max(len(row[i]) for row in cells) for i in range(len(headers))]
+    for index, row in enumerate(cells):
+        print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)))
+        if index == 0:
+            print("  ".join("-" * width for width in widths))
+
+
+def bench_columnar(size: int) -> None:
+    """Compare the dict-list and columnar paths of DataProcessor."""
+    processor = DataProcessor("bench")
+    rows = []
+
+    for label, columnar in (("dict-list", False), ("columnar", True)):
+        data, gen_time, gen_peak = measure(
+            lambda: processor.generate_sample_data(size, columnar=columnar))
+        _, proc_time = timed(lambda: processor.process_data(data))
+        _, filter_time = timed(lambda: processor.filter_data(
+            data, category="electronics", min_price=100.0, max_price=300.0))
+        rows.append([
+            label,
+            f"{gen_peak / 1e6:.1f}",
+            f"{size / gen_time:,.0f}",
+            f"{size / proc_time:,.0f}",
+            f"{size / filter_time:,.0f}",
+        ])
+        del data
+
+    print(f"\n=== Columnar vs dict-list ({size:,} records) ===")
+    print_table(["path", "peak MB", "gen rec/s", "process rec/s", "filter rec/s"], rows)
+
+
+def bench_streaming(size: int) -> None:
+    """Compare process_data against the single-pass streaming aggregator."""
+    processor = DataProcessor("bench")
+    data = processor.generate_sample_data(size)
+    rows = []
+
+    _, elapsed, peak = measure(lambda: processor.process_data(data))
+    rows.append(["process_data (list)", f"{size / elapsed:,.0f}", f"{peak / 1e6:.1f}"])
+    _, elapsed, peak = measure(lambda: processor.process_stream(iter(data)))
+    rows.append(["process_stream (iterator)", f"{size / elapsed:,.0f}", f"{peak / 1e6:.1f}"])
+
+    print(f"\n=== Streaming statistics ({size:,} records) ===")
+    print_table(["path", "rec/s", "peak MB"], rows)
+
+
+def bench_parallel(size: int) -> None:
+    """Measure process/filter scaling from one worker up to every core."""
+    processor = DataProcessor("bench")
+    data = processor.generate_sample_data(size, columnar=True)
+    cores = os.cpu_count() or 1
+    counts = sorted({1, 2, 4, 8, cores} & set(range(1, cores + 1)))
+    rows = []
+    baseline = None
+
+    for workers in counts:
+        _, proc_time = timed(lambda: processor.process_data_parallel(data, workers=workers))
+        _, filter_time = timed(lambda: processor.filter_data_parallel(
+            data, category="books", min_price=50.0, workers=workers))
+        baseline = baseline or proc_time
+        rows.append([workers, f"{size / proc_time:,.0f}", f"{baseline / proc_time:.2f}x",
+                     f"{size / filter_time:,.0f}"])
+
+    print(f"\n=== Parallel scaling ({size:,} records, {cores} cores) ===")
+    print_table(["workers", "process rec/s", "speedup", "filter rec/s"], rows)
+
+
+def bench_index(size: int) -> None:
+    """Compare scanning filter_data against indexed queries."""
+    processor = DataProcessor("bench")
+    data = processor.generate_sample_data(size)
+    processor.process_data(data)
+    queries = [
+        ("category", {"category": "books"}),
+        ("narrow price", {"min_price": 100.0, "max_price": 101.0}),
+        ("category + price", {"category": "books", "min_price": 100.0, "max_price": 110.0}),
+    ]
+    repeats = 20
+
+    _, build_time = timed(processor.build_index)
+    print(f"\n=== Indexed queries ({size:,} records, index built in {build_time * 1e3:.0f} ms) ===")
+    rows = []
+    for label, criteria in queries:
+        processor.invalidate_index()
+        _, scan_time = timed(lambda: [processor.filter_data(data, **criteria) for _ in range(repeats)])
+        processor.build_index()
+        matches, index_time = timed(lambda: [processor.query(**criteria) for _ in range(repeats)])
+        rows.append([label, len(matches[0]), f"{scan_time / repeats * 1e3:.2f}",
+                     f"{index_time / repeats * 1e3:.3f}", f"{scan_time / index_time:.0f}x"])
+    print_table(["query", "matches", "scan ms", "index ms", "speedup"], rows)
+
+
+def bench_io(size: int) -> None:
+    """Compare save_to_csv/save_to_json with the streaming writers and readers."""
+    processor = DataProcessor("bench")
+    table = processor.generate_sample_data(size, columnar=True)
+    records = table.to_records()
+    rows = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cases = [
+            ("save_to_csv", "data.csv", lambda path: processor.save_to_csv(records, path)),
+            ("save_to_json", "data.json", lambda path: processor.save_to_json(records, path)),
+            ("save_stream csv", "stream.csv", lambda path: processor.save_stream(iter(table), path)),
+            ("save_stream json", "stream.json", lambda path: processor.save_stream(iter(table), path)),
+            ("save_stream ndjson", "stream.ndjson", lambda path: processor.save_stream(iter(table), path)),
+            ("save_stream ndjson.gz", "stream.ndjson.gz",
+             lambda path: processor.save_stream(iter(table), path)),
+        ]
+        for label, filename, write in cases:
+            path = os.path.join(tmp, filename)
+            _, write_time = timed(lambda: write(path))
+            _, _, write_peak = measure(lambda: write(path))
+            read_cell = "-"
+            if label.startswith("save_stream"):
+                _, read_time = timed(lambda: sum(1 for _ in processor.read_stream(path)))
+                read_cell = f"{size / read_time:,.0f}"
+            rows.append([label, f"{os.path.getsize(path) / 1e6:.1f}", f"{size / write_time:,.0f}",
+                         f"{write_peak / 1e6:.1f}", read_cell])
+
+    print(f"\n=== Export/import throughput ({size:,} records) ===")
+    print_table(["writer", "file MB", "write rec/s", "write peak MB", "read rec/s"], rows)
+
+
+def bench_generate(size: int) -> None:
+    """Compare row-by-row generators against the seeded batch generators."""
+    processor = DataProcessor("bench")
+    analyzer = DataAnalyzer()
+    cases = [
+        ("generate_sample_data", lambda: processor.generate_sample_data(size, seed=1)),
+        ("generate_sample_data columnar", lambda: processor.generate_sample_data(size, columnar=True, seed=1)),
+        ("generate_sample_batches", lambda: sum(map(len, processor.generate_sample_batches(size, seed=1)))),
+        ("generate_time_series", lambda: analyzer.generate_time_series(size, seed=1)),
+        ("generate_time_series_batches", lambda: sum(map(len, analyzer.generate_time_series_batches(size, seed=1)))),
+    ]
+    rows = []
+    for label, func in cases:
+        _, elapsed = timed(func)
+        rows.append([label, f"{size / elapsed:,.0f}"])
+
+    print(f"\n=== Sample data generation ({size:,} rows) ===")
+    print_table(["generator", "rows/s"], rows)
+
+
+def naive_moving_average(data: List[Dict[str, Any]], window: int) -> List[Dict[str, Any]]:
+    """The original O(n * window) moving average, kept as a baseline."""
+    result = []
+    for i in range(len(data)):
+        window_data = data[max(0, i - window + 1):i + 1]
+        avg_value = sum(item["value"] for item in window_data) / len(window_data)
+        result.append({**data[i], "moving_avg": round(avg_value, 2)})
+    return result
+
+
+def bench_windows(size: int) -> None:
+    """Compare the sliding-window moving average with the naive rescan."""
+    analyzer = DataAnalyzer()
+    data = analyzer.generate_time_series(size, seed=1)
+    rows = []
+    for window in (3, 7, 30, 90, 365):
+        expected, naive_time = timed(lambda: naive_moving_average(data, window))
+        result, sliding_time = timed(lambda: analyzer.calculate_moving_average(data, window))
+        _, rolling_time = timed(lambda: sum(1 for _ in analyzer.rolling_statistics(data, window)))
+        rows.append([window, f"{size / naive_time:,.0f}", f"{size / sliding_time:,.0f}",
+                     f"{size / rolling_time:,.0f}", "yes" if result == expected else "NO"])
+
+    print(f"\n=== Moving average by window size ({size:,} points) ===")
+    print_table(["window", "naive pts/s", "sliding pts/s", "all stats pts/s", "identical"], rows)
+
+
+def sample_corpus(size: int, seed: int = 1) -> List[str]:
+    """Build ``size`` article bodies, some wrapped in HTML with links."""
+    random.seed(seed)
+    scraper = WebScrapingSimulator()
+    corpus = []
+    for i in range(size):
+        body = scraper._generate_article_content()
+        if random.random() < 0.3:
+            body = f"<p>{body} See https://example.com/a/{i} for more.</p>"
+        corpus.append(body)
+    return corpus
+
+
+def bench_text(size: int) -> None:
+    """Compare chained TextProcessor calls with the fused TextPipeline."""
+    processor = TextProcessor()
+    pipeline = TextPipeline(processor)
+    corpus = sample_corpus(size)
+    megabytes = sum(len(text.encode()) for text in corpus) / 1e6
+
+    def chained() -> int:
+        return sum(len(processor.remove_stop_words(processor.tokenize(processor.clean_text(text))))
+                   for text in corpus)
+
+    def fused() -> int:
+        return sum(1 for text in corpus for _ in pipeline.tokens(text))
+
+    rows = []
+    for label, func in (("clean/tokenize/remove_stop_words", chained), ("TextPipeline.tokens", fused)):
+        tokens, elapsed = timed(func)
+        rows.append([label, f"{megabytes / elapsed:.1f}", f"{tokens / elapsed:,.0f}"])
+
+    print(f"\n=== Text normalization ({size:,} documents, {megabytes:.1f} MB) ===")
+    print_table(["path", "MB/s", "tokens/s"], rows)
+
+
+def bench_keywords(size: int) -> None:
+    """Compare extract_keywords with the batched extractor and sketch."""
+    scraper = WebScrapingSimulator()
+    articles = [{"content": text} for text in sample_corpus(size)]
+    cores = os.cpu_count() or 1
+    cases = [
+        ("extract_keywords", lambda: scraper.extract_keywords(articles)),
+        ("batched, 1 worker", lambda: scraper.extract_keywords_batched(iter(articles), workers=1)),
+        (f"batched, all {cores} cores", lambda: scraper.extract_keywords_batched(iter(articles), workers=cores)),
+        ("batched, approximate", lambda: scraper.extract_keywords_batched(
+            iter(articles), workers=1, approximate=True, capacity=1_000)),
+    ]
+    rows = []
+    for label, func in cases:
+        _, elapsed, peak = measure(func)
+        rows.append([label, f"{size / elapsed:,.0f}", f"{peak / 1e6:.1f}"])
+
+    print(f"\n=== Keyword extraction ({size:,} articles) ===")
+    print_table(["path", "articles/s", "peak MB"], rows)
+
+
+def bench_cache(size: int) -> None:
+    """Measure the ResultCache on a corpus with heavy duplication."""
+    unique = sample_corpus(max(size // 20, 1))
+    corpus = [unique[i % len(unique)] for i in range(size)]
+    rows = []
+    for label, cache in (("no cache", None), ("memory cache", ResultCache())):
+        processor = TextProcessor(cache)
+
+        def run() -> None:
+            for text in corpus:
+                processor.clean_text(text)
+                processor.calculate_readability_score(text)
+                processor.keyword_counts(text)
+
+        _, elapsed = timed(run)
+        hit_rate = cache.stats()["hit_rate"] if cache else "-"
+        rows.append([label, f"{size / elapsed:,.0f}", hit_rate])
+
+    print(f"\n=== Result cache ({size:,} documents, {len(unique):,} unique) ===")
+    print_table(["path", "docs/s", "hit rate"], rows)
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def bench_fetch(size: int) -> None:
+    """Measure AsyncScraper throughput and latency against a local server."""
+    async def run() -> List[List[Any]]:
+        server = ArticleServer(latency=0.005)
+        await server.start()
+        rows = []
+        try:
+            for concurrency in (1, 8, 32, 128):
+                scraper = AsyncScraper(concurrency=concurrency, per_host=concurrency)
+                start = time.perf_counter()
+                pages = [page async for page in scraper.fetch_all(server.urls(size))]
+                elapsed = time.perf_counter() - start
+                await scraper.close()
+                latencies = [page["latency"] * 1e3 for page in pages]
+                rows.append([concurrency, f"{len(pages) / elapsed:,.0f}",
+                             f"{percentile(latencies, 0.5):.1f}", f"{percentile(latencies, 0.99):.1f}",
+                             scraper.connection_stats()["opened"]])
+        finally:
+            await server.close()
+        return rows
+
+    rows = asyncio.run(run())
+    print(f"\n=== Async fetch ({size:,} pages, 5 ms server latency) ===")
+    print_table(["concurrency", "pages/s", "p50 ms", "p99 ms", "connections"], rows)
+
+
+def list_workflow(analyzer: DataAnalyzer, days: int) -> Dict[str, int]:
+    """The list-at-every-stage time series workflow from script_2's main()."""
+    data = analyzer.generate_time_series(days, seed=1)
+    with_ma = analyzer.calculate_moving_average(data, window=7)
+    anomalies = analyzer.detect_anomalies(with_ma)
+    grouped = analyzer.group_by_category(anomalies, "category")
+    return {category: len(items) for category, items in grouped.items()}
+
+
+def bench_pipeline(size: int) -> None:
+    """Compare peak memory of main()'s list workflow and the lazy pipeline as input grows.
+
+    The pipeline scores anomalies online against earlier points, while
+    main() scores them against the whole series, so the anomaly counts are
+    printed side by side rather than expected to match.
+    """
+    analyzer = DataAnalyzer()
+    rows = []
+    pipeline = None
+    for days in (size // 4, size // 2, size):
+        list_counts, list_time, list_peak = measure(lambda: list_workflow(analyzer, days))
+        pipeline = analyzer.time_series_pipeline(days, seed=1)
+        pipe_counts, pipe_time, pipe_peak = measure(lambda: pipeline.count_by("category"))
+        rows.append([f"{days:,}", f"{list_peak / 1e6:.1f}", f"{pipe_peak / 1e6:.1f}",
+                     f"{days / list_time:,.0f}", f"{days / pipe_time:,.0f}",
+                     f"{sum(list_counts.values()):,}", f"{sum(pipe_counts.values()):,}"])
+
+    print(f"\n=== main() list workflow vs lazy pipeline (up to {size:,} points) ===")
+    print_table(["points", "list peak MB", "pipeline peak MB", "list pts/s", "pipeline pts/s",
+                 "list anomalies", "pipeline anomalies"], rows)
+    print(f"\nStage timings at {size:,} points (traced):")
+    print(pipeline.report())
+
+
+def stats_match(result: Dict[Any, Dict[str, float]], expected: Dict[Any, Dict[str, float]]) -> bool:
+    """Exact match, except sums (and what derives from them) within float rounding."""
+    if result.keys() != expected.keys():
+        return False
+    for key, stats in expected.items():
+        if result[key].keys() != stats.keys():
+            return False
+        for name, value in stats.items():
+            if name in ("sum", "mean"):
+                if not math.isclose(result[key][name], value, rel_tol=1e-12):
+                    return False
+            elif result[key][name] != value:
+                return False
+    return True
+
+
+def bench_groupby(size: int) -> None:
+    """Compare group_by_category + calculate_statistics with the aggregating group-by."""
+    analyzer = DataAnalyzer()
+    data = analyzer.generate_time_series(size, seed=1)
+    keys = ("category", "region")
+
+    def lists() -> Dict[Any, Dict[str, float]]:
+        grouped: Dict[Any, List[Dict[str, Any]]] = {}
+        for point in data:
+            grouped.setdefault((point["category"], point["region"]), []).append(point)
+        return {key: analyzer.calculate_statistics(items) for key, items in grouped.items()}
+
+    expected, list_time = timed(lists)
+    _, _, list_peak = measure(lists)
+    rows = [["lists + sort", f"{list_peak / 1e6:.1f}", f"{size / list_time:,.0f}", "yes"]]
+    for label, options in (("select", {"median": "select"}),
+                           ("histogram", {"median": "histogram"}),
+                           ("no median", {"median": None}),
+                           ("select, spilling", {"median": "select", "max_groups": 4})):
+        result, agg_time = timed(lambda: analyzer.aggregate_by(data, keys, **options))
+        _, _, agg_peak = measure(lambda: analyzer.aggregate_by(data, keys, **options))
+        if options["median"] is None:
+            expected_cmp = {key: {k: v for k, v in stats.items() if k != "median"}
+                            for key, stats in expected.items()}
+        else:
+            expected_cmp = expected
+        rows.append([label, f"{agg_peak / 1e6:.1f}", f"{size / agg_time:,.0f}",
+                     "yes" if stats_match(result, expected_cmp) else "NO"])
+
+    print(f"\n=== Group-by statistics, category x region ({size:,} points) ===")
+    print_table(["method", "peak MB", "pts/s", "matches"], rows)
+
+
+def bench_instrument(size: int) -> None:
+    """Measure the cost of instrumentation on a call-heavy text workload."""
+    corpus = sample_corpus(size)
+    processor = TextProcessor()
+
+    def workload() -> int:
+        return sum(len(processor.clean_text(text)) for text in corpus)
+
+    rows = []
+    workload()
+    _, baseline = timed(workload)
+    rows.append(["disabled", f"{size / baseline:,.0f}", "-"])
+    for label, memory in (("enabled", False), ("enabled + memory", True)):
+        with Instrumentation(memory=memory, max_spans=1_000):
+            _, elapsed = timed(workload)
+        rows.append([label, f"{size / elapsed:,.0f}", f"{(elapsed / baseline - 1) * 100:+.0f}%"])
+    _, after = timed(workload)
+    rows.append(["disabled again", f"{size / after:,.0f}", f"{(after / baseline - 1) * 100:+.0f}%"])
+
+    print(f"\n=== Instrumentation overhead ({size:,} clean_text calls) ===")
+    print_table(["mode", "calls/s", "overhead"], rows)
+
+
+BENCHMARKS: Dict[str, Tuple[Callable[[int], None], int]] = {
+    "columnar": (bench_columnar, 200_000),
+    "streaming": (bench_streaming, 200_000),
+    "parallel": (bench_parallel, 1_000_000),
+    "index": (bench_index, 500_000),
+    "io": (bench_io, 200_000),
+    "generate": (bench_generate, 500_000),
+    "windows": (bench_windows, 100_000),
+    "text": (bench_text, 50_000),
+    "keywords": (bench_keywords, 50_000),
+    "cache": (bench_cache, 50_000),
+    "fetch": (bench_fetch, 2_000),
+    "pipeline": (bench_pipeline, 400_000),
+    "groupby": (bench_groupby, 500_000),
+    "instrument": (bench_instrument, 50_000),
+}
+
+
+def main():
+    """Parse arguments and run the selected benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("names", nargs="*", metavar="name",
+                        help=f"benchmarks to run (default: all of {', '.join(sorted(BENCHMARKS))})")
+    parser.add_argument("--size", type=int, default=None,
+                        help="override the default input size")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    for name in args.names or sorted(BENCHMARKS):
+        func, default_size = BENCHMARKS[name]
+        func(args.size or default_size)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+Performance regression suite for the demo scripts
+Times the main DataProcessor, TextProcessor, DataAnalyzer and
+WebScrapingSimulator entry points at several input sizes, stores the
+results as JSON baselines and compares later runs against them:
+
+    python perf_suite.py --save baseline.json
+    python perf_suite.py --compare baseline.json     # exit 1 on regression
+    python perf_suite.py --quick --commit HEAD       # per-commit summary
+
+A case regresses when its median slows down by more than ``--threshold``
+and a one-sided Mann-Whitney U test over the round timings rejects "no
+change" at ``--alpha``, so noise on a busy machine is not reported as a
+regression.
+"""
+
+import os
+import sys
+import json
+import gc
+import math
+import time
+import random
+import argparse
+import datetime
+import platform
+import tempfile
+import subprocess
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from script_1 import DataProcessor
+from script_2 import DataAnalyzer, TextProcessor, WebScrapingSimulator
+
+BASELINE_VERSION = 1
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+QUICK_SIZES = (1_000, 10_000)
+TEXT_SIZES = (100, 1_000, 10_000)
+QUICK_TEXT_SIZES = (100, 1_000)
+
+
+def _records(size: int) -> List[Dict[str, Any]]:
+    return DataProcessor("perf").generate_sample_data(size, seed=size)
+
+
+def _time_series(size: int) -> List[Dict[str, Any]]:
+    return DataAnalyzer().generate_time_series(size, seed=size)
+
+
+def _articles(size: int) -> List[Dict[str, Any]]:
+    random.seed(size)
+    scraper = WebScrapingSimulator()
+    articles = []
+    for i in range(size):
+        content = scraper._generate_article_content()
+        if i % 3 == 0:
+            content = f"<p>{content} More at https://example.com/{i}.</p>"
+        articles.append({"id": i, "content": content})
+    return articles
+
+
+def _save_case(method: str) -> Callable[[int, str], Callable[[], Any]]:
+    def setup(size: int, workdir: str) -> Callable[[], Any]:
+        processor = DataProcessor("perf")
+        data = _records(size)
+        path = os.path.join(workdir, f"data.{method[len('save_to_'):]}")
+        return lambda: getattr(processor, method)(data, path)
+    return setup
+
+
+def _setup_generate(size: int, workdir: str) -> Callable[[], Any]:
+    processor = DataProcessor("perf")
+    return lambda: processor.generate_sample_data(size, seed=size)
+
+
+def _setup_process(size: int, workdir: str) -> Callable[[], Any]:
+    processor = DataProcessor("perf")
+    data = _records(size)
+    return lambda: processor.process_data(data)
+
+
+def _setup_filter(size: int, workdir: str) -> Callable[[], Any]:
+    processor = DataProcessor("perf")
+    data = _records(size)
+    return lambda: processor.filter_data(data, category="electronics",
+                                         min_price=100.0, max_price=300.0)
+
+
+def _setup_clean(size: int, workdir: str) -> Callable[[], Any]:
+    processor = TextProcessor()
+    texts = [article["content"] for article in _articles(size)]
+    return lambda: [processor.clean_text(text) for text in texts]
+
+
+def _setup_moving_average(size: int, workdir: str) -> Callable[[], Any]:
+    analyzer = DataAnalyzer()
+    data = _time_series(size)
+    return lambda: analyzer.calculate_moving_average(data, window=7)
+
+
+def _setup_anomalies(size: int, workdir: str) -> Callable[[], Any]:
+    analyzer = DataAnalyzer()
+    data = _time_series(size)
+    return lambda: analyzer.detect_anomalies(data)
+
+
+def _setup_keywords(size: int, workdir: str) -> Callable[[], Any]:
+    scraper = WebScrapingSimulator()
+    articles = _articles(size)
+    return lambda: scraper.extract_keywords(articles)
+
+
+# name -> (setup(size, workdir) returning the timed callable, sizes, quick sizes)
+CASES: Dict[str, Tuple[Callable[[int, str], Callable[[], Any]], Tuple[int, ...], Tuple[int, ...]]] = {
+    "generate_sample_data": (_setup_generate, DEFAULT_SIZES, QUICK_SIZES),
+    "process_data": (_setup_process, DEFAULT_SIZES, QUICK_SIZES),
+    "filter_data": (_setup_filter, DEFAULT_SIZES, QUICK_SIZES),
+    "save_to_csv": (_save_case("save_to_csv"), DEFAULT_SIZES, QUICK_SIZES),
+    "save_to_json": (_save_case("save_to_json"), DEFAULT_SIZES, QUICK_SIZES),
+    "clean_text": (_setup_clean, TEXT_SIZES, QUICK_TEXT_SIZES),
+    "calculate_moving_average": (_setup_moving_average, DEFAULT_SIZES, QUICK_SIZES),
+    "detect_anomalies": (_setup_anomalies, DEFAULT_SIZES, QUICK_SIZES),
+    "extract_keywords": (_setup_keywords, TEXT_SIZES, QUICK_TEXT_SIZES),
+}
+
+
+def calibrate(func: Callable[[], Any], min_time: float) -> int:
+    """Number of calls per round so one round takes at least ``min_time``."""
+    iterations = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or iterations >= 1 << 20:
+            return iterations
+        iterations = max(iterations * 2, int(iterations * min_time / max(elapsed, 1e-9)) + 1)
+
+
+def summarize(samples: List[float]) -> Dict[str, Any]:
+    """Summary statistics of per-call timings in seconds."""
+    ordered = sorted(samples)
+    count = len(ordered)
+    mean = sum(ordered) / count
+    stdev = math.sqrt(sum((x - mean) ** 2 for x in ordered) / (count - 1)) if count > 1 else 0.0
+
+    def quantile(fraction: float) -> float:
+        position = (count - 1) * fraction
+        low = int(position)
+        high = min(low + 1, count - 1)
+        return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+    return {
+        "rounds": count,
+        "min": ordered[0],
+        "max": ordered[-1],
+        "mean": mean,
+        "stdev": stdev,
+        "median": quantile(0.5),
+        "iqr": quantile(0.75) - quantile(0.25),
+        "samples": samples
+    }
+
+
+def run_case(name: str, size: int, rounds: int = 7, min_time: float = 0.05) -> Dict[str, Any]:
+    """Time one case at one size: calibrate, warm up, then ``rounds`` rounds.
+
+    Like ``timeit``, the garbage collector is paused while rounds run so
+    collections triggered by earlier cases do not land in the timings.
+    """
+    setup = CASES[name][0]
+    with tempfile.TemporaryDirectory(prefix="perf-") as workdir:
+        func = setup(size, workdir)
+        iterations = calibrate(func, min_time)
+        samples = []
+        gc.collect()
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for _ in range(rounds):
+                start = time.perf_counter()
+                for _ in range(iterations):
+                    func()
+                samples.append((time.perf_counter() - start) / iterations)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+    result = summarize(samples)
+    result.update({"case": name, "size": size, "iterations": iterations,
+                   "records_per_second": size / result["median"] if result["median"] else 0.0})
+    return result
+
+
+def machine_info() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count()
+    }
+
+
+def run_suite(names: Optional[List[str]] = None, quick: bool = False, rounds: int = 7,
+              min_time: float = 0.05, verbose: bool = True) -> Dict[str, Any]:
+    """Run the selected cases and return a baseline-shaped document."""
+    results = {}
+    for name in names or list(CASES):
+        _, sizes, quick_sizes = CASES[name]
+        for size in (quick_sizes if quick else sizes):
+            result = run_case(name, size, rounds, min_time)
+            results[f"{name}[{size}]"] = result
+            if verbose:
+                print(f"{name}[{size}]: median {result['median'] * 1e3:.3f} ms "
+                      f"(iqr {result['iqr'] * 1e3:.3f} ms, {result['rounds']} rounds)",
+                      file=sys.stderr)
+    return {
+        "version": BASELINE_VERSION,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "commit": _git("rev-parse", "HEAD"),
+        "machine": machine_info(),
+        "results": results
+    }
+
+
+def mann_whitney_p(baseline: List[float], current: List[float]) -> float:
+    """One-sided p-value that ``current`` timings are not larger than ``baseline``.
+
+    Uses the normal approximation with tie correction, which is adequate
+    for the handful of rounds each case records.
+    """
+    n1, n2 = len(baseline), len(current)
+    if not n1 or not n2:
+        return 1.0
+    combined = sorted([(value, 0) for value in baseline] + [(value, 1) for value in current])
+    ranks = [0.0] * len(combined)
+    tie_term = 0
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        tie_term += (j - i + 1) ** 3 - (j - i + 1)
+        i = j + 1
+    rank_sum = sum(rank for rank, (_, group) in zip(ranks, combined) if group == 1)
+    u = rank_sum - n2 * (n2 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.20,
+            alpha: float = 0.05) -> List[Dict[str, Any]]:
+    """Compare two suite documents case by case."""
+    rows = []
+    for key, result in current["results"].items():
+        reference = baseline.get("results", {}).get(key)
+        if reference is None:
+            rows.append({"case": key, "status": "new", "baseline": None,
+                         "current": result["median"], "change": None, "p_value": None})
+            continue
+        change = result["median"] / reference["median"] - 1 if reference["median"] else 0.0
+        p_slower = mann_whitney_p(reference["samples"], result["samples"])
+        p_faster = mann_whitney_p(result["samples"], reference["samples"])
+        if change > threshold and p_slower < alpha:
+            status = "regression"
+        elif change < -threshold and p_faster < alpha:
+            status = "improved"
+        else:
+            status = "ok"
+        rows.append({"case": key, "status": status, "baseline": reference["median"],
+                     "current": result["median"], "change": round(change, 4),
+                     "p_value": round(min(p_slower, p_faster), 6)})
+    return rows
+
+
+def print_comparison(rows: List[Dict[str, Any]]) -> None:
+    headers = ["case", "baseline ms", "current ms", "change", "p", "status"]
+    cells = [headers]
+    for row in rows:
+        cells.append([
+            row["case"],
+            "-" if row["baseline"] is None else f"{row['baseline'] * 1e3:.3f}",
+            f"{row['current'] * 1e3:.3f}",
+            "-" if row["change"] is None else f"{row['change'] * 100:+.1f}%",
+            "-" if row["p_value"] is None else f"{row['p_value']:.4f}",
+            row["status"].upper() if row["status"] == "regression" else row["status"]
+        ])
+    widths = [max(len(row[i]) for row in cells) for i in range(len(headers))]
+    for index, row in enumerate(cells):
+        print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)))
+        if index == 0:
+            print("  ".join("-" * width for width in widths))
+
+
+def load(path: str) -> Optional[Dict[str, Any]]:
+    """Read a suite document, or None when it is missing or unreadable."""
+    try:
+        with open(path) as handle:
+            document = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    if document.get("version") != BASELINE_VERSION:
+        print(f"Ignoring {path}: unsupported baseline version", file=sys.stderr)
+        return None
+    return document
+
+
+def save(document: Dict[str, Any], path: str) -> bool:
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as handle:
+            json.dump(document, handle, indent=2)
+        return True
+    except OSError as e:
+        print(f"Error saving results to {path}: {e}", file=sys.stderr)
+        return False
+
+
+def _git(*args: str) -> Optional[str]:
+    try:
+        output = subprocess.run(["git", *args], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.strip() or None
+
+
+def commit_summary(document: Dict[str, Any], commit: str,
+                   baseline: Optional[Dict[str, Any]], threshold: float,
+                   alpha: float) -> Tuple[str, Dict[str, Any]]:
+    """Build ``commit_logs/<hash>/perf.json`` next to the hook's stats.json.
+
+    Compares against ``baseline`` or, without one, the parent commit's summary.
+    """
+    root = _git("rev-parse", "--show-toplevel") or os.getcwd()
+    commit_hash = _git("rev-parse", commit) or commit
+    if baseline is None:
+        parent = _git("rev-parse", f"{commit_hash}^")
+        if parent:
+            baseline = load(os.path.join(root, "commit_logs", parent, "perf.json"))
+    comparison = compare(baseline, document, threshold, alpha) if baseline else []
+    summary = dict(document)
+    summary["commit"] = commit_hash
+    summary["compared_to"] = baseline.get("commit") if baseline else None
+    summary["comparison"] = comparison
+    summary["regressions"] = sum(row["status"] == "regression" for row in comparison)
+    return os.path.join(root, "commit_logs", commit_hash, "perf.json"), summary
+
+
+def main():
+    """Parse arguments, run the suite and compare or save the results."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("names", nargs="*", metavar="case",
+                        help=f"cases to run (default: all of {', '.join(CASES)})")
+    parser.add_argument("--quick", action="store_true", help="only run the smaller sizes")
+    parser.add_argument("--rounds", type=int, default=7, help="timed rounds per case")
+    parser.add_argument("--min-time", type=float, default=0.05,
+                        help="minimum seconds per round (calls are repeated to reach it)")
+    parser.add_argument("--save", metavar="PATH", help="write the results as a baseline")
+    parser.add_argument("--compare", metavar="PATH", help="baseline to compare against")
+    parser.add_argument("--threshold", type=float, default=0.20,
+                        help="relative slowdown of the median that counts as a regression")
+    parser.add_argument("--alpha", type=float, default=0.05,
+                        help="significance level for the Mann-Whitney U test")
+    parser.add_argument("--commit", metavar="REV",
+                        help="write a perf summary to commit_logs/<hash>/perf.json")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.names if name not in CASES]
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(unknown)}")
+    if args.rounds < 2:
+        parser.error("--rounds must be at least 2")
+
+    baseline = None
+    if args.compare:
+        baseline = load(args.compare)
+        if baseline is None:
+            parser.error(f"cannot read baseline {args.compare}")
+
+    document = run_suite(args.names, args.quick, args.rounds, args.min_time)
+    if args.save and save(document, args.save):
+        print(f"Baseline saved to {args.save}")
+
+    regressions = 0
+    if baseline is not None:
+        rows = compare(baseline, document, args.threshold, args.alpha)
+        print_comparison(rows)
+        regressions = sum(row["status"] == "regression" for row in rows)
+
+    if args.commit:
+        path, summary = commit_summary(document, args.commit, baseline,
+                                       args.threshold, args.alpha)
+        if save(summary, path):
+            print(f"Perf summary written to {path}")
+        if baseline is None and summary["comparison"]:
+            print_comparison(summary["comparison"])
+            regressions = summary["regressions"]
+
+    if regressions:
+        print(f"{regressions} performance regression(s) detected", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,15 +11,630 @@ import json
 import csv
 import random
 import datetime
+import gzip
 import hashlib
+import itertools
+import math
+import operator
 import statistics
-from typing import List, Dict, Any, Optional
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter, deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Union
+
+import instrumentation
+
+
+class ColumnarTable:
+    """Column-oriented product table backed by typed arrays.
+
+    Numeric fields live in ``array`` columns and ``category`` is dictionary
+    encoded, so a row costs a few dozen bytes instead of a full dict. Rows can
+    still be read back as dicts by indexing or iterating the table.
+    """
+
+    FIELDS = ("id", "name", "category", "price", "quantity", "rating", "available")
+
+    def __init__(self):
+        self.ids = array("q")
+        self.prices = array("d")
+        self.quantities = array("q")
+        self.ratings = array("d")
+        self.available = array("b")
+        self.category_codes = array("H")
+        self.categories: List[str] = []
+        self._category_lookup: Dict[str, int] = {}
+        # Names are only stored when they differ from the generated "Product_<id>"
+        self._names: Optional[List[str]] = None
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> "ColumnarTable":
+        """Build a table from an iterable of product dicts."""
+        table = cls()
+        table.extend(records)
+        return table
+
+    def encode_category(self, category: str) -> int:
+        """Return the dictionary code for a category, registering it if new."""
+        code = self._category_lookup.get(category)
+        if code is None:
+            code = len(self.categories)
+            self.categories.append(category)
+            self._category_lookup[category] = code
+        return code
+
+    def category_code(self, category: str) -> Optional[int]:
+        """Return the code for a known category, or None if it never occurs."""
+        return self._category_lookup.get(category)
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """Append a single product record."""
+        row_id = record["id"]
+        name = record["name"]
+        if self._names is not None:
+            self._names.append(name)
+        elif name != f"Product_{row_id}":
+            self._names = [f"Product_{i}" for i in self.ids]
+            self._names.append(name)
+        self.ids.append(row_id)
+        self.category_codes.append(self.encode_category(record["category"]))
+        self.prices.append(record["price"])
+        self.quantities.append(record["quantity"])
+        self.ratings.append(record["rating"])
+        self.available.append(bool(record["available"]))
+
+    def extend(self, records: Iterable[Dict[str, Any]]) -> None:
+        """Append every record from an iterable."""
+        for record in records:
+            self.append(record)
+
+    def name(self, row: int) -> str:
+        """Return the product name of a row."""
+        if self._names is not None:
+            return self._names[row]
+        return f"Product_{self.ids[row]}"
+
+    def record(self, row: int) -> Dict[str, Any]:
+        """Materialize a single row as a dict."""
+        return {
+            "id": self.ids[row],
+            "name": self.name(row),
+            "category": self.categories[self.category_codes[row]],
+            "price": self.prices[row],
+            "quantity": self.quantities[row],
+            "rating": self.ratings[row],
+            "available": bool(self.available[row])
+        }
+
+    def take(self, rows: Iterable[int]) -> "ColumnarTable":
+        """Return a new table holding only the given row positions."""
+        table = ColumnarTable()
+        table.categories = list(self.categories)
+        table._category_lookup = dict(self._category_lookup)
+        rows = list(rows)
+        table.ids = array("q", [self.ids[r] for r in rows])
+        table.prices = array("d", [self.prices[r] for r in rows])
+        table.quantities = array("q", [self.quantities[r] for r in rows])
+        table.ratings = array("d", [self.ratings[r] for r in rows])
+        table.available = array("b", [self.available[r] for r in rows])
+        table.category_codes = array("H", [self.category_codes[r] for r in rows])
+        if self._names is not None:
+            table._names = [self._names[r] for r in rows]
+        return table
+
+    def slice(self, start: int, stop: int) -> "ColumnarTable":
+        """Return a new table holding the contiguous rows ``start:stop``."""
+        table = ColumnarTable()
+        table.categories = list(self.categories)
+        table._category_lookup = dict(self._category_lookup)
+        table.ids = self.ids[start:stop]
+        table.prices = self.prices[start:stop]
+        table.quantities = self.quantities[start:stop]
+        table.ratings = self.ratings[start:stop]
+        table.available = self.available[start:stop]
+        table.category_codes = self.category_codes[start:stop]
+        if self._names is not None:
+            table._names = self._names[start:stop]
+        return table
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Convert the table back into the list-of-dicts representation."""
+        return list(self)
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the column buffers."""
+        columns = (self.ids, self.prices, self.quantities, self.ratings,
+                   self.available, self.category_codes)
+        total = sum(col.itemsize * len(col) for col in columns)
+        total += sum(sys.getsizeof(cat) for cat in self.categories)
+        if self._names is not None:
+            total += sum(sys.getsizeof(name) for name in self._names)
+        return total
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for row in range(len(self.ids)):
+            yield self.record(row)
+
+    def __getitem__(self, row: int) -> Dict[str, Any]:
+        if row < 0:
+            row += len(self.ids)
+        if not 0 <= row < len(self.ids):
+            raise IndexError("ColumnarTable index out of range")
+        return self.record(row)
+
+
+Records = Union[List[Dict[str, Any]], ColumnarTable]
+
+
+class RunningStats:
+    """Single-pass summary of one numeric field.
+
+    Mean and variance use Welford's update, min/max are tracked directly and
+    the median comes from a value histogram. The histogram is exact for the
+    low-cardinality, rounded fields the demo generates; pass ``precision`` to
+    bucket values to that many decimals and bound the median error by
+    ``0.5 * 10 ** -precision`` on high-cardinality data.
+    """
+
+    def __init__(self, precision: Optional[int] = None):
+        self.precision = precision
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.histogram: Counter = Counter()
+
+    def push(self, value: float) -> None:
+        """Add a single value."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        self.histogram[value if self.precision is None else round(value, self.precision)] += 1
+
+    def merge(self, other: "RunningStats") -> "RunningStats":
+        """Fold another partial state into this one (Chan et al. combination)."""
+        if not other.count:
+            return self
+        if not self.count:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            self.histogram.update(other.histogram)
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.histogram.update(other.histogram)
+        return self
+
+    def stdev(self) -> float:
+        """Sample standard deviation, 0 for fewer than two values."""
+        if self.count < 2:
+            return 0
+        return math.sqrt(max(self.m2, 0.0) / (self.count - 1))
+
+    def median(self) -> float:
+        """Median with the same even-count convention as statistics.median."""
+        if not self.count:
+            raise statistics.StatisticsError("no median for empty data")
+        upper = self.count // 2
+        targets = [upper] if self.count % 2 else [upper - 1, upper]
+        found = []
+        seen = 0
+        for value in sorted(self.histogram):
+            seen += self.histogram[value]
+            while targets and targets[0] < seen:
+                found.append(value)
+                targets.pop(0)
+            if not targets:
+                break
+        if len(found) == 1:
+            return found[0]
+        return (found[0] + found[1]) / 2
+
+    def to_state(self) -> Dict[str, Any]:
+        """Return a JSON-serializable partial state."""
+        return {
+            "precision": self.precision,
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "min": self.min,
+            "max": self.max,
+            "histogram": [[value, n] for value, n in self.histogram.items()]
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "RunningStats":
+        """Rebuild a partial state produced by ``to_state``."""
+        stats = cls(state["precision"])
+        stats.count = state["count"]
+        stats.mean = state["mean"]
+        stats.m2 = state["m2"]
+        stats.min = state["min"]
+        stats.max = state["max"]
+        stats.histogram = Counter({value: n for value, n in state["histogram"]})
+        return stats
+
+
+class StreamingAggregator:
+    """One-pass, mergeable equivalent of ``DataProcessor.process_data``.
+
+    Records are consumed from any iterator without being retained, and
+    partial aggregators built over separate shards can be merged. Against
+    ``process_data`` on the same rows: counts, min, max and medians are exact
+    (unless a median ``precision`` is set); means and stdevs agree to within
+    1e-9 relative; category ``total_price`` sums agree to within float
+    rounding, since merged shards add in a different order.
+    """
+
+    def __init__(self, median_precision: Optional[int] = None):
+        self.price = RunningStats(median_precision)
+        self.quantity = RunningStats(median_precision)
+        self.rating = RunningStats(median_precision)
+        self.categories: Dict[str, Dict[str, Any]] = {}
+
+    def push(self, record: Dict[str, Any]) -> None:
+        """Add a single product record."""
+        price = record["price"]
+        self.price.push(price)
+        self.quantity.push(record["quantity"])
+        self.rating.push(record["rating"])
+        cat = record["category"]
+        if cat not in self.categories:
+            self.categories[cat] = {"count": 0, "total_price": 0}
+        self.categories[cat]["count"] += 1
+        self.categories[cat]["total_price"] += price
+
+    def update(self, data: Union[Iterable[Dict[str, Any]], ColumnarTable]) -> "StreamingAggregator":
+        """Consume records from an iterable or the columns of a table."""
+        if isinstance(data, ColumnarTable):
+            names = data.categories
+            for code, price, quantity, rating in zip(data.category_codes, data.prices,
+                                                     data.quantities, data.ratings):
+                self.price.push(price)
+                self.quantity.push(quantity)
+                self.rating.push(rating)
+                cat = names[code]
+                if cat not in self.categories:
+                    self.categories[cat] = {"count": 0, "total_price": 0}
+                self.categories[cat]["count"] += 1
+                self.categories[cat]["total_price"] += price
+            return self
+
+        for record in data:
+            self.push(record)
+        return self
+
+    def merge(self, other: "StreamingAggregator") -> "StreamingAggregator":
+        """Fold another aggregator's partial state into this one."""
+        self.price.merge(other.price)
+        self.quantity.merge(other.quantity)
+        self.rating.merge(other.rating)
+        for cat, info in other.categories.items():
+            if cat not in self.categories:
+                self.categories[cat] = {"count": 0, "total_price": 0}
+            self.categories[cat]["count"] += info["count"]
+            self.categories[cat]["total_price"] += info["total_price"]
+        return self
+
+    def result(self) -> Dict[str, Any]:
+        """Return statistics shaped exactly like ``process_data`` output."""
+        if not self.price.count:
+            return {"error": "No data to process"}
+
+        return {
+            "total_records": self.price.count,
+            "price_stats": {
+                "mean": self.price.mean,
+                "median": self.price.median(),
+                "stdev": self.price.stdev()
+            },
+            "quantity_stats": {
+                "mean": self.quantity.mean,
+                "median": self.quantity.median(),
+                "min": self.quantity.min,
+                "max": self.quantity.max,
+                "stdev": self.quantity.stdev()
+            },
+            "rating_stats": {
+                "mean": self.rating.mean,
+                "median": self.rating.median(),
+                "min": self.rating.min,
+                "max": self.rating.max,
+                "stdev": self.rating.stdev()
+            },
+            "category_breakdown": {cat: dict(info) for cat, info in self.categories.items()}
+        }
+
+    def to_state(self) -> Dict[str, Any]:
+        """Return a JSON-serializable partial state for shipping between shards."""
+        return {
+            "price": self.price.to_state(),
+            "quantity": self.quantity.to_state(),
+            "rating": self.rating.to_state(),
+            "categories": {cat: dict(info) for cat, info in self.categories.items()}
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "StreamingAggregator":
+        """Rebuild an aggregator from ``to_state`` output."""
+        aggregator = cls()
+        aggregator.price = RunningStats.from_state(state["price"])
+        aggregator.quantity = RunningStats.from_state(state["quantity"])
+        aggregator.rating = RunningStats.from_state(state["rating"])
+        aggregator.categories = {cat: dict(info) for cat, info in state["categories"].items()}
+        return aggregator
+
+
+class DataIndex:
+    """Category and price index over one dataset.
+
+    Built once in O(n log n); afterwards a query costs O(log n + k) by
+    bisecting the price-sorted rows and intersecting with the category's row
+    list from whichever side is smaller. Row ids are positions in the indexed
+    data and queries return them in input order.
+    """
+
+    def __init__(self, data: Records):
+        self.size = len(data)
+        self.category_rows: Dict[str, array] = {}
+        if isinstance(data, ColumnarTable):
+            self.prices = array("d", data.prices)
+            self.categories = list(data.categories)
+            self.codes = array("H", data.category_codes)
+        else:
+            self.prices = array("d", (item["price"] for item in data))
+            self.categories = []
+            lookup: Dict[str, int] = {}
+            self.codes = array("H")
+            for item in data:
+                cat = item["category"]
+                code = lookup.get(cat)
+                if code is None:
+                    code = lookup[cat] = len(self.categories)
+                    self.categories.append(cat)
+                self.codes.append(code)
+
+        for cat in self.categories:
+            self.category_rows[cat] = array("q")
+        for row, code in enumerate(self.codes):
+            self.category_rows[self.categories[code]].append(row)
+
+        order = sorted(range(self.size), key=self.prices.__getitem__)
+        self.price_rows = array("q", order)
+        self.sorted_prices = array("d", (self.prices[row] for row in order))
+
+    def rows(self, category: Optional[str] = None,
+             min_price: Optional[float] = None,
+             max_price: Optional[float] = None) -> List[int]:
+        """Return matching row ids with the same semantics as ``filter_data``."""
+        has_range = min_price is not None or max_price is not None
+        if not category and not has_range:
+            return list(range(self.size))
+        if category and category not in self.category_rows:
+            return []
+
+        if has_range:
+            lo = 0 if min_price is None else bisect_left(self.sorted_prices, min_price)
+            hi = self.size if max_price is None else bisect_right(self.sorted_prices, max_price)
+            if lo >= hi:
+                return []
+        if not category:
+            return sorted(self.price_rows[lo:hi])
+
+        cat_rows = self.category_rows[category]
+        if not has_range:
+            return list(cat_rows)
+        if len(cat_rows) <= hi - lo:
+            low = self.sorted_prices[lo]
+            high = self.sorted_prices[hi - 1]
+            prices = self.prices
+            return [row for row in cat_rows if low <= prices[row] <= high]
+        code = self.categories.index(category)
+        codes = self.codes
+        return sorted(row for row in self.price_rows[lo:hi] if codes[row] == code)
+
+
+SAMPLE_CATEGORIES = ["electronics", "clothing", "books", "home", "sports"]
+
+
+class SampleColumnGenerator:
+    """Column-at-a-time generator for sample product tables.
+
+    Every column draws from its own ``random.Random`` seeded from
+    ``seed`` and the column name, so a given seed yields the same rows
+    no matter how the output is split into batches. Prices are uniform
+    over whole cents and ratings over tenths, matching the rounding of
+    ``generate_sample_data``.
+    """
+
+    COLUMNS = ("category", "price", "quantity", "rating", "available")
+
+    def __init__(self, seed: Optional[Any] = None):
+        self.seed = seed
+        self._rngs = {
+            column: random.Random(None if seed is None else f"{seed}:{column}")
+            for column in self.COLUMNS
+        }
+        self.next_id = 1
+
+    def batch(self, size: int) -> ColumnarTable:
+        """Generate the next ``size`` rows as a table."""
+        rngs = self._rngs
+        table = ColumnarTable()
+        codes = [table.encode_category(cat) for cat in SAMPLE_CATEGORIES]
+        table.ids = array("q", range(self.next_id, self.next_id + size))
+        table.category_codes = array("H", rngs["category"].choices(codes, k=size))
+        table.prices = array("d", map(operator.truediv,
+                                      rngs["price"].choices(range(1000, 50001), k=size),
+                                      itertools.repeat(100)))
+        table.quantities = array("q", rngs["quantity"].choices(range(1, 101), k=size))
+        table.ratings = array("d", map(operator.truediv,
+                                       rngs["rating"].choices(range(10, 51), k=size),
+                                       itertools.repeat(10)))
+        table.available = array("b", rngs["available"].choices((1, 0), k=size))
+        self.next_id += size
+        return table
+
+
+# Inputs smaller than this are processed serially; pool startup and pickling
+# cost more than the work saved.
+PARALLEL_MIN_RECORDS = 100_000
+DEFAULT_CHUNK_SIZE = 50_000
+
+
+def _shards(data: Records, chunk_size: int) -> Iterator[Records]:
+    """Split records into contiguous shards of at most ``chunk_size`` rows."""
+    for start in range(0, len(data), chunk_size):
+        if isinstance(data, ColumnarTable):
+            yield data.slice(start, start + chunk_size)
+        else:
+            yield data[start:start + chunk_size]
+
+
+def _bounded_map(executor: Executor, func: Callable[[Any], Any], items: Iterable[Any],
+                 max_in_flight: int) -> Iterator[Any]:
+    """``executor.map`` that submits lazily, keeping at most ``max_in_flight`` pending.
+
+    ``executor.map`` pickles every shard up front, which would copy the
+    whole dataset into the pool's queue at once.
+    """
+    pending: deque = deque()
+    for item in items:
+        pending.append(executor.submit(func, item))
+        if len(pending) >= max_in_flight:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _aggregate_shard(shard: Records, median_precision: Optional[int]) -> StreamingAggregator:
+    """Worker entry point: aggregate one shard into a partial state."""
+    return StreamingAggregator(median_precision).update(shard)
+
+
+def _filter_shard(shard: Records, category: Optional[str],
+                  min_price: Optional[float], max_price: Optional[float]) -> Records:
+    """Worker entry point: filter one shard.
+
+    Tables return matching row positions rather than a new table so only a
+    compact list of ints travels back to the parent.
+    """
+    processor = DataProcessor()
+    if isinstance(shard, ColumnarTable):
+        return processor._matching_rows(shard, category, min_price, max_price)
+    return processor.filter_data(shard, category, min_price, max_price)
+
+
+STREAM_FORMATS = ("csv", "json", "ndjson")
+
+# Types restored by read_stream for CSV columns; other columns stay strings.
+CSV_FIELD_TYPES: Dict[str, Callable[[str], Any]] = {
+    "id": int,
+    "price": float,
+    "quantity": int,
+    "rating": float,
+    "available": lambda value: value == "True"
+}
+
+
+def _stream_format(filename: str, fmt: Optional[str]) -> str:
+    """Resolve the stream format from an explicit name or the file suffix."""
+    if fmt is None:
+        base = filename[:-3] if filename.endswith(".gz") else filename
+        suffix = os.path.splitext(base)[1].lower().lstrip(".")
+        fmt = "ndjson" if suffix == "jsonl" else suffix
+    if fmt not in STREAM_FORMATS:
+        raise ValueError(f"Unsupported stream format: {fmt!r}")
+    return fmt
+
+
+def _open_text(filename: str, mode: str, compress: Optional[bool]):
+    """Open a text stream, transparently gzip-compressed for ``.gz`` files."""
+    if compress is None:
+        compress = filename.endswith(".gz")
+    if compress:
+        return gzip.open(filename, mode + "t", newline="", encoding="utf-8")
+    return open(filename, mode, newline="", encoding="utf-8")
+
+
+def _iter_json_array(handle, chunk_size: int = 1 << 16) -> Iterator[Any]:
+    """Yield the elements of a top-level JSON array without loading it whole."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buffer, pos, eof
+        chunk = handle.read(chunk_size)
+        eof = not chunk
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return not eof
+
+    def skip(chars: str) -> None:
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in chars:
+                pos += 1
+            if pos < len(buffer) or not fill():
+                return
+
+    skip(" \t\r\n")
+    if buffer[pos:pos + 1] != "[":
+        # Not an array: fall back to a plain load of the single document.
+        document = buffer[pos:] + handle.read()
+        if document.strip():
+            yield json.loads(document)
+        return
+    pos += 1
+
+    while True:
+        skip(" \t\r\n,")
+        if pos >= len(buffer):
+            raise ValueError("Truncated JSON array")
+        if buffer[pos] == "]":
+            return
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            end = None
+        # A number cut by the chunk boundary decodes as a shorter number, so
+        # only trust one that is followed by a delimiter (or the end of input).
+        incomplete = end is None or (not eof and (
+            end == len(buffer) or
+            (isinstance(value, (int, float)) and not isinstance(value, bool) and
+             buffer[end] not in " \t\r\n,]")))
+        if incomplete:
+            if not fill() and end is None:
+                raise ValueError("Truncated JSON array")
+            continue
+        yield value
+        pos = end
+
 
 class DataProcessor:
     """A class for processing and analyzing data."""
     
     def __init__(self, name: str = "default_processor"):
         self.name = name
+        self._index: Optional[DataIndex] = None
         self.processed_data = []
         self.metadata = {
             "created_at": datetime.datetime.now().isoformat(),
@@ -27,33 +642,120 @@ class DataProcessor:
             "author": "Demo Script"
         }
     
-    def generate_sample_data(self, count: int = 100) -> List[Dict[str, Any]]:
-        """Generate sample data for demonstration."""
+    def generate_sample_batches(self, count: int, batch_size: int = 100_000,
+                                seed: Optional[Any] = None) -> Iterator[ColumnarTable]:
+        """Yield ``count`` sample rows as columnar batches of ``batch_size``.
+
+        Whole columns are drawn at once by ``SampleColumnGenerator``, and the
+        same seed produces the same rows for any ``batch_size``. Chain the
+        batches into ``save_stream`` to write large datasets without holding
+        them, e.g. ``save_stream(itertools.chain.from_iterable(batches), path)``.
+        """
+        generator = SampleColumnGenerator(seed)
+        remaining = count
+        while remaining > 0:
+            size = min(batch_size, remaining)
+            yield generator.batch(size)
+            remaining -= size
+
+    @property
+    def processed_data(self) -> Records:
+        """The dataset most recently passed to ``process_data``."""
+        return self._processed_data
+
+    @processed_data.setter
+    def processed_data(self, data: Records) -> None:
+        self._processed_data = data
+        self._index = None
+
+    def invalidate_index(self) -> None:
+        """Drop the query index, e.g. after editing rows of processed_data in place."""
+        self._index = None
+
+    def build_index(self) -> DataIndex:
+        """Return the index over ``processed_data``, building it if needed.
+
+        Reassigning ``processed_data`` invalidates the index automatically and
+        appends or removals are detected by a length check, but records
+        edited in place are not: call ``invalidate_index`` after changing a
+        price or category, or ``query`` returns stale rows.
+        """
+        if self._index is None or self._index.size != len(self._processed_data):
+            self._index = DataIndex(self._processed_data)
+        return self._index
+
+    def query(self, category: Optional[str] = None,
+              min_price: Optional[float] = None,
+              max_price: Optional[float] = None) -> Records:
+        """Filter ``processed_data`` through its index.
+
+        Returns the same records as ``filter_data(processed_data, ...)`` as
+        long as the index is current (see ``build_index``).
+        """
+        data = self._processed_data
+        if not category and min_price is None and max_price is None:
+            return data
+        rows = self.build_index().rows(category, min_price, max_price)
+        if isinstance(data, ColumnarTable):
+            return data.take(rows)
+        return [data[row] for row in rows]
+
+    def generate_sample_data(self, count: int = 100, columnar: bool = False,
+                             seed: Optional[Any] = None) -> Records:
+        """Generate sample data for demonstration.
+
+        With ``columnar=True`` the rows are written straight into a
+        ``ColumnarTable`` without building an intermediate dict per record.
+        Passing ``seed`` makes the output reproducible.
+        """
+        rng = random if seed is None else random.Random(seed)
+        categories = SAMPLE_CATEGORIES
+
+        if columnar:
+            table = ColumnarTable()
+            codes = [table.encode_category(cat) for cat in categories]
+            for i in range(count):
+                table.ids.append(i + 1)
+                table.category_codes.append(rng.choice(codes))
+                table.prices.append(round(rng.uniform(10.0, 500.0), 2))
+                table.quantities.append(rng.randint(1, 100))
+                table.ratings.append(round(rng.uniform(1.0, 5.0), 1))
+                table.available.append(rng.choice([True, False]))
+            return table
+
         data = []
-        categories = ["electronics", "clothing", "books", "home", "sports"]
-        
         for i in range(count):
             record = {
                 "id": i + 1,
                 "name": f"Product_{i+1}",
-                "category": random.choice(categories),
-                "price": round(random.uniform(10.0, 500.0), 2),
-                "quantity": random.randint(1, 100),
-                "rating": round(random.uniform(1.0, 5.0), 1),
-                "available": random.choice([True, False])
+                "category": rng.choice(categories),
+                "price": round(rng.uniform(10.0, 500.0), 2),
+                "quantity": rng.randint(1, 100),
+                "rating": round(rng.uniform(1.0, 5.0), 1),
+                "available": rng.choice([True, False])
             }
             data.append(record)
         
         return data
     
-    def process_data(self, data: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Process the data and return statistics."""
+    def process_data(self, data: Records) -> Dict[str, Any]:
+        """Process the data and return statistics.
+
+        Iterators (such as ``read_stream`` output) are routed through
+        ``process_stream`` so they are consumed in constant memory.
+        """
+        if isinstance(data, Iterator):
+            return self.process_stream(data)
+
         if not data:
             return {"error": "No data to process"}
         
-        prices = [item["price"] for item in data]
-        quantities = [item["quantity"] for item in data]
-        ratings = [item["rating"] for item in data]
+        if isinstance(data, ColumnarTable):
+            prices, quantities, ratings = data.prices, data.quantities, data.ratings
+        else:
+            prices = [item["price"] for item in data]
+            quantities = [item["quantity"] for item in data]
+            ratings = [item["rating"] for item in data]
         
         stats = {
             "total_records": len(data),
@@ -78,7 +780,61 @@ class DataProcessor:
             }
         }
         
-        # Category breakdown
+        stats["category_breakdown"] = self._category_breakdown(data)
+        self.processed_data = data
+        
+        return stats
+
+    def process_data_parallel(self, data: Records,
+                              workers: Optional[int] = None,
+                              chunk_size: int = DEFAULT_CHUNK_SIZE,
+                              median_precision: Optional[int] = None) -> Dict[str, Any]:
+        """Compute ``process_data`` statistics across a process pool.
+
+        The input is split into shards of ``chunk_size`` rows, each worker
+        returns a ``StreamingAggregator`` partial, and the partials are merged
+        in shard order. Inputs below ``PARALLEL_MIN_RECORDS`` (or with a single
+        worker) run serially through ``process_data``.
+        """
+        if workers == 1 or len(data) < max(PARALLEL_MIN_RECORDS, chunk_size + 1):
+            return self.process_data(data)
+
+        workers = workers or os.cpu_count() or 1
+        merged = StreamingAggregator(median_precision)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            worker = partial(_aggregate_shard, median_precision=median_precision)
+            for shard_state in _bounded_map(executor, worker, _shards(data, chunk_size),
+                                            2 * workers):
+                merged.merge(shard_state)
+
+        self.processed_data = data
+        return merged.result()
+
+    def process_stream(self, data: Union[Iterable[Dict[str, Any]], ColumnarTable],
+                       median_precision: Optional[int] = None) -> Dict[str, Any]:
+        """Compute ``process_data`` statistics in one pass over an iterator.
+
+        Records are not retained, so ``processed_data`` is left untouched.
+        See ``StreamingAggregator`` for how closely results match.
+        """
+        return StreamingAggregator(median_precision).update(data).result()
+
+    def _category_breakdown(self, data: Records) -> Dict[str, Dict[str, Any]]:
+        """Count items and sum prices per category, in first-seen order."""
+        if isinstance(data, ColumnarTable):
+            counts = [0] * len(data.categories)
+            totals = [0] * len(data.categories)
+            order = []
+            for code, price in zip(data.category_codes, data.prices):
+                if not counts[code]:
+                    order.append(code)
+                counts[code] += 1
+                totals[code] += price
+            return {
+                data.categories[code]: {"count": counts[code], "total_price": totals[code]}
+                for code in order
+            }
+
         categories = {}
         for item in data:
             cat = item["category"]
@@ -86,13 +842,9 @@ class DataProcessor:
                 categories[cat] = {"count": 0, "total_price": 0}
             categories[cat]["count"] += 1
             categories[cat]["total_price"] += item["price"]
-        
-        stats["category_breakdown"] = categories
-        self.processed_data = data
-        
-        return stats
+        return categories
     
-    def save_to_csv(self, data: List[Dict[str, Any]], filename: str) -> bool:
+    def save_to_csv(self, data: Records, filename: str) -> bool:
         """Save data to CSV file."""
         try:
             if not data:
@@ -111,6 +863,8 @@ class DataProcessor:
     def save_to_json(self, data: Any, filename: str) -> bool:
         """Save data to JSON file."""
         try:
+            if isinstance(data, ColumnarTable):
+                data = data.to_records()
             with open(filename, 'w') as jsonfile:
                 json.dump(data, jsonfile, indent=2)
             return True
@@ -118,27 +872,176 @@ class DataProcessor:
             print(f"Error saving to JSON: {e}")
             return False
     
+    def save_stream(self, records: Union[Iterable[Dict[str, Any]], ColumnarTable],
+                    filename: str, fmt: Optional[str] = None,
+                    batch_size: int = 1000,
+                    compress: Optional[bool] = None) -> bool:
+        """Write records from any iterable as CSV, JSON or NDJSON.
+
+        Records are pulled and written ``batch_size`` at a time, so memory
+        stays constant for generator input. The format defaults to the file
+        suffix and ``.gz`` names are gzip-compressed unless ``compress`` says
+        otherwise. JSON output is a compact array, one record per line.
+        Empty input gives an empty JSON array or NDJSON file; for CSV there
+        is no header to write, so no file is created and False is returned,
+        as ``save_to_csv`` does.
+        """
+        try:
+            fmt = _stream_format(filename, fmt)
+            iterator = iter(records)
+            first = None
+            if fmt == "csv":
+                first = next(iterator, None)
+                if first is None:
+                    return False
+            with _open_text(filename, "w", compress) as handle:
+                if fmt == "csv":
+                    writer = csv.DictWriter(handle, fieldnames=first.keys())
+                    writer.writeheader()
+                    writer.writerow(first)
+                    for batch in iter(lambda: list(itertools.islice(iterator, batch_size)), []):
+                        writer.writerows(batch)
+                    return True
+
+                encode = json.JSONEncoder(separators=(",", ":")).encode
+                separator = ",\n" if fmt == "json" else "\n"
+                if fmt == "json":
+                    handle.write("[\n")
+                written = False
+                for batch in iter(lambda: list(itertools.islice(iterator, batch_size)), []):
+                    if written:
+                        handle.write(separator)
+                    handle.write(separator.join(map(encode, batch)))
+                    written = True
+                handle.write("\n]\n" if fmt == "json" else ("\n" if written else ""))
+            return True
+        except Exception as e:
+            print(f"Error saving stream: {e}")
+            return False
+
+    def read_stream(self, filename: str, fmt: Optional[str] = None,
+                    compress: Optional[bool] = None) -> Iterator[Dict[str, Any]]:
+        """Lazily yield records from a CSV, JSON or NDJSON file.
+
+        CSV columns listed in ``CSV_FIELD_TYPES`` are converted back to their
+        original types. The result can be passed straight to
+        ``process_data``, ``filter_stream`` or ``save_stream``.
+        """
+        fmt = _stream_format(filename, fmt)
+        with _open_text(filename, "r", compress) as handle:
+            if fmt == "csv":
+                for row in csv.DictReader(handle):
+                    for field, value in row.items():
+                        convert = CSV_FIELD_TYPES.get(field)
+                        if convert is not None:
+                            row[field] = convert(value)
+                    yield row
+            elif fmt == "ndjson":
+                for line in handle:
+                    if line.strip():
+                        yield json.loads(line)
+            else:
+                yield from _iter_json_array(handle)
+
+    def filter_stream(self, records: Iterable[Dict[str, Any]],
+                      category: Optional[str] = None,
+                      min_price: Optional[float] = None,
+                      max_price: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """Lazily yield the records ``filter_data`` would return."""
+        low = float("-inf") if min_price is None else min_price
+        high = float("inf") if max_price is None else max_price
+        for item in records:
+            if (not category or item["category"] == category) and low <= item["price"] <= high:
+                yield item
+
     def generate_hash(self, data: str) -> str:
         """Generate SHA-256 hash of the data."""
         return hashlib.sha256(data.encode()).hexdigest()
     
-    def filter_data(self, data: List[Dict[str, Any]], 
+    def filter_data(self, data: Records, 
                    category: Optional[str] = None,
                    min_price: Optional[float] = None,
-                   max_price: Optional[float] = None) -> List[Dict[str, Any]]:
-        """Filter data based on criteria."""
-        filtered = data
-        
+                   max_price: Optional[float] = None,
+                   use_index: bool = False) -> Records:
+        """Filter data based on criteria.
+
+        All predicates are applied in a single pass. With ``use_index`` and
+        ``data`` being ``processed_data``, the index answers the query
+        instead of scanning; the caller vouches that no record was edited in
+        place since it was built.
+        """
+        if use_index and data is self._processed_data and (
+                category or min_price is not None or max_price is not None):
+            return self.query(category, min_price, max_price)
+
+        if isinstance(data, ColumnarTable):
+            return self._filter_columns(data, category, min_price, max_price)
+
+        if not category and min_price is None and max_price is None:
+            return data
+
+        low = float("-inf") if min_price is None else min_price
+        high = float("inf") if max_price is None else max_price
         if category:
-            filtered = [item for item in filtered if item["category"] == category]
-        
-        if min_price is not None:
-            filtered = [item for item in filtered if item["price"] >= min_price]
-        
-        if max_price is not None:
-            filtered = [item for item in filtered if item["price"] <= max_price]
-        
-        return filtered
+            return [item for item in data
+                    if item["category"] == category and low <= item["price"] <= high]
+        return [item for item in data if low <= item["price"] <= high]
+
+    def filter_data_parallel(self, data: Records,
+                             category: Optional[str] = None,
+                             min_price: Optional[float] = None,
+                             max_price: Optional[float] = None,
+                             workers: Optional[int] = None,
+                             chunk_size: int = DEFAULT_CHUNK_SIZE) -> Records:
+        """Filter shards of the input across a process pool.
+
+        Results keep the input order and type. Small inputs fall back to
+        ``filter_data``.
+        """
+        if workers == 1 or len(data) < max(PARALLEL_MIN_RECORDS, chunk_size + 1):
+            return self.filter_data(data, category, min_price, max_price)
+
+        workers = workers or os.cpu_count() or 1
+        worker = partial(_filter_shard, category=category,
+                         min_price=min_price, max_price=max_price)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = _bounded_map(executor, worker, _shards(data, chunk_size), 2 * workers)
+            if isinstance(data, ColumnarTable):
+                rows = []
+                for index, shard_rows in enumerate(results):
+                    offset = index * chunk_size
+                    rows.extend(row + offset for row in shard_rows)
+                return data.take(rows)
+
+            filtered = []
+            for shard_records in results:
+                filtered.extend(shard_records)
+            return filtered
+
+    def _matching_rows(self, table: ColumnarTable,
+                       category: Optional[str],
+                       min_price: Optional[float],
+                       max_price: Optional[float]) -> List[int]:
+        """Return positions of table rows matching the filter, in one pass."""
+        code = None
+        if category:
+            code = table.category_code(category)
+            if code is None:
+                return []
+        low = float("-inf") if min_price is None else min_price
+        high = float("inf") if max_price is None else max_price
+
+        if code is None:
+            return [row for row, price in enumerate(table.prices) if low <= price <= high]
+        return [row for row, (cat, price) in enumerate(zip(table.category_codes, table.prices))
+                if cat == code and low <= price <= high]
+
+    def _filter_columns(self, table: ColumnarTable,
+                        category: Optional[str],
+                        min_price: Optional[float],
+                        max_price: Optional[float]) -> ColumnarTable:
+        """Filter a columnar table in a single pass over its columns."""
+        return table.take(self._matching_rows(table, category, min_price, max_price))
 
 def main():
     """Main function to demonstrate the DataProcessor class."""
@@ -199,5 +1102,8 @@ def main():
     
     print("\n=== Demo Complete ===")
 
+instrumentation.register(DataProcessor)
+
 if __name__ == "__main__":
-    main()
+    with instrumentation.from_env():
+        main()
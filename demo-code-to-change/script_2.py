@@ -8,19 +8,229 @@ natural language operations, and data visualization basics.
 import os
 import sys
 import re
+import ssl
+import asyncio
 import json
+import pickle
 import random
 import datetime
 import hashlib
 import math
 import time
-from typing import List, Dict, Any, Tuple, Optional
-from collections import Counter, defaultdict
+import heapq
+import itertools
+import tempfile
+import threading
+from array import array
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial, reduce
+from operator import itemgetter
+from urllib.parse import urlsplit
+from typing import List, Dict, Any, AsyncIterator, Callable, FrozenSet, Iterable, Iterator, Tuple, Optional, Union
+from collections import Counter, OrderedDict, defaultdict, deque
+
+import instrumentation
+
+# Patterns used by TextProcessor, compiled once at import
+HTML_TAG_PATTERN = re.compile(r'<[^>]+>')
+URL_PATTERN = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
+SPECIAL_CHAR_RUNS_PATTERN = re.compile(r'[^a-zA-Z0-9\s\']+')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+SENTENCE_END_PATTERN = re.compile(r'[.!?]+')
+
+# Bump when cached TextProcessor results change shape or meaning
+CACHE_VERSION = 1
+
+
+class ResultCache:
+    """Content-hash memoization cache for text processing results.
+
+    Keys are SHA-256 digests of the operation name, the processor
+    configuration and the text itself. Entries live in an LRU memory tier
+    bounded by ``max_entries`` and ``max_bytes``; with ``directory`` set,
+    results are also written as JSON files that survive restarts. Cached
+    values must be JSON-serializable.
+    """
+
+    def __init__(self, max_entries: int = 10_000, max_bytes: int = 64 * 1024 * 1024,
+                 directory: Optional[str] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self._entries: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_hits = 0
+
+    def make_key(self, operation: str, config: str, text: str) -> str:
+        """Generate SHA-256 hash of an operation, its configuration and input."""
+        data = f"{CACHE_VERSION}\0{operation}\0{config}\0{text}"
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _store(self, key: str, value: Any, size: int) -> None:
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[1]
+        self._entries[key] = (value, size)
+        self._bytes += size
+        while self._entries and (len(self._entries) > self.max_entries
+                                 or self._bytes > self.max_bytes):
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (found, value), checking memory first and then disk."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[0]
+
+        if self.directory:
+            try:
+                with open(self._path(key)) as cache_file:
+                    payload = cache_file.read()
+                value = json.loads(payload)
+            except (OSError, ValueError):
+                pass
+            else:
+                with self._lock:
+                    self._store(key, value, len(payload))
+                    self.hits += 1
+                    self.disk_hits += 1
+                return True, value
+
+        with self._lock:
+            self.misses += 1
+        return False, None
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a result in memory and, when configured, on disk."""
+        payload = json.dumps(value)
+        with self._lock:
+            self._store(key, value, len(payload))
+        if self.directory:
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, "w") as cache_file:
+                cache_file.write(payload)
+            os.replace(temp_path, path)
+
+    def memoize(self, operation: str, config: str, text: str,
+                compute: Callable[[], Any]) -> Any:
+        """Return the cached result for ``text`` or compute and store it."""
+        key = self.make_key(operation, config, text)
+        found, value = self.get(key)
+        if not found:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        """Drop the memory tier (the disk tier is left in place)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss/eviction counters and current memory usage."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+class ReadabilityAccumulator:
+    """Streaming, mergeable version of ``calculate_readability_score``.
+
+    Text is fed in arbitrary chunks; sentence boundaries and words that span
+    chunks are carried over, so feeding a document piece by piece gives the
+    same counts as scoring it whole. Accumulators for separate documents can
+    be merged to score a whole author or category at once.
+    """
+
+    def __init__(self):
+        self.sentences = 0
+        self.words = 0
+        self.characters = 0
+        self._carry = ""
+        self._in_sentence = False
+
+    def feed(self, chunk: str) -> None:
+        """Consume the next piece of text."""
+        parts = SENTENCE_END_PATTERN.split(chunk)
+        if parts[0] and not parts[0].isspace():
+            self._in_sentence = True
+        for part in parts[1:]:
+            if self._in_sentence:
+                self.sentences += 1
+            self._in_sentence = bool(part) and not part.isspace()
+
+        text = self._carry + chunk
+        cut = len(text)
+        while cut and not text[cut - 1].isspace():
+            cut -= 1
+        self._carry = text[cut:]
+        if cut:
+            words = text[:cut].lower().split()
+            self.words += len(words)
+            self.characters += sum(map(len, words))
+
+    def _totals(self) -> Tuple[int, int, int]:
+        """Counts including the unfinished sentence and word at the end."""
+        carried = self._carry.lower()
+        return (self.sentences + (1 if self._in_sentence else 0),
+                self.words + (1 if carried else 0),
+                self.characters + len(carried))
+
+    def merge(self, other: "ReadabilityAccumulator") -> None:
+        """Add another document's counts, treating it as finished."""
+        sentences, words, characters = other._totals()
+        self.sentences += sentences
+        self.words += words
+        self.characters += characters
+
+    def result(self) -> Dict[str, float]:
+        """Return the same dict as ``calculate_readability_score``."""
+        sentences, words, characters = self._totals()
+        if not sentences or not words:
+            return {"error": "Invalid text for analysis"}
+
+        avg_sentence_length = words / sentences
+        avg_word_length = characters / words
+
+        # Simple readability score (lower is easier)
+        readability = (avg_sentence_length * 0.4) + (avg_word_length * 0.6)
+
+        return {
+            "sentence_count": sentences,
+            "word_count": words,
+            "avg_sentence_length": round(avg_sentence_length, 2),
+            "avg_word_length": round(avg_word_length, 2),
+            "readability_score": round(readability, 2)
+        }
+
 
 class TextProcessor:
     """A class for text processing and analysis."""
     
-    def __init__(self):
+    def __init__(self, cache: Optional[ResultCache] = None):
+        self.cache = cache
+        self._fingerprint: Optional[Tuple[FrozenSet[str], str]] = None
         self.stop_words = {
             'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
             'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'been',
@@ -30,16 +240,34 @@ class TextProcessor:
         }
         self.processed_texts = []
     
+    def config_fingerprint(self) -> str:
+        """Hash of the configuration that affects results (the stop words)."""
+        stop_words = frozenset(self.stop_words)
+        if self._fingerprint is None or self._fingerprint[0] != stop_words:
+            digest = hashlib.sha256("\n".join(sorted(stop_words)).encode()).hexdigest()
+            self._fingerprint = (stop_words, digest)
+        return self._fingerprint[1]
+
+    def _cached(self, operation: str, text: str, compute: Callable[[str], Any]) -> Any:
+        """Run ``compute(text)`` through the cache when one is configured."""
+        if self.cache is None:
+            return compute(text)
+        return self.cache.memoize(operation, self.config_fingerprint(), text,
+                                  lambda: compute(text))
+    
     def clean_text(self, text: str) -> str:
         """Clean text by removing special characters and extra whitespace."""
+        return self._cached("clean_text", text, self._clean_text)
+
+    def _clean_text(self, text: str) -> str:
         # Remove HTML tags
-        text = re.sub(r'<[^>]+>', '', text)
+        text = HTML_TAG_PATTERN.sub('', text)
         # Remove URLs
-        text = re.sub(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+', '', text)
+        text = URL_PATTERN.sub('', text)
         # Remove special characters except spaces and apostrophes
-        text = re.sub(r'[^a-zA-Z0-9\s\']', ' ', text)
+        text = SPECIAL_CHAR_RUNS_PATTERN.sub(' ', text)
         # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = WHITESPACE_PATTERN.sub(' ', text).strip()
         return text
     
     def tokenize(self, text: str) -> List[str]:
@@ -56,31 +284,952 @@ class TextProcessor:
     
     def extract_sentences(self, text: str) -> List[str]:
         """Extract sentences from text."""
-        sentences = re.split(r'[.!?]+', text)
+        sentences = SENTENCE_END_PATTERN.split(text)
         return [s.strip() for s in sentences if s.strip()]
     
+    def keyword_counts(self, text: str) -> Dict[str, int]:
+        """Count stop-word-filtered tokens of one document, in first-seen order."""
+        return dict(self._cached("keyword_counts", text,
+                                 lambda text: dict(TextPipeline(self).count([text]))))
+
     def calculate_readability_score(self, text: str) -> Dict[str, float]:
         """Calculate basic readability metrics."""
-        sentences = self.extract_sentences(text)
-        words = self.tokenize(text)
-        
-        if not sentences or not words:
-            return {"error": "Invalid text for analysis"}
-        
-        avg_sentence_length = len(words) / len(sentences)
-        avg_word_length = sum(len(word) for word in words) / len(words)
-        
-        # Simple readability score (lower is easier)
-        readability = (avg_sentence_length * 0.4) + (avg_word_length * 0.6)
-        
+        return dict(self._cached("readability", text, self._readability_score))
+
+    def _readability_score(self, text: str) -> Dict[str, float]:
+        accumulator = ReadabilityAccumulator()
+        accumulator.feed(text)
+        return accumulator.result()
+
+    def readability_by(self, documents: Iterable[Dict[str, Any]], key: str,
+                       text_key: str = "content") -> Dict[Any, Dict[str, float]]:
+        """Score readability per group (e.g. author or category) in one pass."""
+        groups: Dict[Any, ReadabilityAccumulator] = {}
+        for document in documents:
+            accumulator = groups.get(document[key])
+            if accumulator is None:
+                accumulator = groups[document[key]] = ReadabilityAccumulator()
+            single = ReadabilityAccumulator()
+            single.feed(document[text_key])
+            accumulator.merge(single)
+        return {group: accumulator.result() for group, accumulator in groups.items()}
+
+class TextPipeline:
+    """Fused raw-text to filtered-token pipeline.
+
+    Produces exactly the tokens of ``remove_stop_words(tokenize(clean_text(text)))``
+    while skipping the intermediate strings: tag and URL removal only run
+    when the text could contain them, special-character runs are replaced in
+    one substitution, and ``split`` takes care of whitespace collapsing.
+    Stop words are read live from the owning ``TextProcessor``.
+    """
+
+    def __init__(self, processor: Optional[TextProcessor] = None):
+        self.processor = processor or TextProcessor()
+
+    def tokens(self, text: str) -> Iterator[str]:
+        """Lazily yield the filtered tokens of one document."""
+        if '<' in text:
+            text = HTML_TAG_PATTERN.sub('', text)
+        if 'http' in text:
+            text = URL_PATTERN.sub('', text)
+        stop_words = self.processor.stop_words
+        for token in SPECIAL_CHAR_RUNS_PATTERN.sub(' ', text).lower().split():
+            if token not in stop_words:
+                yield token
+
+    def process(self, text: str) -> List[str]:
+        """Return the filtered tokens of one document as a list."""
+        return list(self.tokens(text))
+
+    def count(self, texts: Iterable[str]) -> Counter:
+        """Count filtered tokens across documents without keeping token lists."""
+        counts: Counter = Counter()
+        for text in texts:
+            counts.update(self.tokens(text))
+        return counts
+
+
+# Article counts below this are counted serially in KeywordExtractor
+KEYWORD_PARALLEL_MIN_ARTICLES = 5_000
+
+
+def bounded_map(executor: Executor, func: Callable[[Any], Any], items: Iterable[Any],
+                max_in_flight: int) -> Iterator[Any]:
+    """Like ``executor.map`` but pulls ``items`` lazily.
+
+    At most ``max_in_flight`` tasks are pending at once, so a slow consumer
+    or an unbounded input never queues more work than that. Results are
+    yielded in input order.
+    """
+    pending: deque = deque()
+    for item in items:
+        pending.append(executor.submit(func, item))
+        if len(pending) >= max_in_flight:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _count_keywords(texts: List[str], stop_words: FrozenSet[str]) -> Counter:
+    """Worker entry point: count filtered tokens of one chunk of texts."""
+    processor = TextProcessor()
+    processor.stop_words = set(stop_words)
+    return TextPipeline(processor).count(texts)
+
+
+class HeavyHitters:
+    """Mergeable Misra-Gries sketch for approximate top-k counting.
+
+    Holds at most ``capacity`` counters. Estimated counts are never higher
+    than the true count and at most ``error`` lower, where ``error`` is
+    bounded by total / (capacity + 1).
+    """
+
+    def __init__(self, capacity: int = 10_000):
+        self.capacity = capacity
+        self.counts: Counter = Counter()
+        self.error = 0
+
+    def update(self, counts: Dict[str, int]) -> None:
+        """Add a batch of exact counts and shrink back to ``capacity``."""
+        self.counts.update(counts)
+        self._prune()
+
+    def merge(self, other: "HeavyHitters") -> None:
+        """Fold another sketch into this one."""
+        self.counts.update(other.counts)
+        self.error += other.error
+        self._prune()
+
+    def _prune(self) -> None:
+        if len(self.counts) <= self.capacity:
+            return
+        cutoff = heapq.nlargest(self.capacity + 1, self.counts.values())[-1]
+        self.counts = Counter({key: count - cutoff for key, count in self.counts.items()
+                               if count > cutoff})
+        self.error += cutoff
+
+    def top(self, k: int) -> List[Tuple[str, int]]:
+        """Return the ``k`` heaviest keys with their estimated counts."""
+        return heapq.nlargest(k, self.counts.items(), key=itemgetter(1))
+
+
+class KeywordExtractor:
+    """Batched keyword counting over large article collections.
+
+    Articles are consumed lazily in chunks of ``chunk_size``; each chunk is
+    reduced to a ``Counter`` (in a process pool when ``workers`` allows) and
+    merged in order, so only counters are ever held. Exact mode keeps every
+    distinct token; ``approximate=True`` folds chunk counts into a
+    ``HeavyHitters`` sketch of bounded size instead.
+    """
+
+    def __init__(self, processor: Optional[TextProcessor] = None,
+                 workers: Optional[int] = None, chunk_size: int = 1_000,
+                 approximate: bool = False, capacity: int = 10_000):
+        self.processor = processor or TextProcessor()
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.approximate = approximate
+        self.capacity = capacity
+
+    def _chunks(self, articles: Iterable[Dict[str, Any]]) -> Iterator[List[str]]:
+        texts = (article["content"] for article in articles)
+        while True:
+            chunk = list(itertools.islice(texts, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    def _chunk_counts(self, articles: Iterable[Dict[str, Any]]) -> Iterator[Counter]:
+        serial = self.workers == 1 or (
+            hasattr(articles, "__len__") and len(articles) < KEYWORD_PARALLEL_MIN_ARTICLES)
+        if serial:
+            pipeline = TextPipeline(self.processor)
+            for chunk in self._chunks(articles):
+                yield pipeline.count(chunk)
+            return
+
+        workers = self.workers or os.cpu_count() or 1
+        worker = partial(_count_keywords, stop_words=frozenset(self.processor.stop_words))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            yield from bounded_map(executor, worker, self._chunks(articles), 2 * workers)
+
+    def extract(self, articles: Iterable[Dict[str, Any]], top_k: int = 20) -> Dict[str, int]:
+        """Return the ``top_k`` keywords, ordered like ``Counter.most_common``."""
+        if self.approximate:
+            sketch = HeavyHitters(self.capacity)
+            for counts in self._chunk_counts(articles):
+                sketch.update(counts)
+            return dict(sketch.top(top_k))
+
+        totals: Counter = Counter()
+        for counts in self._chunk_counts(articles):
+            totals.update(counts)
+        return dict(heapq.nlargest(top_k, totals.items(), key=itemgetter(1)))
+
+
+def _map_chunk(func: Callable[[Any], Any], chunk: List[Any]) -> List[Any]:
+    """Worker entry point: apply ``func`` to every item of one chunk."""
+    return [func(item) for item in chunk]
+
+
+def _chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(items)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class _StageTimer:
+    """Iterator wrapper that counts items and time spent inside ``next``."""
+
+    def __init__(self, iterator: Iterator[Any], stats: Dict[str, Any]):
+        self.iterator = iterator
+        self.stats = stats
+
+    def __iter__(self) -> "_StageTimer":
+        return self
+
+    def __next__(self) -> Any:
+        start = time.perf_counter()
+        try:
+            item = next(self.iterator)
+        finally:
+            self.stats["seconds"] += time.perf_counter() - start
+        self.stats["items"] += 1
+        return item
+
+
+class Pipeline:
+    """Lazy, composable chain of processing stages.
+
+    Every stage is a generator pulling from the one before it, so items flow
+    through one at a time and memory stays flat however long the source is.
+    ``map`` can fan out to a thread or process pool; at most
+    ``max_in_flight`` items (or chunks) are pending at once, which gives
+    backpressure against both fast sources and slow consumers. Stages are
+    only wired up when the pipeline is iterated or a terminal method
+    (``run``, ``collect``, ``reduce``, ``count_by``) is called.
+
+    With ``timed=True`` each stage records how many items it produced and
+    its own share of the wall time (upstream time is subtracted), available
+    from ``timings`` and ``report`` after a run.
+
+    A pipeline over a list (or any re-iterable) can run repeatedly; over a
+    generator or other one-shot iterator it can only run once, and a second
+    run raises ``RuntimeError`` instead of silently yielding nothing.
+    """
+
+    EXECUTORS = ("thread", "process")
+
+    def __init__(self, source: Iterable[Any], name: str = "source", timed: bool = True):
+        self.source = source
+        self.timed = timed
+        self.stages: List[Tuple[str, Callable[[Iterator[Any]], Iterator[Any]]]] = [
+            (name, iter)
+        ]
+        self._stats: List[Dict[str, Any]] = []
+        self._sink: Optional[Dict[str, Any]] = None
+        self._started = False
+
+    def _add(self, name: str, transform: Callable[[Iterator[Any]], Iterator[Any]]) -> "Pipeline":
+        if any(existing == name for existing, _ in self.stages):
+            name = f"{name}#{len(self.stages)}"
+        self.stages.append((name, transform))
+        return self
+
+    def stage(self, transform: Callable[[Iterator[Any]], Iterator[Any]],
+              name: Optional[str] = None) -> "Pipeline":
+        """Add a whole-stream stage, e.g. ``RollingWindows(7).process``."""
+        return self._add(name or getattr(transform, "__name__", "stage"), transform)
+
+    def map(self, func: Callable[[Any], Any], name: Optional[str] = None,
+            workers: Optional[int] = None, executor: str = "thread",
+            max_in_flight: Optional[int] = None, chunk_size: int = 1) -> "Pipeline":
+        """Apply ``func`` to every item, optionally on a worker pool.
+
+        Order is preserved. With ``executor="process"``, ``func`` must be
+        picklable and ``chunk_size`` items are shipped to a worker per task
+        to amortize the round trip.
+        """
+        if executor not in self.EXECUTORS:
+            raise ValueError(f"Unknown executor: {executor!r}")
+        name = name or getattr(func, "__name__", "map")
+        if not workers or workers <= 1:
+            return self._add(name, partial(map, func))
+
+        def fan_out(items: Iterator[Any]) -> Iterator[Any]:
+            in_flight = max_in_flight or 2 * workers
+            pool = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+            with pool(max_workers=workers) as pool_executor:
+                if chunk_size <= 1:
+                    yield from bounded_map(pool_executor, func, items, in_flight)
+                    return
+                worker = partial(_map_chunk, func)
+                for results in bounded_map(pool_executor, worker,
+                                           _chunked(items, chunk_size), in_flight):
+                    yield from results
+
+        return self._add(name, fan_out)
+
+    def flat_map(self, func: Callable[[Any], Iterable[Any]],
+                 name: Optional[str] = None) -> "Pipeline":
+        """Replace every item with the items of ``func(item)``."""
+        def flatten(items: Iterator[Any]) -> Iterator[Any]:
+            for item in items:
+                yield from func(item)
+
+        return self._add(name or getattr(func, "__name__", "flat_map"), flatten)
+
+    def filter(self, predicate: Callable[[Any], bool],
+               name: Optional[str] = None) -> "Pipeline":
+        """Keep only items for which ``predicate`` is true."""
+        return self._add(name or getattr(predicate, "__name__", "filter"),
+                         partial(filter, predicate))
+
+    def batch(self, size: int, name: str = "batch") -> "Pipeline":
+        """Group items into lists of up to ``size``."""
+        return self._add(name, partial(_chunked, size=size))
+
+    def __iter__(self) -> Iterator[Any]:
+        if self._started and iter(self.source) is self.source:
+            raise RuntimeError("Pipeline source is a one-shot iterator and was already consumed")
+        self._started = True
+        self._stats = []
+        self._sink = None
+        iterator: Iterator[Any] = self.source
+        for name, transform in self.stages:
+            iterator = transform(iterator)
+            if self.timed:
+                stats = {"stage": name, "items": 0, "seconds": 0.0}
+                self._stats.append(stats)
+                iterator = _StageTimer(iterator, stats)
+        return iterator
+
+    def _drain(self, consume: Callable[[Iterator[Any]], Any]) -> Any:
+        iterator = iter(self)
+        start = time.perf_counter()
+        result = consume(iterator)
+        if self.timed:
+            upstream = self._stats[-1]["seconds"] if self._stats else 0.0
+            self._sink = {"stage": "sink", "items": None,
+                          "seconds": time.perf_counter() - start - upstream}
+        return result
+
+    def run(self) -> int:
+        """Drain the pipeline for its side effects and return the item count."""
+        return self._drain(lambda items: sum(1 for _ in items))
+
+    def collect(self) -> List[Any]:
+        """Materialize the output as a list."""
+        return self._drain(list)
+
+    def reduce(self, func: Callable[[Any, Any], Any], initial: Any) -> Any:
+        """Fold the output into a single value."""
+        return self._drain(lambda items: reduce(func, items, initial))
+
+    def count_by(self, key: Optional[Union[str, Callable[[Any], Any]]] = None) -> Counter:
+        """Count output items, or their ``key`` (a field name or callable)."""
+        if key is None:
+            return self._drain(Counter)
+        getter = itemgetter(key) if isinstance(key, str) else key
+        return self._drain(lambda items: Counter(map(getter, items)))
+
+    @property
+    def timings(self) -> List[Dict[str, Any]]:
+        """Per-stage items and exclusive seconds from the last run."""
+        timings = []
+        upstream = 0.0
+        for stats in self._stats:
+            timings.append({"stage": stats["stage"], "items": stats["items"],
+                            "seconds": max(stats["seconds"] - upstream, 0.0)})
+            upstream = stats["seconds"]
+        if self._sink is not None:
+            timings.append(dict(self._sink))
+        return timings
+
+    def report(self) -> str:
+        """Format ``timings`` as a table, slowest stage marked with ``*``."""
+        timings = self.timings
+        if not timings:
+            return "(no timings recorded)"
+        total = sum(stage["seconds"] for stage in timings) or 1.0
+        slowest = max(timings, key=itemgetter("seconds"))
+        lines = []
+        for stage in timings:
+            items = "" if stage["items"] is None else f"{stage['items']:,}"
+            marker = " *" if stage is slowest else ""
+            lines.append(f"{stage['stage']:<16} {items:>12} {stage['seconds']:>9.3f}s "
+                         f"{100 * stage['seconds'] / total:>5.1f}%{marker}")
+        return "\n".join(lines)
+
+
+class SlidingWindow:
+    """Fixed-size window over a numeric stream with O(1) amortized updates.
+
+    Keeps a running sum, plus optional Welford mean/variance with removal
+    (``variance``) and monotonic deques for min/max (``extremes``). The
+    running aggregates are rebuilt from the window every ``size`` pushes to
+    stop floating point drift.
+    """
+
+    def __init__(self, size: int, extremes: bool = True, variance: bool = True):
+        if size < 1:
+            raise ValueError("window size must be at least 1")
+        self.size = size
+        self.extremes = extremes
+        self.variance = variance
+        self.values: deque = deque()
+        self.total = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self._mins: deque = deque()
+        self._maxs: deque = deque()
+        self._seq = 0
+        self._since_resync = 0
+        # Largest magnitude summed since the last resync; bounds running-sum error
+        self._magnitude = 0.0
+
+    def push(self, value: float) -> None:
+        """Add a value, evicting the oldest one once the window is full."""
+        values = self.values
+        if len(values) == self.size:
+            old = values.popleft()
+            self.total -= old
+            if self.variance:
+                n = len(values)
+                if n:
+                    delta = old - self.mean
+                    self.mean -= delta / n
+                    self.m2 -= delta * (old - self.mean)
+                else:
+                    self.mean = 0.0
+                    self.m2 = 0.0
+        values.append(value)
+        self.total += value
+        if abs(value) > self._magnitude:
+            self._magnitude = abs(value)
+        if self.variance:
+            delta = value - self.mean
+            self.mean += delta / len(values)
+            self.m2 += delta * (value - self.mean)
+
+        if self.extremes:
+            seq = self._seq
+            self._seq += 1
+            expired = seq - self.size
+            mins, maxs = self._mins, self._maxs
+            while mins and mins[-1][1] >= value:
+                mins.pop()
+            mins.append((seq, value))
+            if mins[0][0] <= expired:
+                mins.popleft()
+            while maxs and maxs[-1][1] <= value:
+                maxs.pop()
+            maxs.append((seq, value))
+            if maxs[0][0] <= expired:
+                maxs.popleft()
+
+        self._since_resync += 1
+        if self._since_resync >= self.size:
+            self._resync()
+
+    def _resync(self) -> None:
+        """Recompute the running aggregates exactly from the window contents."""
+        values = self.values
+        self.total = sum(values)
+        if self.variance:
+            self.mean = self.total / len(values)
+            self.m2 = sum((x - self.mean) ** 2 for x in values)
+        self._magnitude = max(abs(x) for x in values)
+        self._since_resync = 0
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def sum(self) -> float:
+        """Sum of the values in the window."""
+        return self.total
+
+    def average(self, ndigits: Optional[int] = None) -> float:
+        """Mean of the window, optionally rounded.
+
+        When rounding, a result that lands within float noise of a rounding
+        boundary is recomputed with a plain left-to-right ``sum`` so the output
+        is bit-identical to ``round(sum(window) / len(window), ndigits)``.
+        """
+        count = len(self.values)
+        avg = self.total / count
+        if ndigits is None:
+            return avg
+        scale = 10 ** ndigits
+        scaled = avg * scale
+        error = 4 * self.size * sys.float_info.epsilon * self._magnitude + 1e-12 * abs(avg)
+        if not math.isfinite(scaled) or abs(scaled - math.floor(scaled) - 0.5) <= error * scale:
+            avg = sum(self.values) / count
+        return round(avg, ndigits)
+
+    def min(self) -> float:
+        """Smallest value in the window (requires ``extremes``)."""
+        return self._mins[0][1]
+
+    def max(self) -> float:
+        """Largest value in the window (requires ``extremes``)."""
+        return self._maxs[0][1]
+
+    def stdev(self) -> float:
+        """Population standard deviation of the window (requires ``variance``)."""
+        if len(self.values) < 2:
+            return 0.0
+        return math.sqrt(max(self.m2, 0.0) / len(self.values))
+
+
+class RollingWindows:
+    """Rolling statistics over a point stream, optionally per group.
+
+    ``push`` takes one point and returns a copy enriched with the requested
+    statistics, which makes it usable on live feeds. With ``group_by`` set
+    (a key or tuple of keys) each group gets its own window.
+    """
+
+    STATS = ("moving_avg", "rolling_sum", "rolling_min", "rolling_max", "rolling_stdev")
+
+    def __init__(self, window: int = 7, value_key: str = "value",
+                 group_by: Optional[Union[str, Tuple[str, ...]]] = None,
+                 stats: Iterable[str] = ("moving_avg",)):
+        self.window = window
+        self.value_key = value_key
+        self.group_by = (group_by,) if isinstance(group_by, str) else group_by
+        self.stats = tuple(stats)
+        unknown = set(self.stats) - set(self.STATS)
+        if unknown:
+            raise ValueError(f"Unknown rolling statistics: {sorted(unknown)}")
+        self.windows: Dict[Any, SlidingWindow] = {}
+
+    def push(self, point: Dict[str, Any]) -> Dict[str, Any]:
+        """Add a point to its window and return it with rolling statistics."""
+        key = None if self.group_by is None else tuple(point[k] for k in self.group_by)
+        window = self.windows.get(key)
+        if window is None:
+            window = self.windows[key] = SlidingWindow(
+                self.window,
+                extremes="rolling_min" in self.stats or "rolling_max" in self.stats,
+                variance="rolling_stdev" in self.stats)
+        window.push(point[self.value_key])
+
+        result = dict(point)
+        for stat in self.stats:
+            if stat == "moving_avg":
+                result[stat] = window.average(2)
+            elif stat == "rolling_sum":
+                result[stat] = round(window.sum(), 2)
+            elif stat == "rolling_min":
+                result[stat] = window.min()
+            elif stat == "rolling_max":
+                result[stat] = window.max()
+            else:
+                result[stat] = round(window.stdev(), 2)
+        return result
+
+    def process(self, points: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Lazily apply ``push`` to every point."""
+        for point in points:
+            yield self.push(point)
+
+
+class OnlineAnomalyDetector:
+    """Streaming z-score anomaly detector with O(1) work per point.
+
+    Each baseline tracks mean and variance incrementally:
+
+    - ``cumulative``: Welford over every point seen so far
+    - ``ewma``: exponentially weighted mean/variance with factor ``alpha``
+    - ``window``: the last ``window`` points, via ``SlidingWindow``
+
+    ``update`` scores a point against the baseline built from earlier points
+    and then folds it in. ``detect_batch`` fits every point into fresh
+    baselines first and then scores, which for the cumulative mode
+    reproduces ``detect_anomalies`` up to float rounding of the standard
+    deviation; it leaves the detector's own baselines untouched. With ``group_by`` each group
+    (e.g. category or region) gets its own baseline.
+    """
+
+    MODES = ("cumulative", "ewma", "window")
+
+    def __init__(self, threshold: float = 2.0, mode: str = "cumulative",
+                 alpha: float = 0.1, window: int = 30,
+                 group_by: Optional[Union[str, Tuple[str, ...]]] = None,
+                 value_key: str = "value", min_points: int = 3):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown anomaly detector mode: {mode!r}")
+        self.threshold = threshold
+        self.mode = mode
+        self.alpha = alpha
+        self.window = window
+        self.group_by = (group_by,) if isinstance(group_by, str) else group_by
+        self.value_key = value_key
+        self.min_points = min_points
+        self.baselines: Dict[Any, Any] = {}
+
+    def _key(self, point: Dict[str, Any]) -> Any:
+        return None if self.group_by is None else tuple(point[k] for k in self.group_by)
+
+    def _new_baseline(self) -> Any:
+        if self.mode == "window":
+            return SlidingWindow(self.window, extremes=False)
+        return {"count": 0, "mean": 0.0, "m2": 0.0, "var": 0.0}
+
+    def _add(self, baseline: Any, value: float) -> None:
+        if self.mode == "window":
+            baseline.push(value)
+            return
+        baseline["count"] += 1
+        if self.mode == "cumulative":
+            delta = value - baseline["mean"]
+            baseline["mean"] += delta / baseline["count"]
+            baseline["m2"] += delta * (value - baseline["mean"])
+        elif baseline["count"] == 1:
+            baseline["mean"] = value
+        else:
+            diff = value - baseline["mean"]
+            increment = self.alpha * diff
+            baseline["mean"] += increment
+            baseline["var"] = (1 - self.alpha) * (baseline["var"] + diff * increment)
+
+    def _moments(self, baseline: Any) -> Tuple[int, float, float]:
+        """Return (count, mean, population std) of a baseline."""
+        if self.mode == "window":
+            return len(baseline), baseline.mean, baseline.stdev()
+        count = baseline["count"]
+        if self.mode == "cumulative":
+            variance = baseline["m2"] / count if count else 0.0
+        else:
+            variance = baseline["var"]
+        return count, baseline["mean"], math.sqrt(max(variance, 0.0))
+
+    def score(self, point: Dict[str, Any]) -> Optional[float]:
+        """Z-score of a point against its current baseline, without updating.
+
+        Returns None while the baseline has fewer than ``min_points`` points.
+        """
+        return self._score(point, self.baselines)
+
+    def _score(self, point: Dict[str, Any], baselines: Dict[Any, Any]) -> Optional[float]:
+        baseline = baselines.get(self._key(point))
+        if baseline is None:
+            return None
+        count, mean, std = self._moments(baseline)
+        if count < self.min_points:
+            return None
+        if std == 0:
+            return 0
+        return abs(point[self.value_key] - mean) / std
+
+    def _flag(self, point: Dict[str, Any], z_score: Optional[float]) -> Optional[Dict[str, Any]]:
+        if z_score is None or z_score <= self.threshold:
+            return None
+        return {**point, "z_score": round(z_score, 2), "anomaly": True}
+
+    def update(self, point: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Score a point against the baseline so far, then fold it in.
+
+        Returns the flagged point when it is anomalous, otherwise None.
+        """
+        flagged = self._flag(point, self.score(point))
+        key = self._key(point)
+        baseline = self.baselines.get(key)
+        if baseline is None:
+            baseline = self.baselines[key] = self._new_baseline()
+        self._add(baseline, point[self.value_key])
+        return flagged
+
+    def process(self, points: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Lazily yield anomalies from a (possibly unbounded) point stream."""
+        for point in points:
+            flagged = self.update(point)
+            if flagged is not None:
+                yield flagged
+
+    def detect_batch(self, data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Fit on a finite list, then score every point against the final baseline."""
+        if len(data) < self.min_points:
+            return []
+        baselines: Dict[Any, Any] = {}
+        for point in data:
+            key = self._key(point)
+            baseline = baselines.get(key)
+            if baseline is None:
+                baseline = baselines[key] = self._new_baseline()
+            self._add(baseline, point[self.value_key])
+        anomalies = []
+        for point in data:
+            flagged = self._flag(point, self._score(point, baselines))
+            if flagged is not None:
+                anomalies.append(flagged)
+        return anomalies
+
+    def to_state(self) -> Dict[str, Any]:
+        """Return a small JSON-serializable checkpoint of the detector."""
+        baselines = []
+        for key, baseline in self.baselines.items():
+            if self.mode == "window":
+                state = {"values": list(baseline.values)}
+            else:
+                state = dict(baseline)
+            baselines.append([None if key is None else list(key), state])
         return {
-            "sentence_count": len(sentences),
-            "word_count": len(words),
-            "avg_sentence_length": round(avg_sentence_length, 2),
-            "avg_word_length": round(avg_word_length, 2),
-            "readability_score": round(readability, 2)
+            "threshold": self.threshold,
+            "mode": self.mode,
+            "alpha": self.alpha,
+            "window": self.window,
+            "group_by": None if self.group_by is None else list(self.group_by),
+            "value_key": self.value_key,
+            "min_points": self.min_points,
+            "baselines": baselines
         }
 
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "OnlineAnomalyDetector":
+        """Restore a detector from ``to_state`` output."""
+        detector = cls(state["threshold"], state["mode"], state["alpha"], state["window"],
+                       None if state["group_by"] is None else tuple(state["group_by"]),
+                       state["value_key"], state["min_points"])
+        for key, baseline_state in state["baselines"]:
+            key = None if key is None else tuple(key)
+            if detector.mode == "window":
+                baseline = detector._new_baseline()
+                for value in baseline_state["values"]:
+                    baseline.push(value)
+            else:
+                baseline = dict(baseline_state)
+            detector.baselines[key] = baseline
+        return detector
+
+
+def select_kth(values: Iterable[float], k: int) -> float:
+    """Return the ``k``-th smallest value (0-based) without a full sort.
+
+    Floyd-Rivest style: a small random sample picks bounds that very likely
+    bracket the answer, one pass keeps only the values between them and
+    only that narrow band is sorted. Equals ``sorted(values)[k]``; expected
+    O(n) time.
+    """
+    values = values if isinstance(values, list) else list(values)
+    if not 0 <= k < len(values):
+        raise IndexError("selection index out of range")
+    while len(values) > 1024:
+        size = len(values)
+        sample = sorted(random.sample(values, int(size ** 0.5)))
+        position = k * len(sample) // size
+        spread = int(len(sample) ** 0.5) + 1
+        low = sample[max(position - spread, 0)]
+        high = sample[min(position + spread, len(sample) - 1)]
+        below = [value for value in values if value < low]
+        if k < len(below):
+            values = below
+            continue
+        band = [value for value in values if low <= value <= high]
+        if k < len(below) + len(band):
+            return sorted(band)[k - len(below)]
+        k -= len(below) + len(band)
+        values = [value for value in values if value > high]
+    return sorted(values)[k]
+
+
+class GroupAggregator:
+    """Single-pass group-by that keeps aggregates, not member records.
+
+    Points are reduced to their bare values, appended to a per-group
+    ``array`` and periodically folded into a running count, sum, min and
+    max with C builtins (``sum`` continues from the running total). Counts,
+    min, max and medians match ``calculate_statistics`` exactly; ``sum`` and
+    ``mean`` match it to within float rounding (relative error around
+    1e-15). They are bit-identical only where ``sum()`` adds floats left to
+    right (Python 3.11 and earlier): from 3.12 ``sum()`` compensates within
+    each call, so a sum built chunk by chunk can differ from one ``sum()``
+    over the whole list in the last bits. The median comes by default from
+    ``median="histogram"``, a counter of values rounded to ``precision``
+    decimals (exact when the values already have at most that many
+    decimals), or is skipped with ``median=None``; both keep only the
+    aggregates. ``median="select"`` is the exact option for arbitrary
+    floats: it keeps every value of every group (O(n) memory, like the
+    member lists) and runs a quickselect at the end, giving the same upper
+    median as ``calculate_statistics``. Results have the
+    ``calculate_statistics`` shape.
+
+    ``keys`` may be one field or a tuple of fields (e.g. category and
+    region). Once ``max_groups`` groups are in memory, points for new keys
+    are hash-partitioned into ``partitions`` spill files under ``directory``
+    and aggregated one partition at a time when results are read, so
+    memory stays bounded by ``max_groups`` however many keys there are.
+    """
+
+    MEDIANS = ("select", "histogram", None)
+    FOLD_SIZE = 4096
+    SPILL_BATCH = 8192
+    MAX_SPILL_DEPTH = 4
+
+    def __init__(self, keys: Union[str, Tuple[str, ...]], value_key: str = "value",
+                 median: Optional[str] = "histogram", precision: int = 2,
+                 max_groups: int = 100_000, partitions: int = 16,
+                 directory: Optional[str] = None, _depth: int = 0):
+        if median not in self.MEDIANS:
+            raise ValueError(f"Unknown median method: {median!r}")
+        self.keys = keys
+        self._getter = itemgetter(*keys) if isinstance(keys, tuple) else itemgetter(keys)
+        self.value_key = value_key
+        self.median = median
+        self.precision = precision
+        self.max_groups = max_groups
+        self.partitions = partitions
+        self.directory = directory
+        self._depth = _depth
+        self._buffers: Dict[Any, array] = {}
+        self._folded: Dict[Any, list] = {}
+        self._spill_dir: Optional[tempfile.TemporaryDirectory] = None
+        self._spill_files: Dict[int, Any] = {}
+        self._spill_buffers: Dict[int, list] = {}
+        self.spilled = 0
+
+    def _admit(self, key: Any, value: float) -> None:
+        if len(self._buffers) < self.max_groups or self._depth >= self.MAX_SPILL_DEPTH:
+            self._buffers[key] = array("d", (value,))
+            if self.median != "select":
+                # count, sum, min, max and the histogram (histogram median only)
+                self._folded[key] = [0, 0.0, value, value,
+                                     Counter() if self.median == "histogram" else None]
+            return
+        partition = hash((self._depth, key)) % self.partitions
+        pending = self._spill_buffers.setdefault(partition, [])
+        pending.append((key, value))
+        self.spilled += 1
+        if len(pending) >= self.SPILL_BATCH:
+            self._flush_spill(partition)
+
+    def _flush_spill(self, partition: int) -> None:
+        pending = self._spill_buffers.pop(partition, None)
+        if not pending:
+            return
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.TemporaryDirectory(prefix="groupby-", dir=self.directory)
+        spill_file = self._spill_files.get(partition)
+        if spill_file is None:
+            path = os.path.join(self._spill_dir.name, f"{partition}.pickle")
+            spill_file = self._spill_files[partition] = open(path, "wb")
+        pickle.dump(pending, spill_file, pickle.HIGHEST_PROTOCOL)
+
+    def _fold(self, key: Any) -> None:
+        values = self._buffers[key]
+        if not values:
+            return
+        state = self._folded[key]
+        state[0] += len(values)
+        state[1] = sum(values, state[1])
+        state[2] = min(state[2], min(values))
+        state[3] = max(state[3], max(values))
+        if self.median == "histogram":
+            precision = self.precision
+            state[4].update(round(value, precision) for value in values)
+        del values[:]
+
+    def push(self, point: Dict[str, Any]) -> None:
+        """Fold one point into its group (or its spill partition)."""
+        self.add(self._getter(point), point[self.value_key])
+
+    def add(self, key: Any, value: float) -> None:
+        """Fold one already-extracted (key, value) pair."""
+        values = self._buffers.get(key)
+        if values is None:
+            self._admit(key, value)
+            return
+        values.append(value)
+        if self.median != "select" and len(values) >= self.FOLD_SIZE:
+            self._fold(key)
+
+    def update(self, points: Iterable[Dict[str, Any]]) -> "GroupAggregator":
+        """Fold every point of an iterable (list, generator or ``Pipeline``)."""
+        getter, value_key, buffers = self._getter, self.value_key, self._buffers
+        fold_size = None if self.median == "select" else self.FOLD_SIZE
+        for point in points:
+            key = getter(point)
+            values = buffers.get(key)
+            if values is None:
+                self._admit(key, point[value_key])
+                continue
+            values.append(point[value_key])
+            if fold_size and len(values) >= fold_size:
+                self._fold(key)
+        return self
+
+    def _summary(self, key: Any) -> Dict[str, float]:
+        values = self._buffers[key]
+        if self.median == "select":
+            count, total, low, high = len(values), sum(values), min(values), max(values)
+            median = select_kth(values, count // 2)
+        else:
+            self._fold(key)
+            count, total, low, high, histogram = self._folded[key]
+            median = None
+            if self.median == "histogram":
+                seen = 0
+                for value in sorted(histogram):
+                    seen += histogram[value]
+                    if seen > count // 2:
+                        median = value
+                        break
+        stats = {"count": count, "mean": total / count, "min": low, "max": high}
+        if self.median is not None:
+            stats["median"] = median
+        stats["sum"] = total
+        stats["range"] = high - low
+        return stats
+
+    def results(self) -> Iterator[Tuple[Any, Dict[str, float]]]:
+        """Yield (key, statistics) for every group, spilled partitions last."""
+        for key in self._buffers:
+            yield key, self._summary(key)
+        for partition in list(self._spill_buffers):
+            self._flush_spill(partition)
+        if self._spill_dir is None:
+            return
+        try:
+            for partition in sorted(self._spill_files):
+                spill_file = self._spill_files[partition]
+                spill_file.close()
+                sub = GroupAggregator(self.keys, self.value_key, self.median, self.precision,
+                                      self.max_groups, self.partitions, self.directory,
+                                      self._depth + 1)
+                with open(spill_file.name, "rb") as handle:
+                    while True:
+                        try:
+                            pairs = pickle.load(handle)
+                        except EOFError:
+                            break
+                        for key, value in pairs:
+                            sub.add(key, value)
+                yield from sub.results()
+        finally:
+            self.close()
+
+    def result(self) -> Dict[Any, Dict[str, float]]:
+        """Return statistics for every group as a dict."""
+        return dict(self.results())
+
+    def close(self) -> None:
+        """Remove any spill files."""
+        for spill_file in self._spill_files.values():
+            spill_file.close()
+        self._spill_files = {}
+        self._spill_buffers = {}
+        if self._spill_dir is not None:
+            self._spill_dir.cleanup()
+            self._spill_dir = None
+
+
 class DataAnalyzer:
     """A class for data analysis and visualization preparation."""
     
@@ -88,8 +1237,13 @@ class DataAnalyzer:
         self.datasets = {}
         self.analysis_results = {}
     
-    def generate_time_series(self, days: int = 30) -> List[Dict[str, Any]]:
-        """Generate sample time series data."""
+    def generate_time_series(self, days: int = 30,
+                             seed: Optional[Any] = None) -> List[Dict[str, Any]]:
+        """Generate sample time series data.
+
+        Passing ``seed`` makes the values, categories and regions reproducible.
+        """
+        rng = random if seed is None else random.Random(seed)
         data = []
         base_date = datetime.datetime.now() - datetime.timedelta(days=days)
         
@@ -97,17 +1251,51 @@ class DataAnalyzer:
             date = base_date + datetime.timedelta(days=i)
             # Simulate some pattern with noise
             base_value = 100 + 10 * math.sin(i * 0.2)
-            noise = random.gauss(0, 5)
+            noise = rng.gauss(0, 5)
             value = max(0, base_value + noise)
             
             data.append({
                 "date": date.strftime("%Y-%m-%d"),
                 "value": round(value, 2),
-                "category": random.choice(["sales", "traffic", "engagement"]),
-                "region": random.choice(["north", "south", "east", "west"])
+                "category": rng.choice(["sales", "traffic", "engagement"]),
+                "region": rng.choice(["north", "south", "east", "west"])
             })
         
         return data
+
+    def generate_time_series_batches(self, days: int, batch_size: int = 100_000,
+                                     seed: Optional[Any] = None,
+                                     start_date: Optional[datetime.date] = None
+                                     ) -> Iterator[List[Dict[str, Any]]]:
+        """Yield a long time series in batches, generating one column at a time.
+
+        Each column draws from its own generator seeded from ``seed``, so a
+        seed (plus ``start_date``) fixes the output regardless of
+        ``batch_size``. Batches can be chained into a writer to produce
+        datasets far larger than memory.
+        """
+        if start_date is None:
+            start_date = (datetime.datetime.now() - datetime.timedelta(days=days)).date()
+        rngs = {
+            column: random.Random(None if seed is None else f"{seed}:{column}")
+            for column in ("value", "category", "region")
+        }
+        start_ordinal = start_date.toordinal()
+        sin = math.sin
+
+        for start in range(0, days, batch_size):
+            stop = min(start + batch_size, days)
+            gauss = rngs["value"].gauss
+            values = [round(max(0, 100 + 10 * sin(i * 0.2) + gauss(0, 5)), 2)
+                      for i in range(start, stop)]
+            categories = rngs["category"].choices(["sales", "traffic", "engagement"], k=stop - start)
+            regions = rngs["region"].choices(["north", "south", "east", "west"], k=stop - start)
+            dates = [datetime.date.fromordinal(start_ordinal + i).isoformat()
+                     for i in range(start, stop)]
+            yield [
+                {"date": date, "value": value, "category": category, "region": region}
+                for date, value, category, region in zip(dates, values, categories, regions)
+            ]
     
     def calculate_moving_average(self, data: List[Dict[str, Any]], 
                                window: int = 7) -> List[Dict[str, Any]]:
@@ -116,17 +1304,26 @@ class DataAnalyzer:
             return data
         
         result = []
-        for i in range(len(data)):
-            start_idx = max(0, i - window + 1)
-            window_data = data[start_idx:i+1]
-            avg_value = sum(item["value"] for item in window_data) / len(window_data)
-            
+        sliding = SlidingWindow(window, extremes=False, variance=False)
+        for item in data:
+            sliding.push(item["value"])
             result.append({
-                **data[i],
-                "moving_avg": round(avg_value, 2)
+                **item,
+                "moving_avg": sliding.average(2)
             })
         
         return result
+
+    def rolling_statistics(self, data: Iterable[Dict[str, Any]], window: int = 7,
+                           group_by: Optional[Union[str, Tuple[str, ...]]] = None,
+                           stats: Iterable[str] = RollingWindows.STATS,
+                           value_key: str = "value") -> Iterator[Dict[str, Any]]:
+        """Lazily compute rolling statistics, optionally per group.
+
+        Unlike ``calculate_moving_average`` this works on any iterable,
+        including unbounded feeds, and emits results as points arrive.
+        """
+        return RollingWindows(window, value_key, group_by, stats).process(data)
     
     def detect_anomalies(self, data: List[Dict[str, Any]], 
                         threshold: float = 2.0) -> List[Dict[str, Any]]:
@@ -154,6 +1351,44 @@ class DataAnalyzer:
         
         return anomalies
     
+    def detect_anomalies_stream(self, data: Iterable[Dict[str, Any]],
+                                threshold: float = 2.0, mode: str = "cumulative",
+                                group_by: Optional[Union[str, Tuple[str, ...]]] = None,
+                                **options: Any) -> Iterator[Dict[str, Any]]:
+        """Lazily flag anomalies as points arrive using ``OnlineAnomalyDetector``."""
+        detector = OnlineAnomalyDetector(threshold, mode, group_by=group_by, **options)
+        return detector.process(data)
+
+    def time_series_pipeline(self, days: int, window: int = 7, threshold: float = 2.0,
+                             seed: Optional[Any] = None, batch_size: int = 10_000,
+                             mode: str = "cumulative", **options: Any) -> "Pipeline":
+        """Lazy generate -> moving average -> anomaly detection pipeline.
+
+        Finish it with a terminal, e.g. ``.count_by("category")`` to group the
+        anomalies; memory stays bounded by ``batch_size`` whatever ``days`` is.
+        This is the streaming counterpart of main()'s workflow, not a drop-in
+        replacement: points come from ``generate_time_series_batches`` (a
+        different random stream from ``generate_time_series``) and each one
+        is scored online against the points before it, whereas
+        ``detect_anomalies`` scores against the mean of the whole list. The
+        source is a generator, so the returned pipeline runs once.
+        """
+        batches = self.generate_time_series_batches(days, batch_size, seed=seed)
+        detector = OnlineAnomalyDetector(threshold, mode, **options)
+        return (Pipeline(itertools.chain.from_iterable(batches), "generate")
+                .stage(RollingWindows(window).process, "moving_avg")
+                .stage(detector.process, "anomalies"))
+    
+    def aggregate_by(self, data: Iterable[Dict[str, Any]],
+                     keys: Union[str, Tuple[str, ...]], value_key: str = "value",
+                     median: Optional[str] = "histogram", **options: Any) -> Dict[Any, Dict[str, float]]:
+        """Per-group ``calculate_statistics`` in one pass, without member lists.
+
+        Multi-key groups use tuple keys; see ``GroupAggregator`` for the
+        median methods and spill options.
+        """
+        return GroupAggregator(keys, value_key, median, **options).update(data).result()
+    
     def group_by_category(self, data: List[Dict[str, Any]], 
                          key: str) -> Dict[str, List[Dict[str, Any]]]:
         """Group data by a specific key."""
@@ -183,7 +1418,8 @@ class DataAnalyzer:
 class WebScrapingSimulator:
     """Simulates web scraping operations (without actual HTTP requests)."""
     
-    def __init__(self):
+    def __init__(self, cache: Optional[ResultCache] = None):
+        self.cache = cache
         self.scraped_data = []
         self.headers = {
             "User-Agent": "Mozilla/5.0 (compatible; DemoBot/1.0)",
@@ -245,16 +1481,406 @@ class WebScrapingSimulator:
     
     def extract_keywords(self, articles: List[Dict[str, Any]]) -> Dict[str, int]:
         """Extract and count keywords from articles."""
-        processor = TextProcessor()
-        all_words = []
-        
-        for article in articles:
-            cleaned = processor.clean_text(article["content"])
-            tokens = processor.tokenize(cleaned)
-            filtered = processor.remove_stop_words(tokens)
-            all_words.extend(filtered)
-        
-        return dict(Counter(all_words).most_common(20))
+        if self.cache is not None:
+            processor = TextProcessor(self.cache)
+            counts: Counter = Counter()
+            for article in articles:
+                counts.update(processor.keyword_counts(article["content"]))
+        else:
+            counts = TextPipeline().count(article["content"] for article in articles)
+        return dict(counts.most_common(20))
+
+    def scrape_urls(self, urls: Iterable[str], processor: Optional[TextProcessor] = None,
+                    **options: Any) -> List[Dict[str, Any]]:
+        """Fetch and process pages concurrently; see ``AsyncScraper`` for options."""
+        async def run() -> List[Dict[str, Any]]:
+            scraper = AsyncScraper(self, **options)
+            try:
+                return [page async for page in scraper.scrape(urls, processor)]
+            finally:
+                await scraper.close()
+
+        pages = asyncio.run(run())
+        self.scraped_data = pages
+        return pages
+
+    def keyword_pipeline(self, articles: Iterable[Dict[str, Any]],
+                         processor: Optional[TextProcessor] = None,
+                         workers: Optional[int] = None, executor: str = "thread",
+                         chunk_size: int = 100) -> "Pipeline":
+        """Lazy scrape -> clean -> tokenize pipeline over article bodies.
+
+        ``.count_by()`` on the result gives the keyword counts; cleaning can
+        fan out to ``workers`` threads or processes.
+        """
+        processor = processor or TextProcessor()
+        return (Pipeline(articles, "scrape")
+                .map(itemgetter("content"), "content")
+                .map(processor.clean_text, "clean", workers=workers, executor=executor,
+                     chunk_size=chunk_size if executor == "process" else 1)
+                .flat_map(lambda text: processor.remove_stop_words(processor.tokenize(text)),
+                          "tokenize"))
+
+    def extract_keywords_batched(self, articles: Iterable[Dict[str, Any]], top_k: int = 20,
+                                 workers: Optional[int] = None, chunk_size: int = 1_000,
+                                 approximate: bool = False,
+                                 capacity: int = 10_000) -> Dict[str, int]:
+        """Extract keywords from very large or streamed article sets.
+
+        See ``KeywordExtractor`` for how chunks are counted and merged.
+        """
+        extractor = KeywordExtractor(workers=workers, chunk_size=chunk_size,
+                                     approximate=approximate, capacity=capacity)
+        return extractor.extract(articles, top_k)
+
+
+class RateLimiter:
+    """Token-bucket rate limiter shared by every request of a scraper."""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class HostConnectionPool:
+    """Keep-alive connections to one host, capped at ``limit`` in use."""
+
+    def __init__(self, host: str, port: int, use_ssl: bool, limit: int):
+        self.host = host
+        self.port = port
+        self.ssl = ssl.create_default_context() if use_ssl else None
+        self.slots = asyncio.Semaphore(limit)
+        self.idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self.opened = 0
+        self.reused = 0
+
+    async def checkout(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter, bool]:
+        """Return (reader, writer, reused), preferring an idle connection."""
+        while self.idle:
+            reader, writer = self.idle.pop()
+            if not writer.is_closing() and not reader.at_eof():
+                self.reused += 1
+                return reader, writer, True
+            writer.close()
+        reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl)
+        self.opened += 1
+        return reader, writer, False
+
+    def checkin(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                keep_alive: bool) -> None:
+        """Return a connection for reuse, or close it."""
+        if keep_alive and not writer.is_closing():
+            self.idle.append((reader, writer))
+        else:
+            writer.close()
+
+    def close(self) -> None:
+        """Close every idle connection."""
+        while self.idle:
+            self.idle.pop()[1].close()
+
+
+async def _read_http_response(reader: asyncio.StreamReader,
+                              head: bool = False) -> Tuple[int, Dict[str, str], bytes, bool]:
+    """Read one HTTP/1.x response; returns (status, headers, body, keep_alive).
+
+    Interim 1xx responses are skipped. 204, 304 and replies to ``head``
+    requests have no body, whatever their headers say.
+    """
+    while True:
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError("connection closed before response")
+        version, status, *_ = status_line.decode("latin-1").split(" ", 2)
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        if not 100 <= int(status) < 200:
+            break
+
+    keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+    if head or int(status) in (204, 304):
+        body = b""
+    elif headers.get("transfer-encoding", "").lower() == "chunked":
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    pass
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        body = b"".join(chunks)
+    elif "content-length" in headers:
+        body = await reader.readexactly(int(headers["content-length"]))
+    else:
+        body = await reader.read()
+        keep_alive = False
+    return int(status), headers, body, keep_alive
+
+
+class AsyncScraper:
+    """Concurrent HTTP/1.1 fetch engine for ``WebScrapingSimulator``.
+
+    - at most ``concurrency`` requests in flight overall and ``per_host``
+      connections per host, reused with keep-alive
+    - optional token-bucket ``rate`` limit (requests per second)
+    - ``retries`` with exponential backoff and jitter on connection errors,
+      timeouts, 429 and 5xx responses
+    - results are yielded as they complete, and no new request starts while
+      the consumer is busy, which gives natural backpressure
+
+    Uses only the standard library, so it runs offline against
+    ``ArticleServer``.
+    """
+
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(self, simulator: Optional["WebScrapingSimulator"] = None,
+                 concurrency: int = 50, per_host: int = 10,
+                 rate: Optional[float] = None, retries: int = 3,
+                 backoff: float = 0.1, timeout: float = 10.0):
+        self.simulator = simulator or WebScrapingSimulator()
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.rate_limiter = RateLimiter(rate) if rate else None
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.pools: Dict[Tuple[str, str, int], HostConnectionPool] = {}
+        self.stats = {"requests": 0, "retries": 0, "failures": 0}
+
+    def _pool(self, scheme: str, host: str, port: int) -> HostConnectionPool:
+        key = (scheme, host, port)
+        pool = self.pools.get(key)
+        if pool is None:
+            pool = self.pools[key] = HostConnectionPool(host, port, scheme == "https", self.per_host)
+        return pool
+
+    def _request(self, host: str, path: str) -> bytes:
+        lines = [f"GET {path} HTTP/1.1", f"Host: {host}"]
+        lines += [f"{name}: {value}" for name, value in self.simulator.headers.items()]
+        lines += ["Connection: keep-alive", "", ""]
+        return "\r\n".join(lines).encode("latin-1")
+
+    async def _exchange(self, pool: HostConnectionPool,
+                        request: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        """Send one request, retrying once at once if a reused connection went stale."""
+        while True:
+            reader, writer, reused = await pool.checkout()
+            try:
+                writer.write(request)
+                await writer.drain()
+                status, headers, body, keep_alive = await _read_http_response(reader)
+            except BaseException as error:
+                writer.close()
+                if reused and isinstance(error, (ConnectionError, asyncio.IncompleteReadError)):
+                    continue
+                raise
+            pool.checkin(reader, writer, keep_alive)
+            return status, headers, body
+
+    async def fetch(self, url: str) -> Dict[str, Any]:
+        """Fetch one URL with retries; never raises for network errors."""
+        parts = urlsplit(url)
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        host = parts.hostname or ""
+        pool = self._pool(parts.scheme, host, port)
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        request = self._request(parts.netloc, path)
+        start = time.perf_counter()
+        status: Optional[int] = None
+        error = ""
+
+        for attempt in range(1, self.retries + 2):
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire()
+            self.stats["requests"] += 1
+            async with pool.slots:
+                try:
+                    status, headers, body = await asyncio.wait_for(
+                        self._exchange(pool, request), self.timeout)
+                except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as exc:
+                    status, error = None, str(exc) or exc.__class__.__name__
+                else:
+                    if status not in self.RETRY_STATUSES:
+                        charset = "utf-8"
+                        match = re.search(r"charset=([\w-]+)", headers.get("content-type", ""))
+                        if match:
+                            charset = match.group(1)
+                        try:
+                            text = body.decode(charset, errors="replace")
+                        except LookupError:
+                            text = body.decode("utf-8", errors="replace")
+                        return {
+                            "url": url,
+                            "status": status,
+                            "body": text,
+                            "latency": time.perf_counter() - start,
+                            "attempts": attempt
+                        }
+                    error = f"HTTP {status}"
+            if attempt <= self.retries:
+                self.stats["retries"] += 1
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1) * (1 + random.random()))
+
+        self.stats["failures"] += 1
+        return {
+            "url": url,
+            "status": status,
+            "body": None,
+            "error": error,
+            "latency": time.perf_counter() - start,
+            "attempts": self.retries + 1
+        }
+
+    async def fetch_all(self, urls: Iterable[str]) -> AsyncIterator[Dict[str, Any]]:
+        """Fetch URLs with bounded concurrency, yielding results as they finish."""
+        pending: set = set()
+        try:
+            for url in urls:
+                if len(pending) >= self.concurrency:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+                pending.add(asyncio.ensure_future(self.fetch(url)))
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def scrape(self, urls: Iterable[str],
+                     processor: Optional[TextProcessor] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Fetch pages and hand each body to ``processor`` as soon as it arrives."""
+        processor = processor or TextProcessor()
+        async for page in self.fetch_all(urls):
+            body = page.pop("body")
+            if body is not None:
+                page["content"] = processor.clean_text(body)
+                page["keywords"] = processor.keyword_counts(body)
+                page["readability"] = processor.calculate_readability_score(page["content"])
+            yield page
+
+    async def close(self) -> None:
+        """Close pooled keep-alive connections."""
+        for pool in self.pools.values():
+            pool.close()
+
+    def connection_stats(self) -> Dict[str, int]:
+        """Connections opened versus requests served from reused connections."""
+        return {
+            "opened": sum(pool.opened for pool in self.pools.values()),
+            "reused": sum(pool.reused for pool in self.pools.values())
+        }
+
+
+class ArticleServer:
+    """Local stand-in HTTP/1.1 server serving generated articles.
+
+    ``GET /articles/<n>`` returns an HTML article. ``latency`` adds a delay per
+    response and ``failure_rate`` answers that fraction of requests with
+    503, so retry behaviour can be exercised offline.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 latency: float = 0.0, failure_rate: float = 0.0):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.simulator = WebScrapingSimulator()
+        self.requests = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: set = set()
+
+    async def start(self) -> str:
+        """Start listening and return the base URL."""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port,
+                                                  backlog=1024)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.base_url
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def urls(self, count: int) -> List[str]:
+        """Return ``count`` article URLs served by this server."""
+        return [f"{self.base_url}/articles/{n}" for n in range(1, count + 1)]
+
+    async def close(self) -> None:
+        """Stop listening and drop open keep-alive connections."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for task in list(self._connections):
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                close = False
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    if line.lower().startswith(b"connection:") and b"close" in line.lower():
+                        close = True
+                self.requests += 1
+                path = request_line.split()[1].decode("latin-1")
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                if random.random() < self.failure_rate:
+                    status, body = "503 Service Unavailable", b"busy"
+                elif re.fullmatch(r"/articles/\d+", path):
+                    content = self.simulator._generate_article_content()
+                    status = "200 OK"
+                    body = (f"<html><head><title>Article {path.rsplit('/', 1)[1]}</title></head>"
+                            f"<body><article><p>{content}</p></article></body></html>").encode()
+                else:
+                    status, body = "404 Not Found", b"not found"
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Type: text/html; charset=utf-8\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: {'close' if close else 'keep-alive'}\r\n\r\n".encode() + body)
+                await writer.drain()
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
 
 def main():
     """Main function to demonstrate all classes."""
@@ -363,5 +1989,9 @@ def main():
     
     print("\n=== Demo Complete ===")
 
+instrumentation.register(TextProcessor, TextPipeline, KeywordExtractor, GroupAggregator,
+                         DataAnalyzer, WebScrapingSimulator, AsyncScraper)
+
 if __name__ == "__main__":
-    main()
+    with instrumentation.from_env():
+        main()
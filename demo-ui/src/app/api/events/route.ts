@@ -5,8 +5,10 @@ export const dynamic = 'force-dynamic'
 export async function GET() {
   const traces = traceStore.getTraces()
   const stats = traceStore.getStats()
+  const methodSpans = traceStore.getMethodSpans()
+  const methodStats = traceStore.getMethodStats()
   
-  return Response.json({ traces, stats }, {
+  return Response.json({ traces, stats, methodSpans, methodStats }, {
     headers: {
       'Access-Control-Allow-Origin': '*',
     },
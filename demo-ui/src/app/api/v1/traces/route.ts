@@ -1,5 +1,5 @@
 import { NextRequest, NextResponse } from 'next/server'
-import { traceStore, ParsedTrace } from '@/lib/traceStore'
+import { traceStore, ParsedTrace, MethodSpan } from '@/lib/traceStore'
 
 interface OTLPAttribute {
   key: string
@@ -9,14 +9,19 @@ interface OTLPAttribute {
 interface OTLPSpan {
   traceId: string
   spanId: string
+  parentSpanId?: string
   name: string
+  startTimeUnixNano?: string
+  endTimeUnixNano?: string
   attributes?: OTLPAttribute[]
+  status?: { code?: number }
 }
 
 interface OTLPPayload {
   resourceSpans?: Array<{
     resource?: { attributes?: OTLPAttribute[] }
     scopeSpans?: Array<{
+      scope?: { name?: string }
       spans?: OTLPSpan[]
     }>
   }>
@@ -27,6 +32,31 @@ function getAttribute(attrs: OTLPAttribute[] | undefined, key: string): string {
   return attr?.value?.stringValue || attr?.value?.intValue || ''
 }
 
+function nanosToMs(value: string | undefined): number {
+  return Number(value || 0) / 1e6
+}
+
+function parseMethodSpan(span: OTLPSpan, service: string, repo: string): MethodSpan {
+  const attrs = span.attributes
+  const peakBytes = getAttribute(attrs, 'demo.memory.peak_bytes')
+  return {
+    id: `${span.traceId}-${span.spanId}`,
+    timestamp: new Date(nanosToMs(span.startTimeUnixNano)).toISOString(),
+    traceId: span.traceId,
+    spanId: span.spanId,
+    parentSpanId: span.parentSpanId || '',
+    name: span.name,
+    service,
+    repo,
+    durationMs: nanosToMs(span.endTimeUnixNano) - nanosToMs(span.startTimeUnixNano),
+    cpuMs: nanosToMs(getAttribute(attrs, 'demo.cpu_ns')),
+    records: Number(getAttribute(attrs, 'demo.records') || 0),
+    bytes: Number(getAttribute(attrs, 'demo.bytes') || 0),
+    peakBytes: peakBytes ? Number(peakBytes) : null,
+    error: span.status?.code === 2,
+  }
+}
+
 export async function POST(request: NextRequest) {
   try {
     const payload: OTLPPayload = await request.json()
@@ -34,10 +64,21 @@ export async function POST(request: NextRequest) {
     for (const resourceSpan of payload.resourceSpans || []) {
       const resourceAttrs = resourceSpan.resource?.attributes
       const repo = getAttribute(resourceAttrs, 'vcs.repository.name')
+      const service = getAttribute(resourceAttrs, 'service.name')
       
       for (const scopeSpan of resourceSpan.scopeSpans || []) {
         for (const span of scopeSpan.spans || []) {
           const attrs = span.attributes
+
+          // Method spans (DEMO_INSTRUMENT=otlp) get their own panel; only
+          // commit spans feed the attribution stats, anything else is skipped
+          if (scopeSpan.scope?.name === 'demo.instrumentation') {
+            traceStore.addMethodSpan(parseMethodSpan(span, service, repo))
+            continue
+          }
+          if (span.name !== 'git.commit' || !getAttribute(attrs, 'vcs.commit.id')) {
+            continue
+          }
           
           const trace: ParsedTrace = {
             id: `${span.traceId}-${span.spanId}-${Date.now()}`,
@@ -17,10 +17,20 @@ interface CommitTrace {
   aiStats: string
 }
 
+interface MethodStats {
+  calls: number
+  errors: number
+  totalMs: number
+  maxMs: number
+  cpuMs: number
+  records: number
+}
+
 export default function Home() {
   const [traces, setTraces] = useState<CommitTrace[]>([])
   const [connected, setConnected] = useState(false)
   const [stats, setStats] = useState({ aiLines: 0, humanLines: 0, mixedLines: 0 })
+  const [methodStats, setMethodStats] = useState<Record<string, MethodStats>>({})
 
   useEffect(() => {
     const fetchTraces = async () => {
@@ -35,6 +45,7 @@ export default function Home() {
             mixedLines: data.stats.mixedLines || 0,
           })
         }
+        setMethodStats(data.methodStats || {})
         setConnected(true)
       } catch {
         setConnected(false)
@@ -56,6 +67,7 @@ export default function Home() {
   }
 
   const totals = stats
+  const methods = Object.entries(methodStats).sort(([, a], [, b]) => b.totalMs - a.totalMs)
 
   return (
     <main className="container mx-auto px-4 py-8 max-w-6xl">
@@ -165,6 +177,39 @@ export default function Home() {
           })}
         </div>
       )}
+
+      {/* Method spans from instrumented demo scripts (DEMO_INSTRUMENT=otlp) */}
+      {methods.length > 0 && (
+        <div className="mt-8 bg-gray-900 border border-gray-800 rounded-lg p-5">
+          <h2 className="text-lg font-semibold text-white mb-3">Method spans</h2>
+          <table className="w-full text-sm">
+            <thead>
+              <tr className="text-gray-500 text-left">
+                <th className="py-1 font-normal">Method</th>
+                <th className="py-1 font-normal text-right">Calls</th>
+                <th className="py-1 font-normal text-right">Avg ms</th>
+                <th className="py-1 font-normal text-right">Max ms</th>
+                <th className="py-1 font-normal text-right">CPU ms</th>
+                <th className="py-1 font-normal text-right">Records</th>
+                <th className="py-1 font-normal text-right">Errors</th>
+              </tr>
+            </thead>
+            <tbody>
+              {methods.map(([name, method]) => (
+                <tr key={name} className="border-t border-gray-800 text-gray-300">
+                  <td className="py-1 font-mono">{name}</td>
+                  <td className="py-1 text-right">{method.calls.toLocaleString()}</td>
+                  <td className="py-1 text-right">{(method.totalMs / method.calls).toFixed(2)}</td>
+                  <td className="py-1 text-right">{method.maxMs.toFixed(2)}</td>
+                  <td className="py-1 text-right">{method.cpuMs.toFixed(1)}</td>
+                  <td className="py-1 text-right">{method.records.toLocaleString()}</td>
+                  <td className={`py-1 text-right ${method.errors ? 'text-red-400' : ''}`}>{method.errors}</td>
+                </tr>
+              ))}
+            </tbody>
+          </table>
+        </div>
+      )}
     </main>
   )
 }
@@ -16,6 +16,32 @@ export interface ParsedTrace {
   aiStats: string
 }
 
+export interface MethodSpan {
+  id: string
+  timestamp: string
+  traceId: string
+  spanId: string
+  parentSpanId: string
+  name: string
+  service: string
+  repo: string
+  durationMs: number
+  cpuMs: number
+  records: number
+  bytes: number
+  peakBytes: number | null
+  error: boolean
+}
+
+export interface MethodStats {
+  calls: number
+  errors: number
+  totalMs: number
+  maxMs: number
+  cpuMs: number
+  records: number
+}
+
 export interface AggregateStats {
   totalCommits: number
   totalLinesAdded: number
@@ -30,6 +56,8 @@ class TraceStore {
   private traces: ParsedTrace[] = []
   private listeners: Set<TraceListener> = new Set()
   private statsListeners: Set<StatsListener> = new Set()
+  private methodSpans: MethodSpan[] = []
+  private methodStats: Record<string, MethodStats> = {}
   private stats: AggregateStats = {
     totalCommits: 0,
     totalLinesAdded: 0,
@@ -53,6 +81,26 @@ class TraceStore {
     this.statsListeners.forEach(listener => listener(this.stats))
   }
 
+  // Method spans from instrumented demo scripts are kept apart from commit
+  // traces so they never count towards the attribution stats
+  addMethodSpan(span: MethodSpan) {
+    this.methodSpans.unshift(span)
+    if (this.methodSpans.length > 200) {
+      this.methodSpans = this.methodSpans.slice(0, 200)
+    }
+
+    if (!this.methodStats[span.name]) {
+      this.methodStats[span.name] = { calls: 0, errors: 0, totalMs: 0, maxMs: 0, cpuMs: 0, records: 0 }
+    }
+    const stats = this.methodStats[span.name]
+    stats.calls++
+    if (span.error) stats.errors++
+    stats.totalMs += span.durationMs
+    stats.maxMs = Math.max(stats.maxMs, span.durationMs)
+    stats.cpuMs += span.cpuMs
+    stats.records += span.records
+  }
+
   private updateStats(trace: ParsedTrace) {
     let aiLines = 0, humanLines = 0, mixedLines = 0, totalLines = 0
     
@@ -99,6 +147,14 @@ class TraceStore {
     return { ...this.stats }
   }
 
+  getMethodSpans(): MethodSpan[] {
+    return [...this.methodSpans]
+  }
+
+  getMethodStats(): Record<string, MethodStats> {
+    return { ...this.methodStats }
+  }
+
   subscribe(listener: TraceListener): () => void {
     this.listeners.add(listener)
     return () => this.listeners.delete(listener)
@@ -0,0 +1,10 @@
+"""Make the hook modules and demo scripts importable the way they import each other."""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for directory in (".githooks", "demo-code-to-change"):
+    path = os.path.join(ROOT, directory)
+    if path not in sys.path:
+        sys.path.insert(0, path)
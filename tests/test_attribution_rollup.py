@@ -0,0 +1,125 @@
+"""Tests for the rolling attribution rollups."""
+
+import json
+import os
+import subprocess
+import sys
+
+from attribution_rollup import DEFAULT_RETENTION, RESOLUTIONS, AttributionRollup, RollupFile
+
+HOUR = RESOLUTIONS["hour"]
+DAY = RESOLUTIONS["day"]
+START = 1_700_006_400  # midnight UTC
+
+
+def _commit(commit_id, timestamp, author="ada", ai=10, human=5, mixed=0):
+    return {"commit_id": commit_id, "repo": "demo", "author": author, "branch": "main",
+            "timestamp": timestamp, "ai": ai, "human": human, "mixed": mixed}
+
+
+def test_duplicate_commit_ids_are_counted_once():
+    rollup = AttributionRollup()
+    rollup.add(_commit("c1", START + 60))
+    rollup.add(_commit("c1", START + 60))
+    rollup.add(_commit("c1", START + 2 * HOUR))
+
+    total = rollup.query(DAY, now=START + DAY)["total"]
+    assert total["commits"] == 1
+    assert total["aiLines"] == 10
+    assert rollup.counts["duplicates"] == 2
+
+
+def test_buckets_are_evicted_as_the_watermark_advances():
+    rollup = AttributionRollup()
+    rollup.add(_commit("c1", START))
+    assert all(rollup.buckets[resolution] for resolution in RESOLUTIONS)
+
+    rollup.advance(START + DEFAULT_RETENTION["minute"] * RESOLUTIONS["minute"])
+    assert not rollup.buckets["minute"]
+    assert rollup.buckets["hour"]
+
+    rollup.advance(START + DEFAULT_RETENTION["hour"] * HOUR)
+    assert not rollup.buckets["hour"]
+    assert rollup.buckets["day"]
+
+    rollup.advance(START + DEFAULT_RETENTION["day"] * DAY)
+    assert not any(rollup.buckets.values())
+    assert not any(rollup._heaps.values())
+
+
+def test_span_past_every_retention_is_late():
+    rollup = AttributionRollup()
+    rollup.add(_commit("new", START + DEFAULT_RETENTION["day"] * DAY))
+    rollup.add(_commit("old", START))
+    assert rollup.counts["late"] == 1
+    assert "old" not in rollup.seen
+
+
+def test_seen_ids_are_pruned_past_the_hour_retention():
+    rollup = AttributionRollup()
+    rollup.add(_commit("c1", START))
+    rollup.add(_commit("c2", START + 7 * DAY))
+    assert set(rollup.seen) == {"c1", "c2"}
+
+    # Reloading must rebuild the heap that drives pruning
+    rollup = AttributionRollup.from_state(json.loads(json.dumps(rollup.to_state())))
+    rollup.advance(START + DEFAULT_RETENTION["hour"] * HOUR)
+    assert set(rollup.seen) == {"c2"}
+    assert [commit_id for _, commit_id in rollup._seen_heap] == ["c2"]
+
+    # Redelivered after the hour retention, it only lands in the day buckets
+    rollup.add(_commit("c1", START))
+    assert rollup.counts["duplicates"] == 0
+    assert rollup.query(30 * DAY, resolution="day", now=START + 9 * DAY)["total"]["commits"] == 3
+
+
+def test_query_sums_across_resolutions_and_groups():
+    rollup = AttributionRollup()
+    stamps = [START + offset for offset in (0, 90 * 60, 26 * HOUR, 3 * DAY + 45 * 60)]
+    for number, stamp in enumerate(stamps):
+        rollup.add(_commit(f"c{number}", stamp, author="ada" if number % 2 else "bob",
+                           ai=number + 1, human=1))
+    now = START + 3 * DAY + HOUR
+
+    result = rollup.query(7 * DAY, now=now)
+    assert result["total"]["commits"] == 4
+    assert result["total"]["aiLines"] == 1 + 2 + 3 + 4
+    assert {row["author"]: row["commits"] for row in result["groups"]} == {"ada": 2, "bob": 2}
+    assert result["buckets"] < 7 * 24
+
+    latest = rollup.query(2 * HOUR, now=now, author="ada")
+    assert latest["total"]["commits"] == 1
+    assert latest["total"]["aiLines"] == 4
+
+
+def test_query_with_now_leaves_the_state_file_unchanged(tmp_path):
+    state = str(tmp_path / "rollup.json")
+    with RollupFile(state) as rollup:
+        rollup.add(_commit("c1", START))
+    with open(state, "rb") as handle:
+        before = handle.read()
+
+    script = os.path.join(os.path.dirname(__file__), os.pardir, ".githooks", "attribution_rollup.py")
+    future = START + 1_000 * DAY
+    output = subprocess.run([sys.executable, script, "--state", state, "query",
+                             "--window", "1d", "--now", str(future)],
+                            capture_output=True, text=True, check=True).stdout
+    assert output
+
+    with open(state, "rb") as handle:
+        assert handle.read() == before
+    with RollupFile(state, readonly=True) as rollup:
+        assert rollup.query(DAY, now=START + HOUR)["total"]["commits"] == 1
+
+
+def test_planned_query_matches_a_fixed_resolution_query():
+    rollup = AttributionRollup()
+    for number in range(24):
+        rollup.add(_commit(f"c{number}", START + number * 17 * 60))
+    now = START + 6 * HOUR + 7 * 60
+
+    planned = rollup.query(2 * HOUR, now=now)
+    fixed = rollup.query(2 * HOUR, now=now, resolution=planned["resolution"])
+    assert planned["resolution"] == "minute"
+    assert planned["total"] == fixed["total"]
+    assert planned["buckets"] < fixed["buckets"]
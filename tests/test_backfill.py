@@ -0,0 +1,85 @@
+"""Tests for the resumable history backfill."""
+
+import json
+import os
+import stat
+import subprocess
+
+import pytest
+
+from backfill import Backfill, iter_commits, synthetic_repository
+
+
+class Interrupted(Exception):
+    pass
+
+
+def _git(repo, *args):
+    subprocess.run(["git", "-c", "user.name=Dev", "-c", "user.email=dev@example.com", *args],
+                   cwd=repo, check=True, capture_output=True)
+
+
+def _stats_files(repo):
+    logs = os.path.join(repo, "commit_logs")
+    return {name for name in os.listdir(logs)
+            if os.path.exists(os.path.join(logs, name, "stats.json"))}
+
+
+@pytest.fixture
+def repo(tmp_path):
+    path = str(tmp_path / "repo")
+    synthetic_repository(path, 60)
+    return path
+
+
+@pytest.fixture
+def git_ai(tmp_path, monkeypatch):
+    def install(body: str = '{"ai_additions": 1, "human_additions": 2}', code: int = 0):
+        path = tmp_path / "git-ai"
+        path.write_text(f"#!/bin/sh\necho '{body}'\nexit {code}\n")
+        path.chmod(path.stat().st_mode | stat.S_IEXEC)
+        monkeypatch.setenv("GIT_AI_BIN", str(path))
+    return install
+
+
+def test_resume_picks_up_commits_added_since_the_interruption(repo):
+    def stop(counts):
+        raise Interrupted
+
+    with pytest.raises(Interrupted):
+        Backfill(repo, "numstat", checkpoint_every=20).run(progress=stop)
+    assert len(_stats_files(repo)) == 20
+
+    _git(repo, "commit", "-q", "--allow-empty", "-m", "new 1")
+    _git(repo, "commit", "-q", "--allow-empty", "-m", "new 2")
+    counts = Backfill(repo, "numstat", checkpoint_every=20).run()
+    assert counts["resumed_past"] == 20
+    assert counts["written"] == 42
+    assert len(_stats_files(repo)) == 62
+
+
+def test_git_ai_failures_are_not_written_and_retried(repo, git_ai):
+    git_ai("boom", code=1)
+    counts = Backfill(repo, "git-ai", workers=2).run("HEAD~5..HEAD")
+    assert counts["failed"] == 5 and counts["written"] == 0
+    assert not _stats_files(repo)
+
+    git_ai()
+    counts = Backfill(repo, "git-ai", workers=2).run("HEAD~5..HEAD")
+    assert counts["written"] == 5
+
+
+def test_git_ai_replaces_numstat_stats_but_not_the_reverse(repo, git_ai):
+    git_ai()
+    Backfill(repo, "numstat").run("HEAD~3..HEAD")
+    assert Backfill(repo, "numstat").run("HEAD~3..HEAD")["skipped"] == 3
+    assert Backfill(repo, "git-ai").run("HEAD~3..HEAD")["written"] == 3
+    assert Backfill(repo, "numstat").run("HEAD~3..HEAD")["skipped"] == 3
+    for name in _stats_files(repo):
+        with open(os.path.join(repo, "commit_logs", name, "stats.json")) as handle:
+            assert json.load(handle) == {"ai_additions": 1, "human_additions": 2}
+
+
+def test_iter_commits_raises_when_git_log_fails(repo):
+    with pytest.raises(subprocess.CalledProcessError):
+        list(iter_commits(repo, "no-such-ref"))
@@ -0,0 +1,74 @@
+"""Tests for the checkpoint coalescer, run against a stub git-ai."""
+
+import time
+
+import pytest
+
+from checkpoint_daemon import CheckpointCoalescer, read_stand_in_log, write_stand_in
+
+
+@pytest.fixture
+def log(tmp_path, monkeypatch):
+    log = str(tmp_path / "git-ai.log")
+    monkeypatch.setenv("GIT_AI_BIN", write_stand_in(str(tmp_path / "git-ai"), log, 0.0))
+    return log
+
+
+@pytest.fixture
+def coalescer(log):
+    coalescer = CheckpointCoalescer(window=60.0)
+    yield coalescer
+    coalescer.close()
+
+
+def _agent(*paths, conversation="c1"):
+    return {"type": "ai_agent", "agent_name": "cascade", "conversation_id": conversation,
+            "model": "m", "edited_filepaths": list(paths)}
+
+
+def test_human_checkpoint_without_pending_writes_is_recorded(coalescer, log):
+    assert coalescer.submit({"type": "human"}) == "recorded"
+    assert [event["type"] for event in read_stand_in_log(log)] == ["human"]
+
+
+def test_human_checkpoint_is_dropped_while_agent_writes_are_pending(coalescer, log):
+    assert coalescer.submit(_agent("a.py")) == "queued"
+    assert coalescer.submit({"type": "human"}) == "coalesced"
+    assert read_stand_in_log(log) == []
+
+    assert coalescer.flush() == 1
+    assert coalescer.submit({"type": "human"}) == "recorded"
+    assert [event["type"] for event in read_stand_in_log(log)] == ["ai_agent", "human"]
+
+
+def test_agent_writes_merge_per_conversation(coalescer, log):
+    coalescer.submit(_agent("a.py"))
+    coalescer.submit(_agent("b.py", "a.py"))
+    coalescer.submit(_agent("c.py", conversation="c2"))
+
+    assert coalescer.flush() == 2
+    files = {event["conversation_id"]: event["edited_filepaths"]
+             for event in read_stand_in_log(log)}
+    assert files == {"c1": ["a.py", "b.py"], "c2": ["c.py"]}
+    assert coalescer.counts["git_ai_runs"] == 2
+    assert coalescer.counts["coalesced"] == 1
+
+
+def test_max_files_flushes_without_waiting_for_the_window(log):
+    coalescer = CheckpointCoalescer(window=60.0, max_files=2)
+    try:
+        coalescer.submit(_agent("a.py", "b.py"))
+        deadline = time.monotonic() + 5
+        while coalescer.stats()["pending_files"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert coalescer.stats()["pending_files"] == 0
+    finally:
+        coalescer.close()
+    assert len(read_stand_in_log(log)) == 1
+
+
+def test_close_runs_pending_checkpoints(log):
+    coalescer = CheckpointCoalescer(window=60.0)
+    coalescer.submit(_agent("a.py"))
+    coalescer.close()
+    assert [event["edited_filepaths"] for event in read_stand_in_log(log)] == [["a.py"]]
@@ -0,0 +1,87 @@
+"""Tests for the SQLite commit index."""
+
+import json
+import os
+import subprocess
+
+import pytest
+
+from backfill import synthetic_repository
+from commit_store import CommitStore, queued_branches
+from otel_export import SpanQueue, build_span
+
+DAY = 86_400
+
+
+@pytest.fixture
+def store(tmp_path):
+    with CommitStore(str(tmp_path / "commits.db")) as store:
+        yield store
+
+
+def _rollups(store):
+    return store.connection.execute(
+        "SELECT day, repo, author, branch, commits, ai_lines FROM daily_rollups "
+        "WHERE commits > 0").fetchall()
+
+
+def test_upsert_fills_in_metadata_without_blanking_it(store):
+    commit_id = "a" * 40
+    store.add_many([{"commit_id": commit_id, "stats": '{"ai_additions": 2}'}])
+    store.add_many([{"commit_id": commit_id, "stats": '{"ai_additions": 2}', "repo": "repo",
+                     "author": "Dev", "email": "dev@example.com", "message": "m",
+                     "timestamp": 3 * DAY, "branch": "main"}])
+    assert _rollups(store) == [(3, "repo", "Dev", "main", 1, 2)]
+
+    # A later row without metadata (e.g. a re-import) keeps what is stored
+    store.add_many([{"commit_id": commit_id, "stats": '{"ai_additions": 5}'}])
+    row = store.connection.execute(
+        "SELECT repo, author, email, message, timestamp, branch FROM commits").fetchone()
+    assert row == ("repo", "Dev", "dev@example.com", "m", 3 * DAY, "main")
+    assert _rollups(store) == [(3, "repo", "Dev", "main", 1, 5)]
+
+
+def test_aggregates_follow_every_write(store):
+    store.add_many([{"commit_id": f"{index:040x}", "stats": json.dumps({"ai_additions": index}),
+                     "repo": "repo", "author": f"Dev {index % 2}", "branch": "main",
+                     "timestamp": index * DAY} for index in range(1, 5)])
+    result = store.aggregates(since=2 * DAY)
+    assert result["totalCommits"] == 3 and result["aiLines"] == 9
+    assert result["byAuthor"]["Dev 0"]["commits"] == 2
+
+
+def test_import_recovers_branches(tmp_path):
+    repo = str(tmp_path / "repo")
+    synthetic_repository(repo, 5)
+    subprocess.run(["git", "branch", "feature", "HEAD~2"], cwd=repo, check=True)
+    commits = subprocess.run(["git", "rev-list", "HEAD"], cwd=repo, check=True,
+                             capture_output=True, text=True).stdout.split()
+    logs = os.path.join(repo, "commit_logs")
+    for commit_id in commits + ["f" * 40]:
+        os.makedirs(os.path.join(logs, commit_id))
+        with open(os.path.join(logs, commit_id, "stats.json"), "w") as handle:
+            handle.write('{"ai_additions": 1}')
+    # The newest commit's span is still queued with the branch it was made on
+    meta = {"commit_id": commits[0], "commit_short": commits[0][:7], "message": "m",
+            "author": "Dev", "email": "", "branch": "topic", "repo": "repo", "timestamp": 0}
+    SpanQueue(os.path.join(logs, "otel-queue")).append([build_span(meta, "{}")])
+    assert queued_branches(logs) == {commits[0]: "topic"}
+
+    with CommitStore(os.path.join(logs, "commits.db")) as store:
+        counts = store.import_directory(logs, repo)
+        branches = dict(store.connection.execute("SELECT commit_id, branch FROM commits"))
+    assert counts["commits"] == 6 and counts["missing_metadata"] == 1
+    assert branches[commits[0]] == "topic"
+    assert branches[commits[1]] == "main"
+    assert branches["f" * 40] == "unknown"
+
+
+def test_import_checkpoints_only_adds_newer_logs(store, tmp_path):
+    directory = tmp_path / "checkpoints"
+    directory.mkdir()
+    for name in ("checkpoint_20240101_120000.log", "checkpoint_20240102_120000.log", "other.log"):
+        (directory / name).write_text("ok")
+    assert store.import_checkpoints(str(tmp_path)) == 2
+    (directory / "checkpoint_20240103_120000.log").write_text("ok")
+    assert store.import_checkpoints(str(tmp_path), store.newest_checkpoint()) == 1
+    assert store.newest_checkpoint() == "checkpoint_20240103_120000.log"
@@ -0,0 +1,38 @@
+"""Tests for the opt-in demo instrumentation and its OTLP export."""
+
+from instrumentation import Instrumentation
+from otel_export import StandInCollector
+
+
+class Widget:
+    def outer(self, items):
+        return [self.inner(item) for item in items]
+
+    def inner(self, item):
+        return item * 2
+
+
+def test_disabled_methods_are_untouched():
+    original = Widget.outer
+    with Instrumentation([Widget]):
+        assert Widget.outer is not original
+    assert Widget.outer is original
+
+
+def test_method_spans_reach_the_demo_ui_endpoint_shape():
+    instrumentation = Instrumentation([Widget])
+    with instrumentation:
+        assert Widget().outer([1, 2, 3]) == [2, 4, 6]
+    with StandInCollector() as collector:
+        assert instrumentation.export(f"{collector.endpoint}/api/v1/traces")
+        payload, = collector.payloads
+    scope, = payload["resourceSpans"][0]["scopeSpans"]
+    # demo-ui routes spans of this scope to its "Method spans" panel
+    assert scope["scope"]["name"] == "demo.instrumentation"
+    spans = {span["spanId"]: span for span in scope["spans"]}
+    outer, = [span for span in spans.values() if span["name"].endswith("Widget.outer")]
+    inner = [span for span in spans.values() if span["name"].endswith("Widget.inner")]
+    assert len(inner) == 3
+    assert all(span["parentSpanId"] == outer["spanId"] for span in inner)
+    assert all(span["name"] != "git.commit" for span in spans.values())
+    assert instrumentation.stats[outer["name"]].calls == 1
@@ -0,0 +1,81 @@
+"""Tests for the OTEL span queue, exporter and stats collection."""
+
+import json
+import os
+import stat
+
+import pytest
+
+import otel_export
+from otel_export import (ExportError, OTLPExporter, SpanQueue, StandInCollector, build_span,
+                         collect_stats)
+
+
+def _record(index: int = 0):
+    meta = {"commit_id": f"{index:040x}", "commit_short": f"{index:07x}", "message": "m",
+            "author": "Dev", "email": "dev@example.com", "branch": "main", "repo": "repo",
+            "timestamp": 1_700_000_000 + index}
+    return build_span(meta, '{"ai_additions": 1}')
+
+
+def _stub(tmp_path, body: str, code: int = 0) -> str:
+    path = tmp_path / "git-ai"
+    path.write_text(f"#!/bin/sh\necho '{body}'\nexit {code}\n")
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return str(path)
+
+
+def test_compression_none_overrides_the_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv("OTEL_EXPORTER_OTLP_COMPRESSION", "gzip")
+    queue = SpanQueue(str(tmp_path / "queue"))
+    assert OTLPExporter(queue, compression="none").compression is None
+    assert OTLPExporter(queue).compression == "gzip"
+
+
+def test_gzip_and_plain_batches_are_delivered(tmp_path):
+    for compression in ("gzip", "none"):
+        queue = SpanQueue(str(tmp_path / compression))
+        queue.append([_record(index) for index in range(5)])
+        with StandInCollector() as collector:
+            OTLPExporter(queue, collector.endpoint, compression, batch_size=2).flush()
+            assert len(collector.spans) == 5
+            assert collector.requests == 3
+        assert queue.depth() == 0
+
+
+def test_retry_after_is_capped_at_max_backoff(tmp_path, monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(otel_export.time, "sleep", sleeps.append)
+    exporter = OTLPExporter(SpanQueue(str(tmp_path)), "http://127.0.0.1:9", retries=2,
+                            max_backoff=0.2)
+
+    def unavailable(body):
+        raise ExportError("HTTP 503", True, retry_after=3600.0)
+
+    monkeypatch.setattr(exporter, "_post", unavailable)
+    with pytest.raises(ExportError):
+        exporter.send([_record()])
+    assert sleeps == [0.2, 0.2]
+
+
+def test_failed_flush_keeps_spans_queued(tmp_path):
+    queue = SpanQueue(str(tmp_path))
+    queue.append([_record()])
+    with StandInCollector(fail_next=10) as collector:
+        exporter = OTLPExporter(queue, collector.endpoint, retries=1, backoff=0.0)
+        exporter.flush()
+    assert queue.depth() == 1
+    assert queue.peek(1)[0]["attempts"] == 1
+
+
+def test_collect_stats_does_not_persist_git_ai_failures(tmp_path, monkeypatch):
+    commit_dir = str(tmp_path / "commit")
+    monkeypatch.setenv("GIT_AI_BIN", _stub(tmp_path, "boom", code=1))
+    assert collect_stats("HEAD", commit_dir) == "{}"
+    assert not os.path.exists(os.path.join(commit_dir, "stats.json"))
+
+    monkeypatch.setenv("GIT_AI_BIN", _stub(tmp_path, '{"ai_additions": 3}'))
+    assert json.loads(collect_stats("HEAD", commit_dir)) == {"ai_additions": 3}
+    monkeypatch.setenv("GIT_AI_BIN", str(tmp_path / "missing"))
+    # Written once, then reused without running git-ai
+    assert json.loads(collect_stats("HEAD", commit_dir)) == {"ai_additions": 3}
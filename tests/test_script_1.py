@@ -0,0 +1,106 @@
+"""Regression tests for ``DataProcessor`` in script_1."""
+
+import os
+
+import pytest
+
+from script_1 import DataProcessor
+
+
+def test_save_stream_empty_csv_creates_no_file(tmp_path):
+    path = tmp_path / "empty.csv"
+    assert DataProcessor().save_stream(iter([]), str(path)) is False
+    assert not path.exists()
+
+
+def test_save_stream_empty_json_writes_empty_array(tmp_path):
+    processor = DataProcessor()
+    path = str(tmp_path / "empty.json")
+    assert processor.save_stream([], path) is True
+    assert list(processor.read_stream(path)) == []
+
+
+def test_save_stream_csv_round_trip(tmp_path):
+    processor = DataProcessor()
+    records = processor.generate_sample_data(25, seed=1)
+    path = str(tmp_path / "records.csv.gz")
+    assert processor.save_stream(iter(records), path, batch_size=7) is True
+    assert os.path.getsize(path) > 0
+    assert list(processor.read_stream(path)) == records
+
+
+def test_bounded_map_pulls_lazily_and_keeps_order():
+    from concurrent.futures import ThreadPoolExecutor
+    from script_1 import _bounded_map
+
+    pulled = []
+
+    def items():
+        for item in range(20):
+            pulled.append(item)
+            yield item
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = _bounded_map(executor, lambda value: value * value, items(), 3)
+        assert next(results) == 0
+        # One result consumed: only max_in_flight items submitted so far
+        assert len(pulled) == 3
+        assert list(results) == [value * value for value in range(1, 20)]
+
+
+def test_parallel_paths_match_serial():
+    processor = DataProcessor()
+    table = processor.generate_sample_data(120_000, columnar=True, seed=3)
+    parallel = processor.process_data_parallel(table, workers=2, chunk_size=30_000)
+    serial = processor.process_stream(table)
+    assert parallel["total_records"] == serial["total_records"] == 120_000
+    # Partials are merged shard by shard, so sums agree to float rounding
+    assert parallel["price_stats"]["mean"] == pytest.approx(serial["price_stats"]["mean"])
+    filtered = processor.filter_data_parallel(table, category="books", min_price=50.0,
+                                              workers=2, chunk_size=30_000)
+    assert filtered.ids == processor.filter_data(table, category="books", min_price=50.0).ids
+
+
+def test_filter_data_scans_after_in_place_edit():
+    processor = DataProcessor()
+    records = processor.generate_sample_data(200, seed=5)
+    processor.process_data(records)
+    processor.build_index()
+    records[0]["category"] = "edited"
+    assert processor.filter_data(records, category="edited") == [records[0]]
+    # The opt-in index path is stale until invalidated
+    assert processor.filter_data(records, category="edited", use_index=True) == []
+    processor.invalidate_index()
+    assert processor.query(category="edited") == [records[0]]
+
+
+def test_query_matches_filter_data():
+    processor = DataProcessor()
+    for records in (processor.generate_sample_data(500, seed=2),
+                    processor.generate_sample_data(500, columnar=True, seed=2)):
+        processor.process_data(records)
+        expected = processor.filter_data(records, category="books", min_price=100.0,
+                                         max_price=300.0)
+        result = processor.query(category="books", min_price=100.0, max_price=300.0)
+        if hasattr(result, "to_records"):
+            result, expected = result.to_records(), expected.to_records()
+        assert result == expected
+
+
+@pytest.mark.parametrize("chunk_size", range(1, 9))
+def test_iter_json_array_across_chunk_boundaries(chunk_size):
+    import io
+    import json
+    from script_1 import _iter_json_array
+
+    values = [12345, -0.5, 1e10, 3, "a,]b", True, None, {"k": [1, 22, 333]}, [], 7.25]
+    text = " [\n" + ",\n".join(json.dumps(value) for value in values) + "\n] "
+    assert list(_iter_json_array(io.StringIO(text), chunk_size)) == values
+
+
+def test_iter_json_array_rejects_truncated_input():
+    import io
+    from script_1 import _iter_json_array
+
+    with pytest.raises(ValueError):
+        list(_iter_json_array(io.StringIO('[1, 2, {"a": '), 4))
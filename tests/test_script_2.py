@@ -0,0 +1,151 @@
+"""Regression tests for script_2's detectors, aggregators and scraper."""
+
+import random
+
+import pytest
+
+from script_2 import OnlineAnomalyDetector
+
+
+def _series(seed: int = 1):
+    rng = random.Random(seed)
+    return [{"value": rng.gauss(0, 1), "category": rng.choice("ab")} for _ in range(300)] + \
+        [{"value": 9.0, "category": "a"}]
+
+
+def test_detect_batch_is_repeatable_and_leaves_baselines_alone():
+    detector = OnlineAnomalyDetector(group_by="category")
+    data = _series()
+    first = detector.detect_batch(data)
+    assert first and first == detector.detect_batch(data)
+    assert detector.baselines == {}
+
+
+def test_detect_batch_ignores_restored_state():
+    data = _series()
+    trained = OnlineAnomalyDetector()
+    for point in _series(seed=2):
+        trained.update(point)
+    restored = OnlineAnomalyDetector.from_state(trained.to_state())
+    assert restored.detect_batch(data) == OnlineAnomalyDetector().detect_batch(data)
+
+
+def _serve_raw(responses):
+    """Start a server answering successive requests on one connection with ``responses``."""
+    import asyncio
+
+    async def handle(reader, writer):
+        try:
+            for response in responses:
+                await reader.readuntil(b"\r\n\r\n")
+                writer.write(response)
+                await writer.drain()
+            await reader.read()
+        finally:
+            writer.close()
+
+    return asyncio.start_server(handle, "127.0.0.1", 0)
+
+
+def _fetch_all(responses, paths, **options):
+    import asyncio
+    from script_2 import AsyncScraper
+
+    async def run():
+        server = await _serve_raw(responses)
+        port = server.sockets[0].getsockname()[1]
+        scraper = AsyncScraper(per_host=1, retries=0, **options)
+        try:
+            return [await scraper.fetch(f"http://127.0.0.1:{port}{path}") for path in paths]
+        finally:
+            await scraper.close()
+            server.close()
+
+    return asyncio.run(run())
+
+
+def test_fetch_bodiless_responses_keep_the_connection():
+    results = _fetch_all([b"HTTP/1.1 204 No Content\r\n\r\n",
+                          b"HTTP/1.1 304 Not Modified\r\nETag: x\r\n\r\n",
+                          b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok"],
+                         ["/a", "/b", "/c"], timeout=2.0)
+    assert [(page["status"], page["body"]) for page in results] == \
+        [(204, ""), (304, ""), (200, "ok")]
+    assert all(page["latency"] < 1.0 for page in results)
+
+
+def test_fetch_skips_interim_responses_and_unknown_charsets():
+    page, = _fetch_all([b"HTTP/1.1 103 Early Hints\r\nLink: </a.css>\r\n\r\n"
+                        b"HTTP/1.1 200 OK\r\nContent-Type: text/html; charset=foo\r\n"
+                        b"Content-Length: 5\r\n\r\nh\xc3\xa9!!"], ["/"], timeout=2.0)
+    assert page["status"] == 200
+    assert page["body"] == "hé!!"
+
+
+def test_extract_keywords_batched_matches_extract_keywords():
+    from script_2 import WebScrapingSimulator
+
+    simulator = WebScrapingSimulator()
+    random.seed(4)
+    articles = simulator.simulate_article_scraping(200)
+    assert simulator.extract_keywords_batched(articles, chunk_size=30) == \
+        simulator.extract_keywords(articles)
+
+
+def test_pipeline_over_generator_refuses_a_second_run():
+    from script_2 import Pipeline
+
+    pipeline = Pipeline((value for value in range(5)), "source").map(lambda value: value * 2, "double")
+    assert list(pipeline) == [0, 2, 4, 6, 8]
+    with pytest.raises(RuntimeError):
+        list(pipeline)
+
+
+def test_pipeline_over_list_runs_repeatedly():
+    from script_2 import Pipeline
+
+    pipeline = Pipeline([1, 2, 3], "source").map(lambda value: value + 1, "increment")
+    assert list(pipeline) == list(pipeline) == [2, 3, 4]
+
+
+def _points(count: int = 5_000, seed: int = 6):
+    rng = random.Random(seed)
+    return [{"category": rng.choice("abc"), "region": rng.choice("xy"),
+             "value": round(rng.uniform(0, 100), 2)} for _ in range(count)]
+
+
+def _expected(points, keys):
+    from script_2 import DataAnalyzer
+
+    grouped = {}
+    for point in points:
+        grouped.setdefault(tuple(point[key] for key in keys), []).append(point)
+    analyzer = DataAnalyzer()
+    return {key: analyzer.calculate_statistics(items) for key, items in grouped.items()}
+
+
+@pytest.mark.parametrize("options", [{}, {"median": "select"}, {"median": None},
+                                     {"median": "select", "max_groups": 2}])
+def test_group_aggregator_matches_calculate_statistics(options):
+    from script_2 import GroupAggregator
+
+    points = _points()
+    result = GroupAggregator(("category", "region"), **options).update(points).result()
+    expected = _expected(points, ("category", "region"))
+    assert result.keys() == expected.keys()
+    for key, stats in result.items():
+        for name, value in expected[key].items():
+            if name == "median" and options.get("median", "histogram") is None:
+                assert "median" not in stats
+            else:
+                assert stats[name] == pytest.approx(value, rel=1e-12), (key, name)
+
+
+def test_group_aggregator_default_keeps_aggregates_only():
+    from script_2 import GroupAggregator
+
+    aggregator = GroupAggregator("category").update(_points(20_000))
+    assert aggregator.median == "histogram"
+    assert all(len(values) < GroupAggregator.FOLD_SIZE for values in aggregator._buffers.values())
+    select = GroupAggregator("category", median="select").update(_points(100))
+    assert select._folded == {}